@@ -4,17 +4,56 @@ import bpy
 import mathutils
 import json
 import threading
+import queue
 import socket
+import selectors
+import itertools
 import time
 import requests
 import tempfile
 import traceback
 import os
+import posixpath
 import shutil
 import zipfile
+import zlib
 from bpy.props import StringProperty, IntProperty, BoolProperty, EnumProperty
 import io
-from contextlib import redirect_stdout, suppress
+import sys
+import struct
+import base64
+import array
+import cProfile
+import pstats
+import tracemalloc
+import random
+import re
+import bisect
+import math
+import secrets
+import hashlib
+from collections import deque, OrderedDict
+from multiprocessing import shared_memory
+from contextlib import contextmanager, redirect_stdout, suppress
+from urllib.parse import urlparse, parse_qs, unquote
+
+# Optional binary encoding for the socket protocol; JSON is used without it
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Optional zstd compression for large frames; zlib is always available
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Optional vectorized path math; Blender bundles numpy, plain Python is the fallback
+try:
+    import numpy
+except ImportError:
+    numpy = None
 
 bl_info = {
     "name": "Blender MCP",
@@ -28,14 +67,2359 @@ bl_info = {
 
 RODIN_FREE_TRIAL_KEY = "k9TcfFoEhNd9cCPP2guHAHHHkctZHIRhZDywZ1euGUXwihbYLpOjQhofby80NJez"
 
+# Remote API endpoints; overridable so benchmarks can point them at local stand-ins
+POLYHAVEN_API_URL = os.environ.get("BLENDERMCP_POLYHAVEN_API_URL", "https://api.polyhaven.com")
+SKETCHFAB_API_URL = os.environ.get("BLENDERMCP_SKETCHFAB_API_URL", "https://api.sketchfab.com/v3")
+RODIN_API_URL = os.environ.get("BLENDERMCP_RODIN_API_URL", "https://hyperhuman.deemos.com/api/v2")
+FAL_AI_API_URL = os.environ.get("BLENDERMCP_FAL_AI_API_URL", "https://queue.fal.run/fal-ai/hyper3d")
+
+# Network defaults: pending-connection backlog, recv() size, and the most bytes
+# buffered per client (a larger command is refused; more unsent output pauses reading)
+SERVER_BACKLOG = 16
+RECV_SIZE = 256 * 1024
+CLIENT_BUFFER_LIMIT = 256 * 1024 * 1024
+
+# Admission control: commands wait in a bounded queue drained on the main thread.
+# A client over its own limit, or any client while the queue is full, gets a
+# "busy" response with a retry_after hint instead of piling up more work.
+MAX_QUEUED_COMMANDS = 256
+MAX_QUEUED_PER_CLIENT = 32
+DRAIN_TIME_BUDGET = 0.05  # Seconds of commands per main-thread slice before yielding to the UI
+
+# Priority classes, served strictly in this order; clients may lower but never raise a command's class
+PRIORITY_INTERACTIVE, PRIORITY_MUTATION, PRIORITY_BULK = 0, 1, 2
+PRIORITY_NAMES = ("interactive", "mutation", "bulk")
+COMMAND_PRIORITIES = {
+    "get_scene_info": PRIORITY_INTERACTIVE,
+    "get_object_info": PRIORITY_INTERACTIVE,
+    "get_viewport_screenshot": PRIORITY_INTERACTIVE,
+    "get_polyhaven_status": PRIORITY_INTERACTIVE,
+    "get_hyper3d_status": PRIORITY_INTERACTIVE,
+    "get_sketchfab_status": PRIORITY_INTERACTIVE,
+    "search_polyhaven_assets": PRIORITY_INTERACTIVE,
+    "search_sketchfab_models": PRIORITY_INTERACTIVE,
+    "get_rodin_batch_status": PRIORITY_INTERACTIVE,
+    "get_profiles": PRIORITY_INTERACTIVE,
+    "configure_profiling": PRIORITY_INTERACTIVE,
+    "download_polyhaven_asset": PRIORITY_BULK,
+    "download_sketchfab_model": PRIORITY_BULK,
+    "create_rodin_job": PRIORITY_BULK,
+    "import_generated_asset": PRIORITY_BULK,
+    "create_rodin_batch": PRIORITY_BULK,
+    "import_rodin_batch": PRIORITY_BULK,
+}
+
+# Idempotency: successful results of mutating commands sent with an
+# "idempotency_key" are kept for a while, so a retry gets the original result
+# back instead of importing a second copy. The map names the result fields
+# holding datablock names (and their bpy.data collection); a cached result is
+# only replayed while those datablocks still exist.
+IDEMPOTENCY_CACHE_SIZE = 128
+IDEMPOTENCY_TTL = 600  # Seconds
+IDEMPOTENT_COMMANDS = {
+    "download_polyhaven_asset": {"material": "materials", "image_name": "images", "imported_objects": "objects"},
+    "set_texture": {"material": "materials"},
+    "set_texture_many": {"material": "materials"},
+    "create_material_from_template": {"material": "materials"},
+    "download_sketchfab_model": {"imported_objects": "objects"},
+    "import_generated_asset": {"name": "objects"},
+    "create_rodin_job": {},
+    "create_rodin_batch": {},
+}
+
+# Sketchfab search pages are cached for a while, keyed by the normalized query
+SKETCHFAB_SEARCH_CACHE_SIZE = 64
+SKETCHFAB_SEARCH_TTL = 300  # Seconds
+SKETCHFAB_THUMBNAIL_WIDTH = 256  # Smallest thumbnail width worth returning
+
+# Profiling defaults: how many captured profiles to keep, and how many
+# functions / allocation sites to include in each report
+PROFILE_STORE_SIZE = 20
+PROFILE_TOP_FUNCTIONS = 30
+PROFILE_TOP_ALLOCATIONS = 15
+
+# Commands that manage profiling are never profiled themselves
+PROFILING_COMMANDS = ("get_profiles", "configure_profiling")
+
+#region Protocol
+# After a client sends "negotiate_protocol", every message in both directions
+# is a frame: a header (flags, payload length) followed by the encoded payload.
+# Clients that never negotiate keep the original unframed JSON protocol.
+PROTOCOL_VERSION = 1
+FRAME_HEADER = struct.Struct("!BI")
+FRAME_FLAG_MSGPACK = 0x01
+FRAME_FLAG_COMPRESSED = 0x02
+FRAME_FLAG_SHARED_MEMORY = 0x04
+MAX_FRAME_SIZE = 1 << 30
+
+# A shared-memory frame carries only (offset, length) of its payload in the ring
+SHARED_MEMORY_HANDLE = struct.Struct("!QQ")
+
+# Frames at least this large are compressed when the client negotiated compression
+COMPRESSION_THRESHOLD = 64 * 1024
+COMPRESSION_LEVELS = {"zstd": 3, "zlib": 1}
+COMPRESSION_LEVEL_RANGES = {"zstd": (1, 22), "zlib": (-1, 9)}
+
+# msgpack extension type for typed numeric arrays (array.array): one typecode
+# byte followed by the little-endian item data
+MSGPACK_EXT_ARRAY = 1
+
+
+def _supported_encodings():
+    """Encodings this side can speak, most preferred first"""
+    return (["msgpack"] if msgpack is not None else []) + ["json"]
+
+
+def _supported_compressions():
+    return (["zstd"] if zstandard is not None else []) + ["zlib"]
+
+
+def _compress(algorithm, data, level):
+    if algorithm == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+
+def _decompress(algorithm, data):
+    if algorithm == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=MAX_FRAME_SIZE)
+    decompressor = zlib.decompressobj()
+    result = decompressor.decompress(data, MAX_FRAME_SIZE)
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Decompressed frame exceeds {MAX_FRAME_SIZE} bytes")
+    return result
+
+
+def _compression_level(algorithm, level):
+    """The requested level clamped to what algorithm accepts, or its default"""
+    if algorithm is None:
+        return None
+    if level is None:
+        return COMPRESSION_LEVELS[algorithm]
+    low, high = COMPRESSION_LEVEL_RANGES[algorithm]
+    return min(max(int(level), low), high)
+
+
+def _array_to_bytes(values):
+    if sys.byteorder == "big":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+
+def _array_from_bytes(typecode, data):
+    values = array.array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+
+def _json_default(obj):
+    """Represent bytes and typed arrays in JSON so they survive the debug encoding"""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return {"__bytes__": base64.b64encode(obj).decode("ascii")}
+    if isinstance(obj, array.array):
+        return {"__array__": obj.typecode, "data": base64.b64encode(_array_to_bytes(obj)).decode("ascii")}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _json_object_hook(obj):
+    if "__bytes__" in obj and len(obj) == 1:
+        return base64.b64decode(obj["__bytes__"])
+    if "__array__" in obj and len(obj) == 2:
+        return _array_from_bytes(obj["__array__"], base64.b64decode(obj["data"]))
+    return obj
+
+
+def _msgpack_default(obj):
+    if isinstance(obj, array.array):
+        return msgpack.ExtType(MSGPACK_EXT_ARRAY, obj.typecode.encode("ascii") + _array_to_bytes(obj))
+    if isinstance(obj, memoryview):
+        return obj.tobytes()
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+
+def _msgpack_ext_hook(code, data):
+    if code == MSGPACK_EXT_ARRAY:
+        return _array_from_bytes(data[:1].decode("ascii"), data[1:])
+    return msgpack.ExtType(code, data)
+
+
+def _encode_message(obj, encoding):
+    """Encode a message body; returns (frame flags, payload bytes)"""
+    if encoding == "msgpack":
+        return FRAME_FLAG_MSGPACK, msgpack.packb(obj, default=_msgpack_default, use_bin_type=True)
+    return 0, json.dumps(obj, default=_json_default).encode('utf-8')
+
+
+def _decode_message(payload, flags):
+    if flags & FRAME_FLAG_MSGPACK:
+        return msgpack.unpackb(payload, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+    return json.loads(payload.decode('utf-8'), object_hook=_json_object_hook)
+
+
+def _append_field(payload, flags, key, value, encoding):
+    """
+    Add one field to an already encoded message object without re-encoding it.
+
+    Used to attach trace spans after the response itself has been serialized.
+    """
+    _, extra = _encode_message({key: value}, encoding)
+    if flags & FRAME_FLAG_MSGPACK:
+        # fixmap headers carry the entry count in their low nibble
+        if payload[0] & 0xf0 == 0x80 and extra[0] == 0x81 and payload[0] & 0x0f < 15:
+            return bytes([payload[0] + 1]) + payload[1:] + extra[1:]
+        merged = _decode_message(payload, flags)
+        merged[key] = value
+        return _encode_message(merged, encoding)[1]
+    separator = b", " if len(payload) > 2 else b""
+    return payload[:-1] + separator + extra[1:]
+
+
+def _attach_shared_memory(name):
+    """Attach to a segment owned (and eventually unlinked) by the MCP server"""
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)
+    except TypeError:
+        # Before Python 3.13 the resource tracker would unlink it when Blender exits
+        segment = shared_memory.SharedMemory(name=name)
+        from multiprocessing import resource_tracker
+        resource_tracker.unregister(segment._name, "shared_memory")
+        return segment
+
+
+class _SharedMemoryRing:
+    """
+    Ring buffer in shared memory for large response payloads to a same-host client.
+
+    The MCP server creates the segment and passes its name when negotiating; the
+    frame sent over the socket then only holds the payload's offset and length.
+    Clients read each response before sending their next command, so receiving
+    a command frees every region sent before it.
+    """
+
+    def __init__(self, segment):
+        self.segment = segment
+        self.size = segment.size
+        self._head = 0
+        self._pending = deque()  # (start, end) of regions the client may still read
+        self._lock = threading.Lock()
+
+    def release_sent(self):
+        with self._lock:
+            self._pending.clear()
+
+    def write(self, payload):
+        """Copy payload into the ring and return its offset, or None if it does not fit"""
+        length = len(payload)
+        with self._lock:
+            if not self._pending:
+                self._head = 0
+                start = 0 if length <= self.size else None
+            else:
+                tail = self._pending[0][0]
+                if self._head >= tail:
+                    if self._head + length <= self.size:
+                        start = self._head
+                    else:
+                        start = 0 if length <= tail else None
+                else:
+                    start = self._head if self._head + length <= tail else None
+            if start is None:
+                return None
+            self.segment.buf[start:start + length] = payload
+            self._head = start + length
+            self._pending.append((start, self._head))
+            return start
+
+    def close(self):
+        try:
+            self.segment.close()
+        except BufferError:
+            pass
+
+
+class _FrameCodec:
+    """Per-connection frame settings agreed in negotiate_protocol"""
+
+    def __init__(self, encoding, compression=None, threshold=COMPRESSION_THRESHOLD, level=None,
+                 ring=None, shared_memory_threshold=None):
+        self.encoding = encoding
+        self.compression = compression
+        self.threshold = threshold
+        self.level = level if level is not None else COMPRESSION_LEVELS.get(compression)
+        self.ring = ring
+        self.shared_memory_threshold = shared_memory_threshold
+
+    def frame(self, flags, payload):
+        """Prefix an encoded payload with its header, compressing it if it is large"""
+        if self.ring and len(payload) >= self.shared_memory_threshold:
+            offset = self.ring.write(payload)
+            if offset is not None:
+                handle = SHARED_MEMORY_HANDLE.pack(offset, len(payload))
+                return FRAME_HEADER.pack(flags | FRAME_FLAG_SHARED_MEMORY, len(handle)) + handle
+        if self.compression and len(payload) >= self.threshold:
+            payload = _compress(self.compression, payload, self.level)
+            flags |= FRAME_FLAG_COMPRESSED
+        return FRAME_HEADER.pack(flags, len(payload)) + payload
+
+    def encode(self, obj):
+        return self.frame(*_encode_message(obj, self.encoding))
+
+    def close(self):
+        if self.ring:
+            self.ring.close()
+            self.ring = None
+
+    def decode(self, flags, payload):
+        if flags & FRAME_FLAG_COMPRESSED:
+            payload = _decompress(self.compression, payload)
+        return _decode_message(payload, flags)
+#endregion
+
+#region Cancellation
+# The queued command currently executing on the main thread, if any
+_execution_local = threading.local()
+
+
+class _CommandCancelled(Exception):
+    """
+    Raised at a cancellation checkpoint inside a handler.
+
+    Handlers that catch it run their usual cleanup and return an error; the
+    dispatcher reports the rest as "cancelled".
+    """
+
+
+def _check_cancelled():
+    """Cooperative cancellation checkpoint for long-running handlers"""
+    entry = getattr(_execution_local, "entry", None)
+    if entry is not None and entry.should_stop():
+        raise _CommandCancelled("Command cancelled" if entry.cancelled else "Command deadline exceeded")
+#endregion
+
+#region Tracing
+# The trace of the command currently executing on the main thread, if any
+_trace_local = threading.local()
+
+
+class _TraceContext:
+    """
+    Spans recorded while handling one traced command.
+
+    The MCP server sends a W3C-style traceparent in the command envelope; all
+    spans recorded here become its children and travel back in the response's
+    "spans" field, so the server can export the whole trace in one place.
+    """
+
+    def __init__(self, trace_id, parent_span_id, command_type, start_ns):
+        self.trace_id = trace_id
+        self.spans = []
+        self.root = self._new_span(f"blender.handle {command_type}", parent_span_id, start_ns)
+        self.root["attributes"]["blender.command"] = command_type
+        self._stack = [self.root]
+
+    @classmethod
+    def from_command(cls, command, start_ns):
+        """Build a context from the command's traceparent, or return None if it is not traced"""
+        traceparent = (command.get("trace") or {}).get("traceparent")
+        if not traceparent:
+            return None
+        try:
+            _, trace_id, parent_span_id, _ = traceparent.split("-")
+        except ValueError:
+            return None
+        return cls(trace_id, parent_span_id, command.get("type"), start_ns)
+
+    def _new_span(self, name, parent_span_id, start_ns=None, **attributes):
+        return {
+            "name": name,
+            "trace_id": self.trace_id,
+            "span_id": secrets.token_hex(8),
+            "parent_span_id": parent_span_id,
+            "start_time_unix_nano": start_ns or time.time_ns(),
+            "end_time_unix_nano": None,
+            "service": "blender-addon",
+            "status": "OK",
+            "attributes": attributes,
+        }
+
+    def record(self, name, start_ns, end_ns, **attributes):
+        """Record an already finished span under the current parent"""
+        span = self._new_span(name, self._stack[-1]["span_id"], start_ns, **attributes)
+        span["end_time_unix_nano"] = end_ns
+        self.spans.append(span)
+        return span
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """Record a span around a block; spans opened inside it become its children"""
+        span = self._new_span(name, self._stack[-1]["span_id"], **attributes)
+        self._stack.append(span)
+        try:
+            yield span
+        except Exception as e:
+            span["status"] = "ERROR"
+            span["attributes"]["error.message"] = str(e)
+            raise
+        finally:
+            self._stack.pop()
+            span["end_time_unix_nano"] = time.time_ns()
+            self.spans.append(span)
+
+    def finish(self):
+        """Close the root span and return every span of this command"""
+        self.root["end_time_unix_nano"] = time.time_ns()
+        return [self.root] + self.spans
+
+
+class _TracedSession(requests.Session):
+    """requests session that records a span for each call made by a traced command"""
+
+    def request(self, method, url, *args, **kwargs):
+        # Every outbound call is a cancellation checkpoint for the running command
+        _check_cancelled()
+        trace = getattr(_trace_local, "current", None)
+        if trace is None:
+            return super().request(method, url, *args, **kwargs)
+        parsed = urlparse(url)
+        with trace.span(f"HTTP {method} {parsed.netloc}", **{
+            "http.method": method,
+            "http.url": url,
+        }) as span:
+            response = super().request(method, url, *args, **kwargs)
+            span["attributes"]["http.status_code"] = response.status_code
+            length = response.headers.get("Content-Length")
+            if length:
+                span["attributes"]["http.response_content_length"] = int(length)
+            return response
+
+
+# Shared HTTP session for outbound API calls from the main thread (connection reuse + tracing).
+# Background threads use their own _TracedSession; tracing and cancellation only follow the
+# command running on the thread that makes the call, so their calls go untraced
+_http = _TracedSession()
+#endregion
+
+#region Uploads
+# Longest image side sent to Rodin; larger inputs are downscaled before upload
+RODIN_MAX_IMAGE_SIZE = 2048
+UPLOAD_CHUNK_SIZE = 1 << 16
+
+
+class _MultipartBody:
+    """
+    multipart/form-data request body that reads files from disk while it is sent.
+
+    Fields are (name, filename or None, value); a value is bytes, text, or for
+    file fields a path. requests streams it with a Content-Length instead of
+    building the whole body in memory.
+    """
+
+    def __init__(self, fields):
+        self.boundary = secrets.token_hex(16)
+        self._segments = []  # bytes, or the path of a file to stream
+        for name, filename, value in fields:
+            disposition = f'form-data; name="{name}"' + (f'; filename="{filename}"' if filename else "")
+            head = f"--{self.boundary}\r\nContent-Disposition: {disposition}\r\n"
+            if filename:
+                head += "Content-Type: application/octet-stream\r\n"
+            self._segments.append((head + "\r\n").encode("utf-8"))
+            if filename and isinstance(value, str):
+                self._segments.append(os.fspath(value))
+            else:
+                self._segments.append(value if isinstance(value, (bytes, bytearray)) else str(value).encode("utf-8"))
+            self._segments.append(b"\r\n")
+        self._segments.append(f"--{self.boundary}--\r\n".encode("utf-8"))
+        self.length = sum(os.path.getsize(s) if isinstance(s, str) else len(s) for s in self._segments)
+        self._chunks = self._iter_chunks()
+        self._buffer = bytearray()
+
+    @property
+    def content_type(self):
+        return f"multipart/form-data; boundary={self.boundary}"
+
+    def __len__(self):
+        return self.length
+
+    def _iter_chunks(self):
+        for segment in self._segments:
+            if not isinstance(segment, str):
+                yield segment
+                continue
+            with open(segment, "rb") as f:
+                while True:
+                    _check_cancelled()
+                    chunk = f.read(UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    yield chunk
+
+    def read(self, size=-1):
+        while size is None or size < 0 or len(self._buffer) < size:
+            chunk = next(self._chunks, None)
+            if chunk is None:
+                break
+            self._buffer += chunk
+        if size is None or size < 0:
+            size = len(self._buffer)
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+
+def _downscaled_image(path, max_size):
+    """
+    Path of a copy of the image at most max_size pixels on its longest side.
+
+    Returns path itself when the image is small enough. Uses Blender's image
+    API, so it must run on the main thread.
+    """
+    image = bpy.data.images.load(path, check_existing=False)
+    try:
+        width, height = image.size
+        if max(width, height) <= max_size:
+            return path
+        scale = max_size / max(width, height)
+        image.scale(max(1, round(width * scale)), max(1, round(height * scale)))
+        file_format = 'JPEG' if image.file_format == 'JPEG' else 'PNG'
+        fd, target = tempfile.mkstemp(suffix=".jpg" if file_format == 'JPEG' else ".png")
+        os.close(fd)
+        image.filepath_raw = target
+        image.file_format = file_format
+        image.save()
+        return target
+    finally:
+        bpy.data.images.remove(image)
+#endregion
+
+#region Asset registry
+# ID property stamped on every datablock the registry hands out, so a lookup
+# can tell "our" image from a user's datablock that happens to share the name
+ASSET_KEY_PROPERTY = "blendermcp_asset"
+
+
+class _AssetRegistry:
+    """
+    Maps (provider, asset_id, resolution, map) to datablocks created by earlier imports.
+
+    Only names are kept (references to ID blocks don't survive undo or file
+    loads); a hit is re-validated against bpy.data and the stamped key.
+    """
+
+    def __init__(self):
+        self._names = {}  # (collection, key) -> datablock name
+
+    @staticmethod
+    def key(provider, asset_id, resolution, map_name):
+        return "/".join(str(part) for part in (provider, asset_id, resolution, map_name))
+
+    def get(self, collection_name, key):
+        """The registered datablock, or None if it was never created, removed or renamed"""
+        name = self._names.get((collection_name, key))
+        if name is None:
+            return None
+        datablock = getattr(bpy.data, collection_name).get(name)
+        if datablock is None or datablock.get(ASSET_KEY_PROPERTY) != key:
+            del self._names[(collection_name, key)]
+            return None
+        return datablock
+
+    def register(self, collection_name, key, datablock):
+        datablock[ASSET_KEY_PROPERTY] = key
+        self._names[(collection_name, key)] = datablock.name
+        return datablock
+
+
+# Datablocks are file-global, so one registry serves every server instance
+_assets = _AssetRegistry()
+
+
+class _TextureIndex:
+    """
+    Texture id -> {map type: image name} for images named "<texture_id>_<map>.<ext>".
+
+    Every "_"-separated prefix of an image name is indexed, matching the
+    startswith(texture_id + "_") test it replaces. The index is rebuilt
+    lazily after file loads, undo/redo and image changes (see the handlers
+    below), and any entry whose image has since disappeared is dropped.
+    """
+
+    def __init__(self):
+        self._maps = {}
+        self._count = -1  # len(bpy.data.images) when built; -1 means stale
+
+    def invalidate(self):
+        self._count = -1
+
+    @staticmethod
+    def _map_type(name):
+        return name.split('_')[-1].split('.')[0]
+
+    def _index(self, name):
+        map_type = self._map_type(name)
+        for i, char in enumerate(name):
+            if char == '_':
+                self._maps.setdefault(name[:i], {})[map_type] = name
+
+    def _rebuild(self):
+        self._maps = {}
+        for image in bpy.data.images:
+            self._index(image.name)
+        self._count = len(bpy.data.images)
+
+    def add(self, image):
+        """Index an image this addon just created, without a rebuild"""
+        if self._count >= 0:
+            self._index(image.name)
+            self._count = len(bpy.data.images)
+
+    def images(self, texture_id):
+        """The texture's map images as {map type: image}"""
+        if self._count != len(bpy.data.images):
+            self._rebuild()
+        maps = self._maps.get(texture_id, {})
+        found = {}
+        for map_type, name in list(maps.items()):
+            image = bpy.data.images.get(name)
+            if image is None:
+                del maps[map_type]
+            else:
+                found[map_type] = image
+        return found
+
+
+_texture_index = _TextureIndex()
+
+
+@bpy.app.handlers.persistent
+def _invalidate_texture_index(*args):
+    _texture_index.invalidate()
+
+
+@bpy.app.handlers.persistent
+def _on_depsgraph_update(scene, depsgraph=None):
+    if depsgraph is not None and depsgraph.id_type_updated('IMAGE'):
+        _texture_index.invalidate()
+
+
+# (handler list, function) pairs installed by register()
+_APP_HANDLERS = (
+    ("load_post", _invalidate_texture_index),
+    ("undo_post", _invalidate_texture_index),
+    ("redo_post", _invalidate_texture_index),
+    ("depsgraph_update_post", _on_depsgraph_update),
+)
+
+
+def _set_colorspace(image, map_type):
+    """sRGB for color maps, Non-Color for data maps"""
+    _apply_colorspace(image, 'sRGB' if map_type.lower() in ['color', 'diffuse', 'albedo'] else 'Non-Color')
+
+
+def _apply_colorspace(image, name):
+    """Set an image's color space, only touching the image if it changes"""
+    if image.colorspace_settings.name == name:
+        return  # Assigning a color space drops the image's buffers, even the same one
+    try:
+        image.colorspace_settings.name = name
+    except:
+        pass  # Use default if not available
+
+
+def _registered_maps(material):
+    """Map types of the registered images used by a material's texture nodes"""
+    maps = []
+    for node in material.node_tree.nodes:
+        if node.type == 'TEX_IMAGE' and node.image:
+            key = node.image.get(ASSET_KEY_PROPERTY)
+            if key:
+                maps.append(key.rsplit("/", 1)[-1].split(".")[0])
+    return maps
+#endregion
+
+#region Node templates
+# Declarative shader graphs. A template names its nodes ("type", "location",
+# "properties", "inputs", and for image nodes "image"/"colorspace") and lists
+# links as [from node, from socket, to node, to socket, {"requires"/"unless": [...]}].
+# A "$name" value is filled from the bindings when the material is created;
+# a node or link whose "requires" (or whose "$image") isn't bound, or one of
+# whose "unless" is, is left out.
+# The static part of the graph is built once as a node group and shared by
+# every material made from the template with the same set of bindings.
+NODE_TEMPLATES = {
+    "pbr": {
+        "defaults": {"displacement_scale": 0.1},
+        "nodes": {
+            "output": {"type": "ShaderNodeOutputMaterial", "location": [600, 0]},
+            "bsdf": {"type": "ShaderNodeBsdfPrincipled", "location": [300, 0]},
+            "tex_coord": {"type": "ShaderNodeTexCoord", "location": [-800, 0]},
+            "mapping": {"type": "ShaderNodeMapping", "location": [-600, 0], "properties": {"vector_type": "TEXTURE"}},
+            "color": {"type": "ShaderNodeTexImage", "location": [-400, 300], "image": "$color", "colorspace": "sRGB"},
+            "roughness": {"type": "ShaderNodeTexImage", "location": [-400, 50], "image": "$roughness", "colorspace": "Non-Color"},
+            "metallic": {"type": "ShaderNodeTexImage", "location": [-400, -200], "image": "$metallic", "colorspace": "Non-Color"},
+            "normal": {"type": "ShaderNodeTexImage", "location": [-400, -450], "image": "$normal", "colorspace": "Non-Color"},
+            "displacement": {"type": "ShaderNodeTexImage", "location": [-400, -700], "image": "$displacement", "colorspace": "Non-Color"},
+            "arm": {"type": "ShaderNodeTexImage", "location": [-400, -950], "image": "$arm", "colorspace": "Non-Color"},
+            "ao": {"type": "ShaderNodeTexImage", "location": [-400, -1200], "image": "$ao", "colorspace": "Non-Color"},
+            "normal_map": {"type": "ShaderNodeNormalMap", "location": [-100, -450], "requires": ["normal"]},
+            "arm_split": {"type": "ShaderNodeSeparateRGB", "location": [-100, -950], "requires": ["arm"]},
+            # Multiplies ambient occlusion into the base color; white (no-op) without an AO source.
+            # Binding "skip_ao" leaves it out, like Blender's glTF importer does
+            "ao_mix": {"type": "ShaderNodeMixRGB", "location": [100, 200], "requires": ["color"], "unless": ["skip_ao"],
+                       "properties": {"blend_type": "MULTIPLY"}, "inputs": {"0": 0.8, "2": [1.0, 1.0, 1.0, 1.0]}},
+            "displacement_node": {"type": "ShaderNodeDisplacement", "location": [300, -300], "requires": ["displacement"],
+                                  "inputs": {"Scale": "$displacement_scale"}},
+        },
+        "links": [
+            ["tex_coord", "UV", "mapping", "Vector"],
+            ["mapping", "Vector", "color", "Vector"],
+            ["mapping", "Vector", "roughness", "Vector"],
+            ["mapping", "Vector", "metallic", "Vector"],
+            ["mapping", "Vector", "normal", "Vector"],
+            ["mapping", "Vector", "displacement", "Vector"],
+            ["mapping", "Vector", "arm", "Vector"],
+            ["mapping", "Vector", "ao", "Vector"],
+            ["color", "Color", "ao_mix", "1"],
+            ["ao", "Color", "ao_mix", "2"],
+            ["arm", "Color", "arm_split", "Image"],
+            ["arm_split", "R", "ao_mix", "2", {"unless": ["ao"]}],
+            ["ao_mix", "Color", "bsdf", "Base Color"],
+            ["color", "Color", "bsdf", "Base Color", {"requires": ["skip_ao"]}],
+            ["roughness", "Color", "bsdf", "Roughness"],
+            ["arm_split", "G", "bsdf", "Roughness", {"unless": ["roughness"]}],
+            ["metallic", "Color", "bsdf", "Metallic"],
+            ["arm_split", "B", "bsdf", "Metallic", {"unless": ["metallic"]}],
+            ["normal", "Color", "normal_map", "Color"],
+            ["normal_map", "Normal", "bsdf", "Normal"],
+            ["displacement", "Color", "displacement_node", "Height"],
+            ["displacement_node", "Displacement", "output", "Displacement"],
+            ["bsdf", "BSDF", "output", "Surface"],
+        ],
+    },
+}
+
+# Texture map names (Poly Haven file keys and image name suffixes) for each "pbr" binding, preferred first
+PBR_MAP_ALIASES = {
+    "color": ["diffuse", "diff", "color", "col", "albedo"],
+    "roughness": ["rough", "roughness"],
+    "metallic": ["metal", "metallic", "metalness"],
+    "normal": ["nor_gl", "gl", "normal", "nor", "nor_dx", "dx"],
+    "displacement": ["displacement", "disp", "height"],
+    "arm": ["arm"],
+    "ao": ["ao"],
+}
+
+# Nodes that only work at the top level of a material, never inside a group
+OUTPUT_NODE_TYPES = ("ShaderNodeOutputMaterial", "ShaderNodeOutputWorld", "ShaderNodeOutputLight")
+
+# Group interface socket type for a node socket's data type
+GROUP_SOCKET_TYPES = {
+    "VALUE": "NodeSocketFloat",
+    "INT": "NodeSocketInt",
+    "BOOLEAN": "NodeSocketBool",
+    "RGBA": "NodeSocketColor",
+    "VECTOR": "NodeSocketVector",
+    "SHADER": "NodeSocketShader",
+}
+
+
+def _pbr_bindings(texture_images):
+    """Map a {map type: image} dict onto the "pbr" template's image bindings"""
+    by_type = {map_type.lower(): image for map_type, image in texture_images.items()}
+    bindings = {}
+    for binding, aliases in PBR_MAP_ALIASES.items():
+        for alias in aliases:
+            if alias in by_type:
+                bindings[binding] = by_type[alias].name
+                break
+    return bindings
+
+
+def _socket(sockets, key):
+    """Look a socket up by name, or by index for keys like "2" (JSON object keys are strings)"""
+    if isinstance(key, str) and key.isdigit():
+        key = int(key)
+    return sockets[key]
+
+
+def _binding_name(value):
+    return value[1:] if isinstance(value, str) and value.startswith("$") else None
+
+
+class _CompiledTemplate:
+    """A template reduced to one variant (set of bound names): what goes in the shared group, what per material"""
+
+    def __init__(self, name, spec, digest, variant):
+        self.name = name
+        self.digest = digest
+        self.defaults = spec.get("defaults", {})
+        nodes = spec.get("nodes")
+        if not isinstance(nodes, dict) or not nodes:
+            raise ValueError("Template needs a non-empty 'nodes' object")
+
+        self.nodes = {}
+        for node_id, node in nodes.items():
+            if "type" not in node:
+                raise ValueError(f"Template node '{node_id}' has no type")
+            requires = set(node.get("requires", []))
+            image = _binding_name(node.get("image"))
+            if image:
+                requires.add(image)
+            if requires <= variant and not set(node.get("unless", [])) & variant:
+                self.nodes[node_id] = node
+
+        # A node is per material if anything on it is bound, or if it must stay top-level
+        self.outer = {
+            node_id for node_id, node in self.nodes.items()
+            if node["type"] in OUTPUT_NODE_TYPES or "image" in node
+            or any(_binding_name(v) for v in list(node.get("inputs", {}).values()) + list(node.get("properties", {}).values()))
+        }
+
+        self.inner_links, self.outer_links = [], []
+        self.group_inputs, self.group_outputs = [], []  # (node id, socket) pairs, in interface order
+        for link in spec.get("links", []):
+            from_id, from_socket, to_id, to_socket = link[:4]
+            options = link[4] if len(link) > 4 else {}
+            for node_id in (from_id, to_id):
+                if node_id not in nodes:
+                    raise ValueError(f"Template link refers to unknown node '{node_id}'")
+            if from_id not in self.nodes or to_id not in self.nodes:
+                continue
+            if not set(options.get("requires", [])) <= variant or set(options.get("unless", [])) & variant:
+                continue
+            from_outer, to_outer = from_id in self.outer, to_id in self.outer
+            if from_outer and not to_outer and (from_id, from_socket) not in self.group_inputs:
+                self.group_inputs.append((from_id, from_socket))
+            if to_outer and not from_outer and (from_id, from_socket) not in self.group_outputs:
+                self.group_outputs.append((from_id, from_socket))
+            (self.outer_links if from_outer or to_outer else self.inner_links).append((from_id, from_socket, to_id, to_socket))
+
+        self.inner = [node_id for node_id in self.nodes if node_id not in self.outer]
+        # Bindings the template doesn't mention must not split the shared group
+        referenced = set()
+        for node in nodes.values():
+            referenced.update(node.get("requires", []))
+            referenced.update(node.get("unless", []))
+            referenced.update(filter(None, map(_binding_name, [node.get("image")] + list(node.get("inputs", {}).values())
+                                              + list(node.get("properties", {}).values()))))
+        for link in spec.get("links", []):
+            if len(link) > 4:
+                referenced.update(link[4].get("requires", []))
+                referenced.update(link[4].get("unless", []))
+        self.group_key = _assets.key("template", name, digest, ",".join(sorted(variant & referenced)) or "-")
+
+
+# (template name or spec digest, variant) -> _CompiledTemplate
+_compiled_templates = {}
+
+
+def _compile_template(template, bound):
+    """Compile a built-in template name or a template spec for the given bound names, cached"""
+    if isinstance(template, str):
+        if template not in NODE_TEMPLATES:
+            raise ValueError(f"Unknown template: {template}. Available: {', '.join(NODE_TEMPLATES)}")
+        name, spec, digest = template, NODE_TEMPLATES[template], "builtin"
+    else:
+        spec = template
+        name = spec.get("name", "custom")
+        digest = hashlib.sha256(json.dumps(spec, sort_keys=True).encode('utf-8')).hexdigest()[:12]
+    variant = frozenset(bound)
+    compiled = _compiled_templates.get((name, digest, variant))
+    if compiled is None:
+        compiled = _compiled_templates[(name, digest, variant)] = _CompiledTemplate(name, spec, digest, variant)
+    return compiled
+
+
+def _new_template_node(nodes, spec):
+    node = nodes.new(type=spec["type"])
+    if "location" in spec:
+        node.location = tuple(spec["location"])
+    return node
+
+
+def _new_group_socket(group, in_out, name, socket_type):
+    """Add an interface socket to a node group (Blender 4.0 changed the API)"""
+    if hasattr(group, "interface"):
+        group.interface.new_socket(name=name, in_out=in_out, socket_type=socket_type)
+    elif in_out == 'INPUT':
+        group.inputs.new(socket_type, name)
+    else:
+        group.outputs.new(socket_type, name)
+
+
+def _template_group(compiled):
+    """The shared node group holding a compiled template's static nodes, built on first use"""
+    group = _assets.get("node_groups", compiled.group_key)
+    if group is not None:
+        return group
+
+    group = bpy.data.node_groups.new(f"BlenderMCP {compiled.name}", 'ShaderNodeTree')
+    nodes = {}
+    for node_id in compiled.inner:
+        spec = compiled.nodes[node_id]
+        node = nodes[node_id] = _new_template_node(group.nodes, spec)
+        for attribute, value in spec.get("properties", {}).items():
+            setattr(node, attribute, value)
+        for key, value in spec.get("inputs", {}).items():
+            _socket(node.inputs, key).default_value = value
+    for from_id, from_socket, to_id, to_socket in compiled.inner_links:
+        group.links.new(_socket(nodes[from_id].outputs, from_socket), _socket(nodes[to_id].inputs, to_socket))
+
+    # Each outer socket feeding the group becomes an input; each inner socket leaving it an output.
+    # The interface comes first: group input/output nodes take their sockets from it when created.
+    input_targets = []
+    for from_id, from_socket in compiled.group_inputs:
+        name = f"{from_id}.{from_socket}"
+        targets = [_socket(nodes[to_id].inputs, to_socket) for f, fs, to_id, to_socket in compiled.outer_links
+                   if (f, fs) == (from_id, from_socket) and to_id in nodes]
+        _new_group_socket(group, 'INPUT', name, GROUP_SOCKET_TYPES.get(targets[0].type, "NodeSocketFloat"))
+        input_targets.append((name, targets))
+    output_sources = []
+    for from_id, from_socket in compiled.group_outputs:
+        name = f"{from_id}.{from_socket}"
+        source = _socket(nodes[from_id].outputs, from_socket)
+        _new_group_socket(group, 'OUTPUT', name, GROUP_SOCKET_TYPES.get(source.type, "NodeSocketFloat"))
+        output_sources.append((name, source))
+
+    locations = [compiled.nodes[node_id].get("location", (0, 0)) for node_id in compiled.inner]
+    group_input = group.nodes.new('NodeGroupInput')
+    group_input.location = (min(x for x, _ in locations) - 250, 0)
+    group_output = group.nodes.new('NodeGroupOutput')
+    group_output.location = (max(x for x, _ in locations) + 250, 0)
+    for name, targets in input_targets:
+        for target in targets:
+            group.links.new(group_input.outputs[name], target)
+    for name, source in output_sources:
+        group.links.new(source, group_output.inputs[name])
+
+    return _assets.register("node_groups", compiled.group_key, group)
+
+
+def _instantiate_template(material, template, bindings):
+    """
+    Replace material's node tree with the template, filling "$name" values from bindings.
+
+    Image bindings are image names. Returns the shared node group used, or None.
+    """
+    values = dict(template.get("defaults", {}) if isinstance(template, dict) else NODE_TEMPLATES.get(template, {}).get("defaults", {}))
+    values.update(bindings or {})
+    compiled = _compile_template(template, [name for name, value in values.items() if value is not None])
+
+    images = {}
+    for node_id in compiled.outer:
+        image_binding = _binding_name(compiled.nodes[node_id].get("image"))
+        if image_binding:
+            image = bpy.data.images.get(values[image_binding])
+            if image is None:
+                raise ValueError(f"Image not found for '{image_binding}': {values[image_binding]}")
+            images[node_id] = image
+
+    material.use_nodes = True
+    nodes = material.node_tree.nodes
+    links = material.node_tree.links
+    nodes.clear()
+
+    group = group_node = None
+    if compiled.inner:
+        group = _template_group(compiled)
+        group_node = nodes.new(type='ShaderNodeGroup')
+        group_node.node_tree = group
+        group_node.location = tuple(compiled.nodes[compiled.inner[0]].get("location", (0, 0)))
+
+    created = {}
+    for node_id in compiled.nodes:
+        if node_id not in compiled.outer:
+            continue
+        spec = compiled.nodes[node_id]
+        node = created[node_id] = _new_template_node(nodes, spec)
+        for attribute, value in spec.get("properties", {}).items():
+            bound = _binding_name(value)
+            if bound is None or values.get(bound) is not None:
+                setattr(node, attribute, values[bound] if bound else value)
+        for key, value in spec.get("inputs", {}).items():
+            bound = _binding_name(value)
+            if bound is None or values.get(bound) is not None:
+                _socket(node.inputs, key).default_value = values[bound] if bound else value
+        if node_id in images:
+            node.image = images[node_id]
+            if "colorspace" in spec:
+                _apply_colorspace(node.image, spec["colorspace"])
+
+    def output_of(node_id, socket):
+        if node_id in created:
+            return _socket(created[node_id].outputs, socket)
+        return group_node.outputs[f"{node_id}.{socket}"]
+
+    linked_inputs = set()
+    for from_id, from_socket, to_id, to_socket in compiled.outer_links:
+        if to_id in created:
+            links.new(output_of(from_id, from_socket), _socket(created[to_id].inputs, to_socket))
+        elif (from_id, from_socket) not in linked_inputs:
+            # Several inner targets share one group input
+            linked_inputs.add((from_id, from_socket))
+            links.new(output_of(from_id, from_socket), group_node.inputs[f"{from_id}.{from_socket}"])
+    return group
+#endregion
+
+#region Poly Haven catalog
+# Searches run against a local copy of Poly Haven's /assets listing, kept in
+# the cache directory and refreshed in the background once it is older than the TTL
+POLYHAVEN_CATALOG_TTL = 24 * 3600
+POLYHAVEN_CATALOG_TIMEOUT = 30  # Seconds for the /assets download
+POLYHAVEN_ASSET_TYPES = {"hdris": 0, "textures": 1, "models": 2}
+POLYHAVEN_SEARCH_FIELDS = {"name": 3.0, "id": 3.0, "tags": 2.0, "categories": 1.0}  # Field -> weight
+POLYHAVEN_DEFAULT_PROJECTION = ("name", "type", "categories", "tags", "download_count")
+
+
+def _cache_dir():
+    """Directory for the addon's on-disk caches (BLENDERMCP_CACHE_DIR overrides it)"""
+    path = os.environ.get("BLENDERMCP_CACHE_DIR")
+    if not path:
+        with suppress(Exception):
+            path = bpy.utils.user_resource('DATAFILES', path="blendermcp", create=True)
+    if not path:
+        path = os.path.join(tempfile.gettempdir(), "blendermcp")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def _tokenize(text):
+    return re.findall(r"[a-z0-9]+", str(text).lower())
+
+
+class _CatalogIndex:
+    """Immutable inverted index over one catalog snapshot"""
+
+    def __init__(self, assets, fetched_at):
+        self.assets = assets
+        self.fetched_at = fetched_at
+        self.postings = {}  # token -> {asset id: weight}
+        for asset_id, asset in assets.items():
+            fields = {
+                "name": asset.get("name", ""),
+                "id": asset_id,
+                "tags": " ".join(asset.get("tags", [])),
+                "categories": " ".join(asset.get("categories", [])),
+            }
+            for field, text in fields.items():
+                weight = POLYHAVEN_SEARCH_FIELDS[field]
+                for token in set(_tokenize(text)):
+                    postings = self.postings.setdefault(token, {})
+                    postings[asset_id] = max(postings.get(asset_id, 0.0), weight)
+        self.tokens = sorted(self.postings)
+
+    def _matches(self, token):
+        """{asset id: weight} for a query token; prefixes of longer words count half"""
+        matches = dict(self.postings.get(token, {}))
+        start = bisect.bisect_right(self.tokens, token)
+        for other in itertools.islice(self.tokens, start, None):
+            if not other.startswith(token):
+                break
+            for asset_id, weight in self.postings[other].items():
+                matches[asset_id] = max(matches.get(asset_id, 0.0), weight * 0.5)
+        return matches
+
+    def search(self, query=None, asset_type=None, categories=()):
+        """Asset ids ranked by text relevance (every query word must match), then popularity"""
+        scores = None
+        for token in _tokenize(query or ""):
+            matches = self._matches(token)
+            if scores is None:
+                scores = matches
+            else:
+                scores = {asset_id: score + matches[asset_id] for asset_id, score in scores.items() if asset_id in matches}
+        candidates = scores.keys() if scores is not None else self.assets.keys()
+
+        type_code = POLYHAVEN_ASSET_TYPES.get(asset_type)
+        results = []
+        for asset_id in candidates:
+            asset = self.assets[asset_id]
+            if type_code is not None and asset.get("type") != type_code:
+                continue
+            if categories and not set(categories) <= set(asset.get("categories", [])):
+                continue
+            score = scores[asset_id] if scores is not None else 0.0
+            results.append((-score, -asset.get("download_count", 0), asset_id))
+        results.sort()
+        return [asset_id for _, _, asset_id in results]
+
+
+class _PolyhavenCatalog:
+    """The persisted catalog and its index; refreshes happen off the main thread"""
+
+    def __init__(self, ttl=POLYHAVEN_CATALOG_TTL):
+        self.ttl = ttl
+        self._index = None
+        self._path = None  # Resolved on the main thread, as it may ask bpy
+        self._refreshing = False
+        self._lock = threading.Lock()
+        self.last_error = None
+
+    def _load(self):
+        """Read the persisted snapshot, if any"""
+        self._path = os.path.join(_cache_dir(), "polyhaven_catalog.json")
+        try:
+            with open(self._path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            self._index = _CatalogIndex(data["assets"], data["fetched_at"])
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            print(f"Ignoring unreadable Poly Haven catalog: {str(e)}")
+
+    def _fetch(self, session=None):
+        # Bounded: without a snapshot this runs on the main thread and holds up every command
+        try:
+            response = (session or _http).get(f"{POLYHAVEN_API_URL}/assets", timeout=POLYHAVEN_CATALOG_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"Could not download the Poly Haven catalog: {str(e)}")
+        if response.status_code != 200:
+            raise Exception(f"API request failed with status code {response.status_code}")
+        data = {"fetched_at": time.time(), "assets": response.json()}
+        index = _CatalogIndex(data["assets"], data["fetched_at"])
+        # Write then rename, so a crash never leaves a truncated catalog
+        tmp_path = self._path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self._path)
+        self._index = index
+        self.last_error = None
+
+    def _refresh_in_background(self):
+        with self._lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+
+        def refresh():
+            try:
+                with _TracedSession() as session:  # Not the main thread's
+                    self._fetch(session)
+            except Exception as e:
+                self.last_error = str(e)
+                print(f"Poly Haven catalog refresh failed: {str(e)}")
+            finally:
+                self._refreshing = False
+
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def index(self, force_refresh=False):
+        """The current index. Blocks only when there is no usable snapshot at all."""
+        if self._path is None:
+            self._load()
+        if self._index is None or force_refresh:
+            self._fetch()
+        elif time.time() - self._index.fetched_at > self.ttl:
+            self._refresh_in_background()  # Serve the stale snapshot meanwhile
+        return self._index
+
+
+_polyhaven_catalog = _PolyhavenCatalog()
+#endregion
+
+#region Sketchfab archives
+# Only the glTF and the files it references are extracted, into a tree per
+# model uid under the cache directory that later imports of the model reuse
+SKETCHFAB_MODEL_CACHE_SIZE = 32  # Extracted models kept on disk
+SKETCHFAB_MODEL_MANIFEST = "blendermcp.json"
+
+
+def _sketchfab_model_dir(uid):
+    if not re.fullmatch(r"[A-Za-z0-9_-]+", str(uid or "")):
+        raise ValueError(f"Invalid Sketchfab model UID: {uid}")
+    return os.path.join(_cache_dir(), "sketchfab", uid)
+
+
+def _archive_member(name):
+    """Normalized path of an archive member, or None if it escapes the archive root"""
+    path = posixpath.normpath(name.replace("\\", "/"))
+    if path.startswith("/") or path == ".." or path.startswith("../") or re.match(r"[A-Za-z]:", path):
+        return None
+    return path
+
+
+def _gltf_document(archive, info):
+    """JSON document of a .gltf or .glb archive member, reading only what it needs"""
+    with archive.open(info) as f:
+        if not info.filename.lower().endswith(".glb"):
+            return json.load(f)
+        magic, _, _, chunk_length, chunk_type = struct.unpack("<4sII I4s", f.read(20))
+        if magic != b"glTF" or chunk_type != b"JSON":
+            raise ValueError(f"{info.filename} is not a binary glTF file")
+        return json.loads(f.read(chunk_length))
+
+
+def _gltf_references(document):
+    """Relative URIs of the external buffers and images of a glTF document"""
+    uris = []
+    for item in document.get("buffers", []) + document.get("images", []):
+        uri = item.get("uri")
+        if uri and not uri.startswith("data:"):
+            uris.append(unquote(uri))
+    return uris
+
+
+def _extract_gltf(archive_path, target_dir):
+    """
+    Extract the main glTF of an archive and the files it references.
+
+    Member names are validated while the archive index is built, so nothing is
+    written outside target_dir. Returns the main file relative to target_dir.
+    """
+    with zipfile.ZipFile(archive_path) as archive:
+        members = {}
+        for info in archive.infolist():
+            path = _archive_member(info.filename)
+            if path is None:
+                raise ValueError("Security issue: Zip contains files with path traversal attempt")
+            if not info.is_dir():
+                members[path] = info
+
+        # Sketchfab puts the scene at the top of the archive
+        scenes = sorted((path for path in members if path.lower().endswith((".gltf", ".glb"))),
+                        key=lambda path: (path.count("/"), path))
+        if not scenes:
+            raise FileNotFoundError("No glTF file found in the downloaded model")
+        main_file = scenes[0]
+
+        wanted = [main_file]
+        base = posixpath.dirname(main_file)
+        for uri in _gltf_references(_gltf_document(archive, members[main_file])):
+            path = _archive_member(posixpath.join(base, uri))
+            if path is None:
+                raise ValueError("Security issue: glTF references a file outside the archive")
+            if path in members and path not in wanted:
+                wanted.append(path)
+
+        for path in wanted:
+            target = os.path.join(target_dir, *path.split("/"))
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            with archive.open(members[path]) as source, open(target, "wb") as f:
+                shutil.copyfileobj(source, f, 1 << 20)
+    return main_file
+
+
+def _cached_sketchfab_model(uid):
+    """Main file of an already extracted model, or None"""
+    model_dir = _sketchfab_model_dir(uid)
+    try:
+        with open(os.path.join(model_dir, SKETCHFAB_MODEL_MANIFEST)) as f:
+            main_file = os.path.join(model_dir, *json.load(f)["main_file"].split("/"))
+    except (OSError, ValueError, KeyError):
+        return None
+    if not os.path.isfile(main_file):
+        return None
+    # Recently imported models are the last to be evicted
+    with suppress(OSError):
+        os.utime(model_dir)
+    return main_file
+
+
+def _store_sketchfab_model(uid, archive_path):
+    """Extract a downloaded archive into the model cache and return its main file"""
+    model_dir = _sketchfab_model_dir(uid)
+    root = os.path.dirname(model_dir)
+    os.makedirs(root, exist_ok=True)
+    # Extract next to the final location so a partial tree is never picked up
+    staging = tempfile.mkdtemp(prefix=f"{uid}.", dir=root)
+    try:
+        main_file = _extract_gltf(archive_path, staging)
+        with open(os.path.join(staging, SKETCHFAB_MODEL_MANIFEST), "w") as f:
+            json.dump({"uid": uid, "main_file": main_file}, f)
+        shutil.rmtree(model_dir, ignore_errors=True)
+        os.replace(staging, model_dir)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    models = [entry for entry in os.scandir(root) if entry.is_dir() and "." not in entry.name]
+    models.sort(key=lambda entry: entry.stat().st_mtime, reverse=True)
+    for entry in models[SKETCHFAB_MODEL_CACHE_SIZE:]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+    return os.path.join(model_dir, *main_file.split("/"))
+#endregion
+
+#region Rodin batches
+# A batch runs many Rodin generations from a few worker threads: each job is
+# submitted, polled and downloaded in the background, then the finished models
+# are imported together by one main-thread command
+RODIN_BATCH_CONCURRENCY = 4
+RODIN_BATCH_MAX_CONCURRENCY = 8
+RODIN_BATCH_MAX_JOBS = 50
+RODIN_BATCH_POLL_INTERVAL = 5.0  # Seconds between status checks of a running job
+RODIN_BATCH_TIMEOUT = 1800  # Seconds before a job that never finishes is given up
+RODIN_BATCH_HISTORY = 16  # Batches remembered for status and import
+RODIN_BATCH_STATUS_RETRIES = 3  # Consecutive failed status checks tolerated before a job fails
+
+
+class _RodinBatch:
+    """Rodin jobs submitted together and the background workers running them"""
+
+    def __init__(self, mode, api_key, jobs, concurrency):
+        self.id = secrets.token_hex(8)
+        self.mode = mode
+        self.api_key = api_key  # Read on the main thread; workers must not touch bpy
+        self.jobs = jobs
+        self.discarded = False  # Set when the batch is evicted: workers stop, downloads are deleted
+        self._lock = threading.Lock()
+        self._pending = queue.Queue()
+        for job in jobs:
+            self._pending.put(job)
+        for _ in range(min(concurrency, len(jobs))):
+            threading.Thread(target=self._work, daemon=True).start()
+
+    def update(self, job, **fields):
+        with self._lock:
+            job.update(fields)
+
+    def discard(self):
+        """Stop the workers and delete downloaded models nothing will import any more"""
+        with self._lock:
+            self.discarded = True
+            files = [job.pop("file") for job in self.jobs if job.get("file")]
+        for filepath in files:
+            with suppress(OSError):
+                os.unlink(filepath)
+
+    def _work(self):
+        # requests sessions aren't thread-safe, so each worker gets its own. The trace and
+        # cancellation context is per thread too: worker calls are neither traced nor cancellable
+        with _TracedSession() as session:
+            while not self.discarded:
+                try:
+                    job = self._pending.get_nowait()
+                except queue.Empty:
+                    return
+                try:
+                    self._run(job, session)
+                except Exception as e:
+                    self.update(job, state="failed", error=str(e))
+
+    def _run(self, job, session):
+        self.update(job, state="submitting")
+        data = BlenderMCPServer._submit_rodin_job(self.mode, self.api_key, text_prompt=job["prompt"],
+                                                  bbox_condition=job["bbox_condition"], session=session)
+        if self.mode == "MAIN_SITE":
+            if not data.get("submit_time"):
+                raise RuntimeError(f"Submission failed: {data}")
+            ids = {"task_uuid": data["uuid"], "subscription_key": data["jobs"]["subscription_key"]}
+            status_key, download_key = ids["subscription_key"], ids["task_uuid"]
+        else:
+            if not data.get("request_id"):
+                raise RuntimeError(f"Submission failed: {data}")
+            ids = {"request_id": data["request_id"]}
+            status_key = download_key = ids["request_id"]
+        self.update(job, state="generating", **ids)
+
+        deadline = time.monotonic() + RODIN_BATCH_TIMEOUT
+        failures = 0
+        while True:
+            if self.discarded:
+                return
+            try:
+                status = BlenderMCPServer._rodin_job_status(self.mode, self.api_key, status_key, session=session)
+                failures = 0
+            except (requests.exceptions.RequestException, ValueError, KeyError) as e:
+                # The job is already paid for: ride out a few transient errors before giving up on it
+                failures += 1
+                if failures > RODIN_BATCH_STATUS_RETRIES:
+                    raise RuntimeError(f"Status check failed {failures} times: {str(e)}")
+                time.sleep(RODIN_BATCH_POLL_INTERVAL)
+                continue
+            if self.mode == "MAIN_SITE":
+                statuses = status["status_list"]
+                if "Failed" in statuses or "Canceled" in statuses:
+                    raise RuntimeError(f"Generation failed: {statuses}")
+                if statuses and all(s == "Done" for s in statuses):
+                    break
+            elif status.get("status") == "COMPLETED":
+                break
+            elif status.get("status") not in ("IN_QUEUE", "IN_PROGRESS"):
+                raise RuntimeError(f"Generation failed: {status}")
+            if time.monotonic() > deadline:
+                raise TimeoutError("Generation did not finish in time")
+            time.sleep(RODIN_BATCH_POLL_INTERVAL)
+
+        if self.discarded:
+            return
+        self.update(job, state="downloading")
+        filepath = BlenderMCPServer._download_rodin_glb(self.mode, self.api_key, download_key, session=session)
+        with self._lock:
+            discarded = self.discarded
+            if not discarded:
+                job.update(state="ready", file=filepath)
+        if discarded:
+            # Evicted while downloading: nothing will import the file
+            with suppress(OSError):
+                os.unlink(filepath)
+
+    def ready_jobs(self):
+        with self._lock:
+            return [job for job in self.jobs if job["state"] == "ready"]
+
+    def snapshot(self):
+        """The batch as JSON, without local file paths"""
+        with self._lock:
+            jobs = [{k: v for k, v in job.items() if k != "file"} for job in self.jobs]
+        counts = {}
+        for job in jobs:
+            counts[job["state"]] = counts.get(job["state"], 0) + 1
+        return {
+            "batch_id": self.id,
+            "mode": self.mode,
+            "jobs": jobs,
+            "counts": counts,
+            # Every job has either failed or has a model to import (or imported)
+            "done": all(job["state"] in ("ready", "imported", "failed") for job in jobs),
+        }
+#endregion
+
+#region GLB import
+# Single-mesh GLBs (what Rodin returns) are built straight from the binary
+# chunk with foreach_set instead of the glTF operator, so importing one does
+# not depend on the size of the scene. Anything else still uses the operator.
+GLB_COMPONENT_FORMATS = {5121: "B", 5123: "H", 5125: "I", 5126: "f"}  # glTF componentType -> struct format
+GLB_TYPE_WIDTHS = {"SCALAR": 1, "VEC2": 2, "VEC3": 3, "VEC4": 4}
+GLB_IMAGE_TYPES = ("image/png", "image/jpeg")
+# glTF is Y-up, Blender Z-up
+GLB_AXIS_CONVERSION = ((1, 0, 0, 0), (0, 0, -1, 0), (0, 1, 0, 0), (0, 0, 0, 1))
+
+
+class _UnsupportedGLB(Exception):
+    """The file needs the full glTF importer"""
+
+
+def _glb_accessor(document, binary, index, types, formats):
+    """Flat memoryview over an accessor's components in the binary chunk, without copying"""
+    accessor = document["accessors"][index]
+    fmt = GLB_COMPONENT_FORMATS.get(accessor["componentType"])
+    if accessor["type"] not in types or fmt not in formats:
+        raise _UnsupportedGLB(f"{accessor['type']} accessor of component type {accessor['componentType']}")
+    if accessor.get("sparse") or accessor.get("normalized") or "bufferView" not in accessor:
+        raise _UnsupportedGLB("sparse or normalized accessor")
+    view = document["bufferViews"][accessor["bufferView"]]
+    if binary is None or view.get("buffer", 0) != 0:
+        raise _UnsupportedGLB("external buffer")
+    component_size = struct.calcsize(fmt)
+    width = GLB_TYPE_WIDTHS[accessor["type"]]
+    if view.get("byteStride", component_size * width) != component_size * width:
+        raise _UnsupportedGLB("interleaved vertex data")
+    start = view.get("byteOffset", 0) + accessor.get("byteOffset", 0)
+    end = start + accessor["count"] * width * component_size
+    if end > len(binary):
+        raise _UnsupportedGLB("accessor outside the binary chunk")
+    return binary[start:end].cast(fmt)
+
+
+def _glb_material_images(document, binary, index):
+    """{pbr binding: glTF image index} and {image index: encoded bytes} of a material the "pbr" template can rebuild"""
+    material = document["materials"][index]
+    pbr = material.get("pbrMetallicRoughness", {})
+    if material.get("extensions") or material.get("alphaMode", "OPAQUE") != "OPAQUE" or material.get("emissiveTexture"):
+        raise _UnsupportedGLB("material extensions, transparency or emission")
+    if any(material.get("emissiveFactor", [0, 0, 0])) or any(v != 1 for v in pbr.get("baseColorFactor", [1, 1, 1, 1])) \
+            or pbr.get("metallicFactor", 1) != 1 or pbr.get("roughnessFactor", 1) != 1:
+        raise _UnsupportedGLB("material factors")
+    if "baseColorTexture" not in pbr or "metallicRoughnessTexture" not in pbr:
+        raise _UnsupportedGLB("untextured material")
+
+    def source(texture_info):
+        if texture_info.get("texCoord", 0) or texture_info.get("extensions"):
+            raise _UnsupportedGLB("texture transform or second UV map")
+        texture = document["textures"][texture_info["index"]]
+        if texture.get("extensions") or "source" not in texture:
+            raise _UnsupportedGLB("texture extensions")
+        return texture["source"]
+
+    # glTF packs roughness and metallic into G and B like Poly Haven's "arm" maps. Occlusion is
+    # not used for shading, the same as with the glTF operator
+    bindings = {"color": source(pbr["baseColorTexture"]), "arm": source(pbr["metallicRoughnessTexture"])}
+    normal = material.get("normalTexture")
+    if normal:
+        if normal.get("scale", 1) != 1:
+            raise _UnsupportedGLB("scaled normal map")
+        bindings["normal"] = source(normal)
+
+    images = {}
+    for image_index in set(bindings.values()):
+        image = document["images"][image_index]
+        if image.get("mimeType") not in GLB_IMAGE_TYPES or "bufferView" not in image:
+            raise _UnsupportedGLB("external or unsupported image")
+        view = document["bufferViews"][image["bufferView"]]
+        start = view.get("byteOffset", 0)
+        images[image_index] = binary[start:start + view["byteLength"]]
+    return bindings, images
+
+
+def _parse_simple_glb(filepath):
+    """Everything needed to build a single-mesh GLB, as views into the file's data"""
+    with open(filepath, "rb") as f:
+        data = memoryview(f.read())
+    magic, version, length = struct.unpack_from("<4sII", data)
+    if magic != b"glTF" or version != 2:
+        raise _UnsupportedGLB("not a glTF 2.0 binary")
+    document = binary = None
+    offset = 12
+    while offset + 8 <= min(length, len(data)):
+        chunk_length, chunk_type = struct.unpack_from("<I4s", data, offset)
+        chunk = data[offset + 8:offset + 8 + chunk_length]
+        if chunk_type == b"JSON":
+            document = json.loads(bytes(chunk))
+        elif chunk_type == b"BIN\x00" and binary is None:
+            binary = chunk
+        offset += 8 + chunk_length
+    if document is None:
+        raise _UnsupportedGLB("no JSON chunk")
+
+    if document.get("extensionsRequired") or document.get("skins") or document.get("animations"):
+        raise _UnsupportedGLB("required extensions, skins or animation")
+    meshes = document.get("meshes", [])
+    mesh_nodes = [node for node in document.get("nodes", []) if "mesh" in node]
+    if len(meshes) != 1 or len(mesh_nodes) != 1 or len(meshes[0]["primitives"]) != 1:
+        raise _UnsupportedGLB("more than one mesh or primitive")
+    node = mesh_nodes[0]
+    primitive = meshes[0]["primitives"][0]
+    if "matrix" in node or primitive.get("mode", 4) != 4 or primitive.get("targets"):
+        raise _UnsupportedGLB("node matrix, non-triangle primitive or shape keys")
+
+    attributes = primitive["attributes"]
+    positions = _glb_accessor(document, binary, attributes["POSITION"], ("VEC3",), "f")
+    normals = uvs = None
+    if "NORMAL" in attributes:
+        normals = _glb_accessor(document, binary, attributes["NORMAL"], ("VEC3",), "f")
+    if "TEXCOORD_0" in attributes:
+        uvs = _glb_accessor(document, binary, attributes["TEXCOORD_0"], ("VEC2",), "f")
+    vertex_count = len(positions) // 3
+    if "indices" in primitive:
+        indices = _glb_accessor(document, binary, primitive["indices"], ("SCALAR",), "BHI")
+        # foreach_set wants signed ints: reinterpret 32-bit indices, widen smaller ones
+        indices = indices.cast("B").cast("i") if indices.format == "I" else array.array("i", indices)
+    else:
+        indices = array.array("i", range(vertex_count))
+    if len(indices) % 3 or (len(indices) and (max(indices) >= vertex_count or min(indices) < 0)):
+        raise _UnsupportedGLB("invalid triangle indices")
+
+    bindings, images = {}, {}
+    if primitive.get("material") is not None:
+        bindings, images = _glb_material_images(document, binary, primitive["material"])
+
+    return {
+        "name": node.get("name") or meshes[0].get("name") or os.path.splitext(os.path.basename(filepath))[0],
+        "node": node,
+        "positions": positions,
+        "normals": normals,
+        "uvs": uvs,
+        "indices": indices,
+        "bindings": bindings,
+        "images": images,
+    }
+
+
+def _build_glb_object(glb, name):
+    """Create and link the mesh object of a parsed single-mesh GLB"""
+    positions, indices = glb["positions"], glb["indices"]
+    loop_count = len(indices)
+    face_count = loop_count // 3
+
+    mesh = bpy.data.meshes.new(name)
+    mesh.vertices.add(len(positions) // 3)
+    mesh.vertices.foreach_set("co", positions)
+    mesh.loops.add(loop_count)
+    mesh.loops.foreach_set("vertex_index", indices)
+    mesh.polygons.add(face_count)
+    mesh.polygons.foreach_set("loop_start", array.array("i", range(0, loop_count, 3)))
+    if bpy.app.version < (4, 0, 0):
+        mesh.polygons.foreach_set("loop_total", array.array("i", [3]) * face_count)
+    # Drops degenerate triangles (repeated vertex indices) and other invalid geometry
+    if mesh.validate():
+        loop_count = len(mesh.loops)
+        face_count = len(mesh.polygons)
+        indices = array.array("i", bytes(4 * loop_count))
+        mesh.loops.foreach_get("vertex_index", indices)
+    mesh.update(calc_edges=True)
+
+    if glb["uvs"] is not None:
+        uvs = glb["uvs"]
+        u = uvs[0::2]
+        v = array.array("f", (1.0 - value for value in uvs[1::2]))  # glTF's V axis points down
+        loop_uvs = array.array("f", bytes(8 * loop_count))
+        loop_uvs[0::2] = array.array("f", map(u.__getitem__, indices))
+        loop_uvs[1::2] = array.array("f", map(v.__getitem__, indices))
+        mesh.uv_layers.new(name="UVMap").data.foreach_set("uv", loop_uvs)
+
+    if glb["normals"] is not None:
+        normals = glb["normals"]
+        if bpy.app.version < (4, 1, 0):
+            mesh.use_auto_smooth = True
+        mesh.polygons.foreach_set("use_smooth", [True] * face_count)
+        mesh.normals_split_custom_set_from_vertices(list(zip(normals[0::3], normals[1::3], normals[2::3])))
+
+    # Custom normals are stored relative to the faces, so they follow the rotation
+    mesh.transform(mathutils.Matrix(GLB_AXIS_CONVERSION))
+
+    if glb["bindings"]:
+        images = {}
+        for image_index, data in glb["images"].items():
+            label = next(binding for binding, i in glb["bindings"].items() if i == image_index)
+            image = bpy.data.images.new(f"{name}_{label}", 8, 8)
+            image.pack(data=bytes(data), data_len=len(data))
+            image.source = 'FILE'
+            images[image_index] = image.name
+        bindings = {binding: images[i] for binding, i in glb["bindings"].items()}
+        bindings["skip_ao"] = True
+        material = bpy.data.materials.new(name=name)
+        _instantiate_template(material, "pbr", bindings)
+        mesh.materials.append(material)
+
+    obj = bpy.data.objects.new(name, mesh)
+    node = glb["node"]
+    translation = node.get("translation", [0, 0, 0])
+    obj.location = (translation[0], -translation[2], translation[1])
+    if "rotation" in node:
+        x, y, z, w = node["rotation"]
+        obj.rotation_euler = mathutils.Quaternion((w, x, -z, y)).to_euler()
+    if "scale" in node:
+        scale = node["scale"]
+        obj.scale = (scale[0], scale[2], scale[1])
+    bpy.context.collection.objects.link(obj)
+    return obj
+
+
+def _import_simple_glb(filepath, name=None):
+    """
+    Import a single-mesh GLB without the glTF operator.
+
+    Returns the new object, or None when the file needs the operator (several
+    meshes, skins, animation, extensions, materials the "pbr" template can't express).
+    """
+    try:
+        glb = _parse_simple_glb(filepath)
+    except (_UnsupportedGLB, KeyError, IndexError, TypeError, ValueError, struct.error) as e:
+        print(f"Importing {os.path.basename(filepath)} with the glTF importer: {e}")
+        return None
+    return _build_glb_object(glb, name or glb["name"])
+#endregion
+
+#region Animation sampling
+# Transforms over many frames are evaluated straight from the F-curves when
+# only keyframes move the target. Constraints, transform drivers, NLA strips,
+# rigid bodies and unusual parenting (including curve paths) need the depsgraph:
+# one scene.frame_set per frame.
+TRANSFORM_DATA_PATHS = ("location", "rotation_", "scale", "delta_", "pose.bones")
+
+
+def _rotation_property(owner):
+    return {"QUATERNION": "rotation_quaternion", "AXIS_ANGLE": "rotation_axis_angle"}.get(owner.rotation_mode, "rotation_euler")
+
+
+def _action_fcurves(animation_data):
+    """F-curves of the action assigned to animation data, or None"""
+    action = animation_data.action if animation_data else None
+    if action is None:
+        return None
+    if not hasattr(animation_data, "action_slot"):
+        return action.fcurves
+    # Layered actions keep their curves in the assigned slot's channel bag
+    slot = animation_data.action_slot
+    if slot is None:
+        return None
+    from bpy_extras import anim_utils
+    channelbag = anim_utils.action_get_channelbag_for_slot(action, slot)
+    return channelbag.fcurves if channelbag else None
+
+
+def _animation_blocker(animation_data):
+    if animation_data is None:
+        return None
+    if any(driver.data_path.startswith(TRANSFORM_DATA_PATHS) for driver in animation_data.drivers):
+        return "drivers"
+    if any(not track.mute for track in animation_data.nla_tracks):
+        return "NLA tracks"
+    if animation_data.action and (animation_data.action_influence < 1.0 or animation_data.action_blend_type != 'REPLACE'):
+        return "action blending"
+    return None
+
+
+def _object_blocker(obj):
+    """Why obj's world transform can't be evaluated from F-curves alone, or None"""
+    while obj is not None:
+        if obj.constraints:
+            return f"constraints on {obj.name}"
+        reason = _animation_blocker(obj.animation_data)
+        if reason:
+            return f"{reason} on {obj.name}"
+        if any(obj.delta_location) or any(obj.delta_rotation_euler) or any(obj.delta_rotation_quaternion[1:]) \
+                or tuple(obj.delta_scale) != (1.0, 1.0, 1.0):
+            return f"delta transforms on {obj.name}"
+        if obj.rigid_body is not None and obj.rigid_body.type == 'ACTIVE':
+            return f"rigid body simulation of {obj.name}"
+        if obj.parent is not None:
+            if obj.parent_type == 'BONE':
+                pose_bone = obj.parent.pose.bones.get(obj.parent_bone) if obj.parent.pose else None
+                if pose_bone is None:
+                    return f"missing parent bone of {obj.name}"
+                reason = _bone_blocker(obj.parent, pose_bone)
+                if reason:
+                    return reason
+            elif obj.parent_type != 'OBJECT':
+                return f"{obj.parent_type.lower()} parenting of {obj.name}"
+            elif obj.parent.type == 'CURVE' and obj.parent.data.use_path:
+                # Children of a path curve travel along it (the "follow path" parenting)
+                return f"curve path parenting of {obj.name}"
+        obj = obj.parent
+    return None
+
+
+def _bone_blocker(armature, pose_bone):
+    """Why a pose bone's armature-space matrix can't be evaluated from F-curves alone, or None"""
+    if armature.data.pose_position != 'POSE':
+        return f"{armature.name} shows its rest position"
+    # Any constraint (IK especially) can move bones other than its own
+    if any(other.constraints for other in armature.pose.bones):
+        return f"bone constraints on {armature.name}"
+    while pose_bone is not None:
+        bone = pose_bone.bone
+        if not bone.use_inherit_rotation or bone.inherit_scale != 'FULL' or not bone.use_local_location \
+                or bone.use_relative_parent:
+            return f"inheritance options of bone {pose_bone.name}"
+        pose_bone = pose_bone.parent
+    return None
+
+
+class _TransformSampler:
+    """World matrices of objects and armature-space matrices of pose bones at a list of frames"""
+
+    def __init__(self, frames):
+        self.frames = frames
+        self._objects = {}  # object name -> [Matrix]
+        self._bones = {}  # (armature name, bone name) -> [Matrix]
+
+    def _basis(self, owner, fcurves, prefix, use_location=True):
+        """Per-frame local matrices of an object or pose bone from its transform channels"""
+        rotation = _rotation_property(owner)
+        columns = {}
+        for name in ("location", rotation, "scale"):
+            values = []
+            for index, value in enumerate(getattr(owner, name)):
+                fcurve = fcurves.find(prefix + name, index=index) if fcurves is not None else None
+                if name == "location" and not use_location:
+                    value, fcurve = 0.0, None
+                if fcurve is not None and not fcurve.mute:
+                    values.append([fcurve.evaluate(frame) for frame in self.frames])
+                else:
+                    values.append([value] * len(self.frames))
+            columns[name] = list(zip(*values))
+
+        mode = owner.rotation_mode
+        matrices = []
+        for location, rotation_value, scale in zip(columns["location"], columns[rotation], columns["scale"]):
+            if mode == 'QUATERNION':
+                rotation_matrix = mathutils.Quaternion(rotation_value).normalized().to_matrix()
+            elif mode == 'AXIS_ANGLE':
+                rotation_matrix = mathutils.Matrix.Rotation(rotation_value[0], 3, rotation_value[1:])
+            else:
+                rotation_matrix = mathutils.Euler(rotation_value, mode).to_matrix()
+            matrices.append(mathutils.Matrix.LocRotScale(location, rotation_matrix, scale))
+        return matrices
+
+    def object_world(self, obj):
+        matrices = self._objects.get(obj.name)
+        if matrices is None:
+            basis = self._basis(obj, _action_fcurves(obj.animation_data), "")
+            parent = obj.parent
+            if parent is None:
+                matrices = basis
+            else:
+                if obj.parent_type == 'BONE':
+                    pose_bone = parent.pose.bones[obj.parent_bone]
+                    # Bone children hang from the tail of the bone
+                    tail = mathutils.Matrix.Translation((0.0, pose_bone.bone.length, 0.0))
+                    parents = [world @ pose @ tail
+                               for world, pose in zip(self.object_world(parent), self.bone_pose(parent, pose_bone))]
+                else:
+                    parents = self.object_world(parent)
+                inverse = obj.matrix_parent_inverse
+                matrices = [parent_matrix @ inverse @ local for parent_matrix, local in zip(parents, basis)]
+            self._objects[obj.name] = matrices
+        return matrices
+
+    def bone_pose(self, armature, pose_bone):
+        key = (armature.name, pose_bone.name)
+        matrices = self._bones.get(key)
+        if matrices is None:
+            bone = pose_bone.bone
+            prefix = f'pose.bones["{bpy.utils.escape_identifier(pose_bone.name)}"].'
+            # Connected bones ignore their location channels
+            basis = self._basis(pose_bone, _action_fcurves(armature.animation_data), prefix,
+                                use_location=not bone.use_connect)
+            if pose_bone.parent is None:
+                matrices = [bone.matrix_local @ local for local in basis]
+            else:
+                offset = pose_bone.parent.bone.matrix_local.inverted() @ bone.matrix_local
+                matrices = [parent_matrix @ offset @ local
+                            for parent_matrix, local in zip(self.bone_pose(armature, pose_bone.parent), basis)]
+            self._bones[key] = matrices
+        return matrices
+
+
+def _frame_list(frames=None, frame_start=None, frame_end=None, frame_step=1):
+    """Explicit frames, or a range that defaults to the scene's"""
+    if frames is not None:
+        return [float(frame) for frame in frames]
+    scene = bpy.context.scene
+    start = scene.frame_start if frame_start is None else frame_start
+    end = scene.frame_end if frame_end is None else frame_end
+    step = frame_step if frame_step and frame_step > 0 else 1
+    count = int(math.floor((end - start) / step + 1e-9)) + 1
+    return [float(start + i * step) for i in range(max(count, 0))]
+
+
+def _set_frame(scene, frame):
+    whole = math.floor(frame)
+    scene.frame_set(int(whole), subframe=frame - whole)
+
+
+def _sample_world_matrices(targets, frames):
+    """
+    World matrices of (object, pose bone or None) targets at each frame.
+
+    Returns ([[Matrix per frame] per target], [depsgraph reason or None per target]).
+    """
+    reasons = [_object_blocker(obj) or (_bone_blocker(obj, pose_bone) if pose_bone else None)
+               for obj, pose_bone in targets]
+    sampler = _TransformSampler(frames)
+    matrices = []
+    for (obj, pose_bone), reason in zip(targets, reasons):
+        if reason is not None:
+            matrices.append([])
+        elif pose_bone is None:
+            matrices.append(sampler.object_world(obj))
+        else:
+            matrices.append([world @ pose for world, pose in zip(sampler.object_world(obj), sampler.bone_pose(obj, pose_bone))])
+
+    fallback = [i for i, reason in enumerate(reasons) if reason is not None]
+    if fallback:
+        scene = bpy.context.scene
+        current = scene.frame_current + scene.frame_subframe
+        try:
+            for frame in frames:
+                _check_cancelled()
+                _set_frame(scene, frame)
+                for i in fallback:
+                    obj, pose_bone = targets[i]
+                    matrices[i].append(obj.matrix_world @ pose_bone.matrix if pose_bone else obj.matrix_world.copy())
+        finally:
+            _set_frame(scene, current)
+    return matrices, reasons
+#endregion
+
+#region Keyframe writing
+# Whole F-curves are written at once: keyframe_points.add, then one foreach_set
+# per attribute, instead of a keyframe_insert (and often a frame_set) per key.
+
+
+def _ensure_channels(id_data):
+    """The action (or, for layered actions, the slot's channel bag) holding id_data's F-curves, created if missing"""
+    animation_data = id_data.animation_data or id_data.animation_data_create()
+    action = animation_data.action
+    if action is None:
+        action = bpy.data.actions.new(f"{id_data.name}Action")
+        animation_data.action = action
+    if not hasattr(animation_data, "action_slot"):
+        return action
+    slot = animation_data.action_slot
+    if slot is None:
+        slot = action.slots.new(id_data.id_type, id_data.name)
+        animation_data.action_slot = slot
+    layer = action.layers[0] if action.layers else action.layers.new("Layer")
+    strip = layer.strips[0] if layer.strips else layer.strips.new(type='KEYFRAME')
+    return strip.channelbag(slot, ensure=True)
+
+
+def _write_fcurve(channels, data_path, index, frames, values, interpolation="BEZIER", group=None):
+    """Replace the F-curve for data_path[index] with one key per frame"""
+    fcurve = channels.fcurves.find(data_path, index=index)
+    if fcurve is not None:
+        channels.fcurves.remove(fcurve)
+    fcurve = channels.fcurves.new(data_path, index=index)
+    if group:
+        fcurve.group = channels.groups.get(group) or channels.groups.new(group)
+
+    count = len(frames)
+    points = fcurve.keyframe_points
+    points.add(count)
+    co = [0.0] * (2 * count)
+    co[0::2] = frames
+    co[1::2] = values
+    points.foreach_set("co", co)
+    interpolation_value = bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items[interpolation].value
+    points.foreach_set("interpolation", [interpolation_value] * count)
+    # Sorts the keys and recalculates the auto handles
+    fcurve.update()
+    return fcurve
+#endregion
+
+#region Motion paths
+# World positions over a frame range, computed from the data instead of with
+# the paths_calculate operator (no selection or context changes). Results are
+# cached under a digest of everything the F-curve sampler reads, so rebuilding
+# a curve or camera from an unchanged animation skips the sampling.
+MOTION_PATH_CACHE_SIZE = 16
+MOTION_PATH_CACHE_TTL = 600  # Seconds
+KEYFRAME_DIGEST_ATTRIBUTES = (("co", "f", 2), ("handle_left", "f", 2), ("handle_right", "f", 2),
+                              ("interpolation", "i", 1), ("easing", "i", 1),
+                              ("back", "f", 1), ("amplitude", "f", 1), ("period", "f", 1))
+# F-curve modifier properties that only affect the UI
+FMODIFIER_UI_PROPERTIES = {"rna_type", "active", "show_expanded"}
+
+
+def _rna_values(struct):
+    """struct's RNA property values as plain data, with collections (envelope points) expanded"""
+    values = []
+    for prop in struct.bl_rna.properties:
+        if prop.identifier in FMODIFIER_UI_PROPERTIES or prop.type == 'POINTER':
+            continue
+        value = getattr(struct, prop.identifier)
+        if prop.type == 'COLLECTION':
+            value = [_rna_values(item) for item in value]
+        elif getattr(prop, "array_length", 0):
+            value = tuple(value)
+        values.append((prop.identifier, value))
+    return values
+
+
+def _digest_fcurves(hasher, fcurves):
+    for fcurve in fcurves or ():
+        points = fcurve.keyframe_points
+        hasher.update(repr((fcurve.data_path, fcurve.array_index, fcurve.mute, fcurve.extrapolation, len(points),
+                            [_rna_values(modifier) for modifier in fcurve.modifiers])).encode())
+        for attribute, typecode, width in KEYFRAME_DIGEST_ATTRIBUTES:
+            values = array.array(typecode, bytes(4 * width * len(points)))
+            points.foreach_get(attribute, values)
+            hasher.update(values)
+
+
+def _digest_channels(hasher, owner, fcurves, prefix):
+    """Rotation mode and the transform values that no F-curve overrides"""
+    animated = {(fcurve.data_path, fcurve.array_index) for fcurve in fcurves or () if not fcurve.mute}
+    static = [owner.rotation_mode]
+    for name in ("location", _rotation_property(owner), "scale"):
+        static.append([value for index, value in enumerate(getattr(owner, name))
+                       if (prefix + name, index) not in animated])
+    hasher.update(repr(static).encode())
+
+
+def _motion_digest(obj):
+    """Digest of the animation, transforms and parenting that determine obj's world motion"""
+    hasher = hashlib.blake2b(digest_size=16)
+    while obj is not None:
+        fcurves = _action_fcurves(obj.animation_data)
+        hasher.update(repr((obj.name, obj.parent_type, obj.parent_bone,
+                            [tuple(row) for row in obj.matrix_parent_inverse])).encode())
+        _digest_channels(hasher, obj, fcurves, "")
+        _digest_fcurves(hasher, fcurves)
+        parent = obj.parent
+        if parent is not None and obj.parent_type == 'BONE':
+            parent_fcurves = _action_fcurves(parent.animation_data)
+            pose_bone = parent.pose.bones[obj.parent_bone]
+            while pose_bone is not None:
+                bone = pose_bone.bone
+                hasher.update(repr((bone.name, bone.length, bone.use_connect,
+                                    [tuple(row) for row in bone.matrix_local])).encode())
+                prefix = f'pose.bones["{bpy.utils.escape_identifier(pose_bone.name)}"].'
+                _digest_channels(hasher, pose_bone, parent_fcurves, prefix)
+                pose_bone = pose_bone.parent
+        obj = parent
+    return hasher.hexdigest()
+
+
+def _motion_path(obj, frame_start, frame_end, frame_step=1, cache=None):
+    """
+    World positions of obj at each frame of the range, as a flat float32 [x, y, z, ...] array.
+
+    Returns (frames, positions, depsgraph reason or None, cached). Motion that the
+    F-curves fully describe is cached; anything else is sampled with frame_set each time.
+    """
+    frames = _frame_list(frame_start=frame_start, frame_end=frame_end, frame_step=frame_step)
+    reason = _object_blocker(obj)
+    key = None
+    if reason is None and cache is not None:
+        key = (obj.name, frames[0] if frames else None, len(frames), frame_step, _motion_digest(obj))
+        positions = cache.get(key)
+        if positions is not None:
+            return frames, positions, None, True
+
+    (matrices,), _ = _sample_world_matrices([(obj, None)], frames)
+    positions = array.array("f")
+    for matrix in matrices:
+        positions.extend(matrix.translation)
+    if key is not None:
+        cache.put(key, positions)
+    return frames, positions, reason, False
+#endregion
+
+#region Follow path
+# A camera that follows a curve through an object's motion path. offset_factor
+# is keyed from the distance travelled along the path, not from the frame
+# number, so the follower keeps the source's speed changes.
+FOLLOW_PATH_CONSTRAINT = "Follow Path"
+
+
+def _keyed_frames(fcurves, data_path):
+    """Sorted distinct frames keyed on any channel of data_path"""
+    frames = set()
+    for fcurve in fcurves or ():
+        if fcurve.data_path == data_path:
+            co = array.array("f", bytes(8 * len(fcurve.keyframe_points)))
+            fcurve.keyframe_points.foreach_get("co", co)
+            frames.update(co[0::2])
+    return sorted(frames)
+
+
+def _path_lengths(points):
+    """Cumulative distance along a flat [x, y, z, ...] point array, starting at 0"""
+    if numpy is not None:
+        xyz = numpy.asarray(points, dtype=numpy.float64).reshape(-1, 3)
+        lengths = numpy.zeros(len(xyz))
+        numpy.cumsum(numpy.linalg.norm(numpy.diff(xyz, axis=0), axis=1), out=lengths[1:])
+        return lengths
+    xyz = [points[i:i + 3] for i in range(0, len(points), 3)]
+    return [0.0] + list(itertools.accumulate(math.dist(a, b) for a, b in zip(xyz, xyz[1:])))
+
+
+def _interpolate(x, xp, fp):
+    """Piecewise-linear fp(xp) at each x, clamped to the ends; xp is increasing"""
+    if numpy is not None:
+        return numpy.interp(x, xp, fp).tolist()
+    values = []
+    for value in x:
+        i = bisect.bisect_right(xp, value)
+        if i == 0:
+            values.append(fp[0])
+        elif i == len(xp):
+            values.append(fp[-1])
+        else:
+            t = (value - xp[i - 1]) / (xp[i] - xp[i - 1])
+            values.append(fp[i - 1] + t * (fp[i] - fp[i - 1]))
+    return values
+
+
+def _replace_object(name, data):
+    """A new object called name linked to the scene, replacing any existing one along with data only it used"""
+    existing = bpy.data.objects.get(name)
+    if existing is not None:
+        # Left behind, the old curve/camera and action would pile up as name.001, name.002, ...
+        old_data = existing.data
+        actions = [owner.animation_data.action for owner in (existing, old_data)
+                   if owner is not None and owner.animation_data and owner.animation_data.action]
+        bpy.data.objects.remove(existing, do_unlink=True)
+        if old_data is not None and old_data != data and old_data.users == 0:
+            bpy.data.batch_remove([old_data])
+        orphans = [action for action in actions if action.users == 0]
+        if orphans:
+            bpy.data.batch_remove(orphans)
+        if data is not None:
+            data.name = name
+    obj = bpy.data.objects.new(name, data)
+    bpy.context.collection.objects.link(obj)
+    return obj
+#endregion
+
+#region Camera sequences
+# Photogrammetry imports (Monst3r, COLMAP) bring one static camera per frame.
+# Baking them into one animated camera reads each world matrix once and
+# writes every channel as a whole F-curve.
+
+
+def _natural_key(name):
+    """Sort key that orders camera_2 before camera_10"""
+    return [int(part) if i % 2 else part.lower() for i, part in enumerate(re.split(r"(\d+)", name))]
+
+
+def _camera_rotations(matrices, quaternion):
+    """Flat rotation values per matrix, kept continuous so interpolation doesn't spin the long way round"""
+    values = array.array("f")
+    previous = None
+    for matrix in matrices:
+        if quaternion:
+            rotation = matrix.to_quaternion()
+            if previous is not None and previous.dot(rotation) < 0.0:
+                rotation.negate()
+        else:
+            rotation = matrix.to_euler('XYZ', previous) if previous is not None else matrix.to_euler('XYZ')
+        values.extend(rotation)
+        previous = rotation
+    return values
+#endregion
+
+class _ClientConnection:
+    """One client socket; buffers are owned by the server thread, output is shared with the main thread"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, sock, address):
+        self.id = next(self._ids)
+        self.sock = sock
+        self.address = address
+        self.inbuf = bytearray()
+        self.receive_start_ns = None
+        self.codec = None  # None until the client negotiates framing
+        self.events = selectors.EVENT_READ
+        self.reading = True
+        self.closed = False
+        # Responses are queued from the main thread and flushed by the server thread
+        self.lock = threading.Lock()
+        self.outbuf = deque()
+        self.out_bytes = 0
+
+
+class _QueuedCommand:
+    """A received command waiting for the main thread"""
+
+    def __init__(self, connection, command, trace, priority):
+        self.connection = connection
+        self.command = command
+        self.trace = trace
+        self.priority = priority
+        self.queued_ns = time.time_ns()
+        self.request_id = command.get("id")
+        # The client's timeout becomes a deadline measured from receipt
+        timeout = command.get("timeout")
+        self.deadline = time.monotonic() + timeout if timeout else None
+        self.cancelled = False
+        self.idempotency_key = command.get("idempotency_key")
+
+    def expired(self):
+        return self.deadline is not None and time.monotonic() > self.deadline
+
+    def should_stop(self):
+        # A keyed command runs to completion past its deadline: the client's retry collects the result
+        return self.cancelled or (self.expired() and not self.idempotency_key)
+
+
+class _CommandQueue:
+    """
+    Bounded multi-client queue: strict priority between classes and
+    round-robin between clients within a class, so one client can't starve others.
+    """
+
+    def __init__(self, max_queued=MAX_QUEUED_COMMANDS, max_per_client=MAX_QUEUED_PER_CLIENT):
+        self.max_queued = max_queued
+        self.max_per_client = max_per_client
+        self._lock = threading.Lock()
+        # One OrderedDict per priority class: client id -> deque of commands
+        self._classes = [OrderedDict() for _ in PRIORITY_NAMES]
+        self._per_client = {}
+        self.depth = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.executed = 0
+        self.avg_execute_time = 0.01  # Moving average, used for retry_after estimates
+
+    def offer(self, entry):
+        """Queue entry; returns None if admitted, else the seconds the client should wait"""
+        client_id = entry.connection.id
+        with self._lock:
+            client_depth = self._per_client.get(client_id, 0)
+            if client_depth >= self.max_per_client or self.depth >= self.max_queued:
+                self.rejected += 1
+                backlog = client_depth if client_depth >= self.max_per_client else self.depth - self.max_queued // 2
+                return min(max(backlog * self.avg_execute_time, 0.05), 30.0)
+            self._classes[entry.priority].setdefault(client_id, deque()).append(entry)
+            self._per_client[client_id] = client_depth + 1
+            self.depth += 1
+            self.admitted += 1
+            return None
+
+    def pop(self):
+        """Take the next command, or None if the queue is empty"""
+        with self._lock:
+            for clients in self._classes:
+                if not clients:
+                    continue
+                client_id, entries = next(iter(clients.items()))
+                entry = entries.popleft()
+                if entries:
+                    clients.move_to_end(client_id)  # Next client's turn
+                else:
+                    del clients[client_id]
+                self._per_client[client_id] -= 1
+                if not self._per_client[client_id]:
+                    del self._per_client[client_id]
+                self.depth -= 1
+                return entry
+            return None
+
+    def _remove(self, predicate):
+        """Remove and return every queued entry matching predicate; caller holds the lock"""
+        removed = []
+        for clients in self._classes:
+            for client_id in list(clients):
+                entries = clients[client_id]
+                keep = deque(entry for entry in entries if not predicate(entry))
+                removed.extend(entry for entry in entries if predicate(entry))
+                if keep:
+                    clients[client_id] = keep
+                else:
+                    del clients[client_id]
+        for entry in removed:
+            client_id = entry.connection.id
+            self._per_client[client_id] -= 1
+            if not self._per_client[client_id]:
+                del self._per_client[client_id]
+        self.depth -= len(removed)
+        return removed
+
+    def cancel(self, request_id):
+        """Remove a queued command by request id; returns it, or None if it is not queued"""
+        with self._lock:
+            removed = self._remove(lambda entry: entry.request_id == request_id)
+        return removed[0] if removed else None
+
+    def remove_client(self, client_id):
+        """Remove and return every command queued by a client"""
+        with self._lock:
+            return self._remove(lambda entry: entry.connection.id == client_id)
+
+    def record_execution(self, seconds):
+        with self._lock:
+            self.executed += 1
+            self.avg_execute_time += (seconds - self.avg_execute_time) * 0.1
+
+    def clear(self):
+        with self._lock:
+            for clients in self._classes:
+                clients.clear()
+            self._per_client.clear()
+            self.depth = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "depth": self.depth,
+                "depth_by_priority": {
+                    name: sum(len(entries) for entries in clients.values())
+                    for name, clients in zip(PRIORITY_NAMES, self._classes)
+                },
+                "depth_by_client": dict(self._per_client),
+                "max_queued": self.max_queued,
+                "max_queued_per_client": self.max_per_client,
+                "admitted": self.admitted,
+                "rejected": self.rejected,
+                "executed": self.executed,
+                "avg_execute_time": self.avg_execute_time,
+            }
+
+
+class _ResultCache:
+    """Bounded, expiring store of idempotent command results (main thread only)"""
+
+    def __init__(self, max_entries=IDEMPOTENCY_CACHE_SIZE, ttl=IDEMPOTENCY_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # (command type, key) -> (stored at, response)
+        self.hits = 0
+
+    def get(self, command_type, key):
+        """The cached response for a key, or None if absent, expired or its datablocks are gone"""
+        entry = self._entries.get((command_type, key))
+        if entry is None:
+            return None
+        stored_at, response = entry
+        if time.monotonic() - stored_at > self.ttl or not self._datablocks_exist(command_type, response):
+            del self._entries[(command_type, key)]
+            return None
+        self._entries.move_to_end((command_type, key))
+        self.hits += 1
+        return response
+
+    def put(self, command_type, key, response):
+        """Remember a response if the command succeeded"""
+        result = response.get("result")
+        if response.get("status") != "success" or not isinstance(result, dict):
+            return
+        if "error" in result or result.get("success") is False or result.get("succeed") is False:
+            return
+        self._entries[(command_type, key)] = (time.monotonic(), response)
+        self._entries.move_to_end((command_type, key))
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    @staticmethod
+    def _datablocks_exist(command_type, response):
+        """Whether every datablock named in the result is still in the file (it may have been deleted or undone)"""
+        result = response["result"]
+        for field, collection_name in IDEMPOTENT_COMMANDS.get(command_type, {}).items():
+            names = result.get(field)
+            if names is None:
+                continue
+            collection = getattr(bpy.data, collection_name)
+            for name in names if isinstance(names, list) else [names]:
+                if name not in collection:
+                    return False
+        return True
+
+
+class _ExpiringCache:
+    """Small LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (stored at, value)
+
+    def get(self, key):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if time.monotonic() - entry[0] > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return entry[1]
+
+    def put(self, key, value):
+        self._entries[key] = (time.monotonic(), value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
 class BlenderMCPServer:
-    def __init__(self, host='localhost', port=9876):
+    def __init__(self, host='localhost', port=9876, socket_path=None, backlog=SERVER_BACKLOG,
+                 max_queued=MAX_QUEUED_COMMANDS, max_queued_per_client=MAX_QUEUED_PER_CLIENT):
         self.host = host
         self.port = port
+        # Listen on a Unix domain socket at this path instead of TCP
+        self.socket_path = socket_path
+        self.backlog = backlog
         self.running = False
         self.socket = None
         self.server_thread = None
-    
+        self._selector = None
+        self._wakeup_recv = self._wakeup_send = None
+        self._connections = {}  # connection id -> _ClientConnection, owned by the server thread
+        # Profiling state: a fraction of commands to sample globally, whether
+        # to capture tracemalloc snapshots, and a bounded store of results
+        self.profile_sample_rate = 0.0
+        self.profile_trace_memory = False
+        self.profiles = deque(maxlen=PROFILE_STORE_SIZE)
+        self._profile_counter = 0
+        # Work for the main thread when Blender runs without an event loop
+        self._main_thread_queue = queue.Queue()
+        # Admitted commands, drained by one main-thread callback at a time
+        self._command_queue = _CommandQueue(max_queued, max_queued_per_client)
+        self._drain_lock = threading.Lock()
+        self._drain_scheduled = False
+        self._running_entry = None  # The command on the main thread right now
+        # Results of keyed mutating commands, replayed to retries
+        self._results = _ResultCache()
+        self._rodin_batches = OrderedDict()  # batch id -> _RodinBatch
+        self._sketchfab_searches = _ExpiringCache(SKETCHFAB_SEARCH_CACHE_SIZE, SKETCHFAB_SEARCH_TTL)
+        self._motion_paths = _ExpiringCache(MOTION_PATH_CACHE_SIZE, MOTION_PATH_CACHE_TTL)
+
     def start(self):
         if self.running:
             print("Server is already running")
@@ -45,23 +2429,55 @@ class BlenderMCPServer:
         
         try:
             # Create socket
-            self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-            self.socket.bind((self.host, self.port))
-            self.socket.listen(1)
+            if self.socket_path:
+                if os.path.exists(self.socket_path):
+                    os.unlink(self.socket_path)  # Stale socket from a previous session
+                self.socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.socket.bind(self.socket_path)
+                address = self.socket_path
+            else:
+                self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+                self.socket.bind((self.host, self.port))
+                address = f"{self.host}:{self.port}"
+            self.socket.listen(self.backlog)
+            self.socket.setblocking(False)
+            
+            # One selector serves the listener and every client; the socket pair
+            # lets other threads interrupt select() to stop or queue output
+            self._selector = selectors.DefaultSelector()
+            self._wakeup_recv, self._wakeup_send = socket.socketpair()
+            self._wakeup_recv.setblocking(False)
+            self._wakeup_send.setblocking(False)
+            self._selector.register(self.socket, selectors.EVENT_READ)
+            self._selector.register(self._wakeup_recv, selectors.EVENT_READ)
             
             # Start server thread
             self.server_thread = threading.Thread(target=self._server_loop)
             self.server_thread.daemon = True
             self.server_thread.start()
             
-            print(f"BlenderMCP server started on {self.host}:{self.port}")
+            print(f"BlenderMCP server started on {address}")
         except Exception as e:
             print(f"Failed to start server: {str(e)}")
             self.stop()
             
     def stop(self):
         self.running = False
+        self._wakeup()
+        self._command_queue.clear()
+        with self._drain_lock:
+            # A pending drain callback finds the queue empty and exits
+            self._drain_scheduled = False
+        
+        # Wait for thread to finish; it closes the client connections on its way out
+        if self.server_thread:
+            try:
+                if self.server_thread.is_alive():
+                    self.server_thread.join(timeout=1.0)
+            except:
+                pass
+            self.server_thread = None
         
         # Close socket
         if self.socket:
@@ -70,121 +2486,618 @@ class BlenderMCPServer:
             except:
                 pass
             self.socket = None
+            if self.socket_path:
+                with suppress(OSError):
+                    os.unlink(self.socket_path)
         
-        # Wait for thread to finish
-        if self.server_thread:
-            try:
-                if self.server_thread.is_alive():
-                    self.server_thread.join(timeout=1.0)
-            except:
-                pass
-            self.server_thread = None
+        for sock in (self._wakeup_recv, self._wakeup_send):
+            if sock:
+                sock.close()
+        self._wakeup_recv = self._wakeup_send = None
+        if self._selector:
+            self._selector.close()
+            self._selector = None
         
         print("BlenderMCP server stopped")
     
+    def _run_in_main_thread(self, function):
+        """Schedule a callable on Blender's main thread"""
+        if bpy.app.background:
+            # Timers never fire in background mode; serve_forever() drains this queue instead
+            self._main_thread_queue.put(function)
+        else:
+            bpy.app.timers.register(function, first_interval=0.0)
+
+    def serve_forever(self, poll_interval=0.1):
+        """
+        Run scheduled commands on the calling thread until the server stops.
+
+        Only needed for `blender --background`, where bpy.app.timers are not run.
+        Call it from the main thread after start().
+        """
+        while self.running:
+            try:
+                function = self._main_thread_queue.get(timeout=poll_interval)
+            except queue.Empty:
+                continue
+            # Like bpy.app.timers: a returned interval means "run me again"
+            if function() is not None:
+                self._main_thread_queue.put(function)
+
+    def _wakeup(self):
+        """Interrupt the selector thread's select() call"""
+        if self._wakeup_send:
+            with suppress(OSError):  # A full pipe already guarantees a wakeup
+                self._wakeup_send.send(b"\0")
+
     def _server_loop(self):
-        """Main server loop in a separate thread"""
+        """Selector loop serving the listening socket and all clients in one thread"""
         print("Server thread started")
-        self.socket.settimeout(1.0)  # Timeout to allow for stopping
+        try:
+            while self.running:
+                for key, events in self._selector.select():
+                    if not self.running:
+                        break
+                    if key.fileobj is self.socket:
+                        self._accept()
+                    elif key.fileobj is self._wakeup_recv:
+                        with suppress(OSError):
+                            while self._wakeup_recv.recv(4096):
+                                pass
+                    else:
+                        connection = key.data
+                        if events & selectors.EVENT_READ:
+                            self._on_readable(connection)
+                        if events & selectors.EVENT_WRITE and not connection.closed:
+                            self._on_writable(connection)
+                # Output may have been queued from the main thread since the last pass
+                for connection in list(self._connections.values()):
+                    self._update_interest(connection)
+        except Exception as e:
+            print(f"Error in server loop: {str(e)}")
+            traceback.print_exc()
+        finally:
+            for connection in list(self._connections.values()):
+                self._close_connection(connection)
+        
+        print("Server thread stopped")
+
+    def _accept(self):
+        while True:
+            try:
+                client, address = self.socket.accept()
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                print(f"Error accepting connection: {str(e)}")
+                return
+            print(f"Connected to client: {address or 'unix socket'}")
+            client.setblocking(False)
+            connection = _ClientConnection(client, address)
+            self._connections[connection.id] = connection
+            self._selector.register(client, selectors.EVENT_READ, connection)
+
+    def _update_interest(self, connection):
+        """Watch for writability while output is pending; stop reading while it is too large"""
+        if connection.closed:
+            return
+        with connection.lock:
+            pending = connection.out_bytes
+        connection.reading = pending <= CLIENT_BUFFER_LIMIT
+        events = (selectors.EVENT_READ if connection.reading else 0) | (selectors.EVENT_WRITE if pending else 0)
+        if events != connection.events:
+            self._selector.modify(connection.sock, events, connection)
+            connection.events = events
+
+    def _on_readable(self, connection):
+        try:
+            data = connection.sock.recv(RECV_SIZE)
+        except (BlockingIOError, InterruptedError):
+            return
+        except OSError as e:
+            print(f"Error receiving data: {str(e)}")
+            data = b''
+        if not data:
+            print("Client disconnected")
+            self._close_connection(connection)
+            return
+        
+        if not connection.inbuf:
+            connection.receive_start_ns = time.time_ns()
+        connection.inbuf += data
+        try:
+            self._process_input(connection, data)
+        except Exception as e:
+            print(f"Error in client handler: {str(e)}")
+            self._close_connection(connection)
+
+    def _on_writable(self, connection):
+        with connection.lock:
+            try:
+                while connection.outbuf:
+                    chunk = connection.outbuf[0]
+                    sent = connection.sock.send(chunk)
+                    connection.out_bytes -= sent
+                    if sent < len(chunk):
+                        connection.outbuf[0] = chunk[sent:]
+                        break
+                    connection.outbuf.popleft()
+            except (BlockingIOError, InterruptedError):
+                pass
+            except OSError:
+                print("Failed to send response - client disconnected")
+                connection.outbuf.clear()
+                connection.out_bytes = 0
+        self._update_interest(connection)
+
+    def _send(self, connection, payload):
+        """Queue payload for a client; safe to call from any thread"""
+        with connection.lock:
+            if connection.closed:
+                print("Failed to send response - client disconnected")
+                return
+            if not connection.outbuf:
+                # Nothing queued: try to send straight away without a thread hop
+                try:
+                    sent = connection.sock.send(payload)
+                except (BlockingIOError, InterruptedError):
+                    sent = 0
+                except OSError:
+                    print("Failed to send response - client disconnected")
+                    return
+                payload = memoryview(payload)[sent:]
+                if not payload:
+                    return
+            connection.outbuf.append(payload)
+            connection.out_bytes += len(payload)
+        self._wakeup()
+
+    def _close_connection(self, connection):
+        if connection.closed:
+            return
+        with connection.lock:
+            connection.closed = True
+            connection.outbuf.clear()
+            connection.out_bytes = 0
+        self._connections.pop(connection.id, None)
+        # Nobody is left to read the results: drop its queued work and stop its running command
+        dropped = self._command_queue.remove_client(connection.id)
+        if dropped:
+            print(f"Dropped {len(dropped)} queued command(s) of disconnected client {connection.id}")
+        running = self._running_entry
+        if running is not None and running.connection is connection and not running.idempotency_key:
+            running.cancelled = True
+        with suppress(KeyError, ValueError):
+            self._selector.unregister(connection.sock)
+        try:
+            connection.sock.close()
+        except:
+            pass
+        if connection.codec is not None:
+            connection.codec.close()
+        print("Client handler stopped")
+
+    def _process_input(self, connection, data):
+        """Dispatch every complete command in the connection's input buffer"""
+        buffer = connection.inbuf
+        if connection.codec is not None:
+            # Framed protocol: dispatch every complete frame in the buffer
+            codec = connection.codec
+            offset = 0
+            while len(buffer) - offset >= FRAME_HEADER.size:
+                flags, length = FRAME_HEADER.unpack_from(buffer, offset)
+                if length > CLIENT_BUFFER_LIMIT:
+                    raise ValueError(f"Frame of {length} bytes exceeds the limit")
+                end = offset + FRAME_HEADER.size + length
+                if len(buffer) < end:
+                    break
+                command = codec.decode(flags, buffer[offset + FRAME_HEADER.size:end])
+                if codec.ring:
+                    codec.ring.release_sent()
+                self._dispatch(connection, command, connection.receive_start_ns, end - offset)
+                connection.receive_start_ns = time.time_ns()
+                offset = end
+            del buffer[:offset]
+            return
+        
+        if len(buffer) > CLIENT_BUFFER_LIMIT:
+            raise ValueError(f"Unframed command exceeds {CLIENT_BUFFER_LIMIT} bytes")
+        # A JSON object can only be complete once the data ends with its closing brace
+        if not data.rstrip().endswith(b"}"):
+            return
+        try:
+            # Try to parse command
+            command = json.loads(buffer.decode('utf-8'), object_hook=_json_object_hook)
+        except json.JSONDecodeError:
+            # Incomplete data, wait for more
+            return
+        received_bytes = len(buffer)
+        buffer.clear()
+        
+        if command.get("type") == "negotiate_protocol":
+            # Answered on this thread, in plain JSON, before switching to frames
+            params = command.get("params", {})
+            response = self.negotiate_protocol(**params)
+            if response["status"] == "success":
+                result = response["result"]
+                ring = self._attach_ring(params.get("shared_memory"))
+                result["shared_memory"] = ring is not None
+                connection.codec = _FrameCodec(result["encoding"], result["compression"],
+                                               result["compression_threshold"], result["compression_level"],
+                                               ring, ring and params["shared_memory"].get("threshold", 0))
+                print(f"Client negotiated {result['encoding']} frames, compression: {result['compression']}, "
+                      f"shared memory: {ring is not None}")
+            self._send(connection, json.dumps(response).encode('utf-8'))
+            return
+        
+        self._dispatch(connection, command, connection.receive_start_ns, received_bytes)
+
+    @staticmethod
+    def _attach_ring(spec):
+        """Attach to the client's shared-memory segment if it really is on this host"""
+        if not spec:
+            return None
+        try:
+            segment = _attach_shared_memory(spec["name"])
+        except (OSError, ValueError) as e:
+            print(f"Not using shared memory: {str(e)}")
+            return None
+        # The client writes a token first, so a same-named segment on another host is rejected
+        if bytes(segment.buf[:len(spec["token"]) // 2]).hex() != spec["token"]:
+            print("Not using shared memory: token mismatch")
+            segment.close()
+            return None
+        return _SharedMemoryRing(segment)
+
+    def negotiate_protocol(self, version=PROTOCOL_VERSION, encodings=None, compression=None,
+                           compression_threshold=COMPRESSION_THRESHOLD, compression_level=None,
+                           shared_memory=None):
+        """Pick the first encoding and compression offered by the client that this addon supports"""
+        supported = _supported_encodings()
+        encoding = next((e for e in encodings or ["json"] if e in supported), None)
+        if encoding is None:
+            return {"status": "error", "message": f"No common encoding; addon supports {supported}"}
+        algorithm = next((c for c in compression or [] if c in _supported_compressions()), None)
+        return {"status": "success", "result": {
+            "version": min(version, PROTOCOL_VERSION),
+            "encoding": encoding,
+            "encodings": supported,
+            "compression": algorithm,
+            "compression_threshold": compression_threshold,
+            "compression_level": _compression_level(algorithm, compression_level),
+        }}
+
+    def _dispatch(self, connection, command, receive_start_ns, received_bytes):
+        """Admit a received command to the main-thread queue, or answer it straight away"""
+        trace = _TraceContext.from_command(command, receive_start_ns)
+        if trace:
+            trace.record("receive", receive_start_ns, time.time_ns(), **{"net.bytes": received_bytes})
         
-        while self.running:
-            try:
-                # Accept new connection
-                try:
-                    client, address = self.socket.accept()
-                    print(f"Connected to client: {address}")
-                    
-                    # Handle client in a separate thread
-                    client_thread = threading.Thread(
-                        target=self._handle_client,
-                        args=(client,)
-                    )
-                    client_thread.daemon = True
-                    client_thread.start()
-                except socket.timeout:
-                    # Just check running condition
-                    continue
-                except Exception as e:
-                    print(f"Error accepting connection: {str(e)}")
-                    time.sleep(0.5)
-            except Exception as e:
-                print(f"Error in server loop: {str(e)}")
-                if not self.running:
-                    break
-                time.sleep(0.5)
+        if command.get("type") in ("get_queue_stats", "cancel"):
+            # Answered from the server thread so they work even when the queue is saturated
+            if command["type"] == "cancel":
+                result = self.cancel(**command.get("params", {}))
+            else:
+                result = self.get_queue_stats()
+            self._reply(connection, command, {"status": "success", "result": result})
+            return
         
-        print("Server thread stopped")
-    
-    def _handle_client(self, client):
-        """Handle connected client"""
-        print("Client handler started")
-        client.settimeout(None)  # No timeout
-        buffer = b''
+        cmd_type = command.get("type")
+        priority = COMMAND_PRIORITIES.get(cmd_type, PRIORITY_MUTATION)
+        if command.get("priority") in PRIORITY_NAMES:
+            priority = max(priority, PRIORITY_NAMES.index(command["priority"]))
         
+        entry = _QueuedCommand(connection, command, trace, priority)
+        retry_after = self._command_queue.offer(entry)
+        if retry_after is not None:
+            print(f"Rejecting {cmd_type} from client {connection.id}: queue saturated")
+            self._reply(connection, command, {
+                "status": "busy",
+                "message": "Blender is busy; retry later",
+                "retry_after": round(retry_after, 3),
+            })
+            return
+        self._schedule_drain()
+
+    def _reply(self, connection, command, response):
+        """Send a response that doesn't come from executing the command, echoing its id"""
+        if "id" in command:
+            response["id"] = command["id"]
+        self._send(connection, self._encode_response(response, connection.codec))
+
+    def _schedule_drain(self):
+        with self._drain_lock:
+            if self._drain_scheduled:
+                return
+            self._drain_scheduled = True
+        self._run_in_main_thread(self._drain_commands)
+
+    def _drain_commands(self):
+        """Main-thread callback: run queued commands for up to DRAIN_TIME_BUDGET, then yield"""
+        deadline = time.perf_counter() + DRAIN_TIME_BUDGET
+        while True:
+            entry = self._command_queue.pop()
+            if entry is None:
+                with self._drain_lock:
+                    # A command admitted after pop() has seen the flag set and not rescheduled
+                    if self._command_queue.depth == 0:
+                        self._drain_scheduled = False
+                        return None
+                continue
+            if entry.connection.closed:
+                continue
+            if entry.should_stop():
+                # The client has given up on it: don't spend the main thread on it
+                reason = "cancelled" if entry.cancelled else "deadline exceeded"
+                print(f"Skipping {entry.command.get('type')}: {reason} before execution")
+                self._reply(entry.connection, entry.command, {
+                    "status": "cancelled",
+                    "message": f"Command {reason} before execution",
+                })
+                continue
+            start = time.perf_counter()
+            self._running_entry = _execution_local.entry = entry
+            try:
+                self._execute_and_reply(entry.connection, entry.command, entry.trace, entry.queued_ns)
+            finally:
+                self._running_entry = _execution_local.entry = None
+            self._command_queue.record_execution(time.perf_counter() - start)
+            if time.perf_counter() >= deadline:
+                return 0.0
+
+    def cancel(self, request_id):
+        """Cancel a command by request id: drop it if queued, or flag it if it is running"""
+        if not request_id:
+            return {"cancelled": False, "state": "unknown"}
+        entry = self._command_queue.cancel(request_id)
+        if entry is not None:
+            entry.cancelled = True
+            self._reply(entry.connection, entry.command, {
+                "status": "cancelled",
+                "message": "Command cancelled before execution",
+            })
+            return {"cancelled": True, "state": "queued"}
+        running = self._running_entry
+        if running is not None and running.request_id == request_id:
+            # Stops at the handler's next cancellation checkpoint
+            running.cancelled = True
+            return {"cancelled": True, "state": "running"}
+        return {"cancelled": False, "state": "unknown"}
+
+    def get_queue_stats(self):
+        """Queue depth and admission counters"""
+        return self._command_queue.stats()
+
+    def _encode_response(self, response, codec):
+        """Serialize a response for the client: a frame, or raw JSON for unframed clients"""
+        if codec is None:
+            return json.dumps(response, default=_json_default).encode('utf-8')
+        return codec.encode(response)
+
+    def _execute_and_reply(self, connection, command, trace=None, queued_ns=None):
+        """Run a command on the main thread and queue its response for the client"""
+        codec = connection.codec
         try:
-            while self.running:
-                # Receive data
-                try:
-                    data = client.recv(8192)
-                    if not data:
-                        print("Client disconnected")
-                        break
-                    
-                    buffer += data
-                    try:
-                        # Try to parse command
-                        command = json.loads(buffer.decode('utf-8'))
-                        buffer = b''
-                        
-                        # Execute command in Blender's main thread
-                        def execute_wrapper():
-                            try:
-                                response = self.execute_command(command)
-                                response_json = json.dumps(response)
-                                try:
-                                    client.sendall(response_json.encode('utf-8'))
-                                except:
-                                    print("Failed to send response - client disconnected")
-                            except Exception as e:
-                                print(f"Error executing command: {str(e)}")
-                                traceback.print_exc()
-                                try:
-                                    error_response = {
-                                        "status": "error",
-                                        "message": str(e)
-                                    }
-                                    client.sendall(json.dumps(error_response).encode('utf-8'))
-                                except:
-                                    pass
-                            return None
-                        
-                        # Schedule execution in main thread
-                        bpy.app.timers.register(execute_wrapper, first_interval=0.0)
-                    except json.JSONDecodeError:
-                        # Incomplete data, wait for more
-                        pass
-                except Exception as e:
-                    print(f"Error receiving data: {str(e)}")
-                    break
+            if trace:
+                trace.record("queue", queued_ns, time.time_ns())
+            _trace_local.current = trace
+            try:
+                if trace:
+                    with trace.span("execute"):
+                        response = self.execute_command(command)
+                else:
+                    response = self.execute_command(command)
+            finally:
+                _trace_local.current = None
+            if "id" in command:
+                response["id"] = command["id"]
+
+            if trace:
+                encoding = codec.encoding if codec else "json"
+                with trace.span("serialize") as span:
+                    flags, payload = _encode_message(response, encoding)
+                    span["attributes"]["net.bytes"] = len(payload)
+                # Attach the spans to the already serialized response object
+                payload = _append_field(payload, flags, "spans", trace.finish(), encoding)
+                if codec is not None:
+                    payload = codec.frame(flags, payload)
+            else:
+                payload = self._encode_response(response, codec)
+            self._send(connection, payload)
         except Exception as e:
-            print(f"Error in client handler: {str(e)}")
-        finally:
+            print(f"Error executing command: {str(e)}")
+            traceback.print_exc()
             try:
-                client.close()
+                error_response = {
+                    "status": "error",
+                    "message": str(e)
+                }
+                if "id" in command:
+                    error_response["id"] = command["id"]
+                self._send(connection, self._encode_response(error_response, codec))
             except:
                 pass
-            print("Client handler stopped")
 
     def execute_command(self, command):
         """Execute a command in the main Blender thread"""
-        try:            
-            return self._execute_command_internal(command)
-                
+        try:
+            cmd_type = command.get("type")
+            key = command.get("idempotency_key") if cmd_type in IDEMPOTENT_COMMANDS else None
+            if key:
+                cached = self._results.get(cmd_type, key)
+                if cached is not None:
+                    print(f"Replaying cached result of {cmd_type} for idempotency key {key}")
+                    return dict(cached, idempotent_replay=True)
+
+            if self._should_profile(command):
+                response = self._execute_command_profiled(command)
+            else:
+                response = self._execute_command_internal(command)
+
+            if key:
+                # Copy: the caller adds per-request fields such as the id
+                self._results.put(cmd_type, key, dict(response))
+            return response
+
         except Exception as e:
             print(f"Error executing command: {str(e)}")
             traceback.print_exc()
             return {"status": "error", "message": str(e)}
 
+    #region Profiling
+    def _should_profile(self, command):
+        """Decide whether a command runs under the profiler"""
+        if command.get("type") in PROFILING_COMMANDS:
+            return False
+        if command.get("profile"):
+            return True
+        return self.profile_sample_rate > 0 and random.random() < self.profile_sample_rate
+
+    def _execute_command_profiled(self, command):
+        """Run a command under cProfile (and optionally tracemalloc) and store the result"""
+        trace_memory = command.get("profile_memory", self.profile_trace_memory)
+        started_tracemalloc = False
+        snapshot_before = None
+        if trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                started_tracemalloc = True
+            snapshot_before = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        start_time = time.perf_counter()
+        profiler.enable()
+        try:
+            response = self._execute_command_internal(command)
+        finally:
+            profiler.disable()
+            elapsed = time.perf_counter() - start_time
+
+            memory = None
+            if trace_memory:
+                snapshot_after = tracemalloc.take_snapshot()
+                _, peak = tracemalloc.get_traced_memory()
+                if started_tracemalloc:
+                    tracemalloc.stop()
+                memory = self._format_memory_diff(snapshot_before, snapshot_after, peak)
+
+        self._profile_counter += 1
+        profile = {
+            "id": self._profile_counter,
+            "command": command.get("type"),
+            "timestamp": time.time(),
+            "elapsed": elapsed,
+            "status": response.get("status"),
+            "pstats": self._format_pstats(profiler),
+            "collapsed": self._format_collapsed_stacks(profiler),
+        }
+        if memory is not None:
+            profile["memory"] = memory
+        self.profiles.append(profile)
+        print(f"Profiled {profile['command']} in {elapsed * 1000:.1f} ms (profile #{profile['id']})")
+
+        # Only hand the report back inline when the caller explicitly asked for it
+        if command.get("profile"):
+            response["profile"] = profile
+        return response
+
+    @staticmethod
+    def _format_pstats(profiler):
+        """Render the top functions of a profile as pstats text"""
+        stream = io.StringIO()
+        stats = pstats.Stats(profiler, stream=stream)
+        stats.strip_dirs().sort_stats("cumulative").print_stats(PROFILE_TOP_FUNCTIONS)
+        return stream.getvalue()
+
+    @staticmethod
+    def _format_collapsed_stacks(profiler):
+        """
+        Render a profile in collapsed-stack format ("caller;callee microseconds").
+
+        cProfile only records caller/callee edges, so each line is a two-frame
+        stack weighted by the callee's own time spent under that caller.
+        """
+        def label(func):
+            filename, line, name = func
+            return f"{name} ({os.path.basename(filename)}:{line})"
+
+        stats = pstats.Stats(profiler).stats
+        lines = []
+        for func, (_, _, own_time, _, callers) in stats.items():
+            if not callers:
+                micros = int(own_time * 1e6)
+                if micros:
+                    lines.append(f"{label(func)} {micros}")
+                continue
+            for caller, caller_stats in callers.items():
+                micros = int(caller_stats[2] * 1e6)
+                if micros:
+                    lines.append(f"{label(caller)};{label(func)} {micros}")
+        lines.sort(key=lambda l: int(l.rsplit(" ", 1)[1]), reverse=True)
+        return "\n".join(lines)
+
+    @staticmethod
+    def _format_memory_diff(before, after, peak):
+        """Summarize the allocation sites that grew the most during a command"""
+        filters = [
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ]
+        before = before.filter_traces(filters)
+        after = after.filter_traces(filters)
+        diff = after.compare_to(before, "lineno")
+        return {
+            "peak_bytes": peak,
+            "net_bytes": sum(stat.size_diff for stat in diff),
+            "top_allocations": [
+                {
+                    "location": str(stat.traceback),
+                    "size_diff": stat.size_diff,
+                    "count_diff": stat.count_diff,
+                }
+                for stat in diff[:PROFILE_TOP_ALLOCATIONS]
+            ],
+        }
+
+    def get_profiles(self, limit=None, command=None, include_stats=True):
+        """Return the most recent captured profiles, newest first"""
+        profiles = [p for p in reversed(self.profiles) if command is None or p["command"] == command]
+        if limit is not None:
+            profiles = profiles[:limit]
+        if not include_stats:
+            profiles = [
+                {k: v for k, v in p.items() if k not in ("pstats", "collapsed", "memory")}
+                for p in profiles
+            ]
+        return {
+            "profiles": profiles,
+            "sample_rate": self.profile_sample_rate,
+            "trace_memory": self.profile_trace_memory,
+            "max_profiles": self.profiles.maxlen,
+        }
+
+    def configure_profiling(self, sample_rate=None, trace_memory=None, max_profiles=None, clear=False):
+        """Change the global profiling mode and the size of the profile store"""
+        if sample_rate is not None:
+            if not 0.0 <= sample_rate <= 1.0:
+                return {"error": "sample_rate must be between 0.0 and 1.0"}
+            self.profile_sample_rate = float(sample_rate)
+        if trace_memory is not None:
+            self.profile_trace_memory = bool(trace_memory)
+        if max_profiles is not None:
+            if max_profiles < 1:
+                return {"error": "max_profiles must be at least 1"}
+            self.profiles = deque(self.profiles, maxlen=int(max_profiles))
+        if clear:
+            self.profiles.clear()
+        return {
+            "sample_rate": self.profile_sample_rate,
+            "trace_memory": self.profile_trace_memory,
+            "max_profiles": self.profiles.maxlen,
+            "stored_profiles": len(self.profiles),
+        }
+    #endregion
+
     def _execute_command_internal(self, command):
         """Internal command execution with proper context"""
         cmd_type = command.get("type")
@@ -200,9 +3113,17 @@ class BlenderMCPServer:
             "get_object_info": self.get_object_info,
             "get_viewport_screenshot": self.get_viewport_screenshot,
             "execute_code": self.execute_code,
+            "create_material_from_template": self.create_material_from_template,
+            "sample_transforms": self.sample_transforms,
+            "set_keyframes": self.set_keyframes,
+            "sample_motion_path": self.sample_motion_path,
+            "create_follow_path_camera": self.create_follow_path_camera,
+            "bake_camera_sequence": self.bake_camera_sequence,
             "get_polyhaven_status": self.get_polyhaven_status,
             "get_hyper3d_status": self.get_hyper3d_status,
             "get_sketchfab_status": self.get_sketchfab_status,
+            "get_profiles": self.get_profiles,
+            "configure_profiling": self.configure_profiling,
         }
         
         # Add Polyhaven handlers only if enabled
@@ -212,6 +3133,7 @@ class BlenderMCPServer:
                 "search_polyhaven_assets": self.search_polyhaven_assets,
                 "download_polyhaven_asset": self.download_polyhaven_asset,
                 "set_texture": self.set_texture,
+                "set_texture_many": self.set_texture_many,
             }
             handlers.update(polyhaven_handlers)
         
@@ -221,6 +3143,9 @@ class BlenderMCPServer:
                 "create_rodin_job": self.create_rodin_job,
                 "poll_rodin_job_status": self.poll_rodin_job_status,
                 "import_generated_asset": self.import_generated_asset,
+                "create_rodin_batch": self.create_rodin_batch,
+                "get_rodin_batch_status": self.get_rodin_batch_status,
+                "import_rodin_batch": self.import_rodin_batch,
             }
             handlers.update(polyhaven_handlers)
             
@@ -239,6 +3164,9 @@ class BlenderMCPServer:
                 result = handler(**params)
                 print(f"Handler execution complete")
                 return {"status": "success", "result": result}
+            except _CommandCancelled as e:
+                print(f"Handler for {cmd_type} stopped: {str(e)}")
+                return {"status": "cancelled", "message": str(e)}
             except Exception as e:
                 print(f"Error in handler: {str(e)}")
                 traceback.print_exc()
@@ -423,7 +3351,7 @@ class BlenderMCPServer:
             if asset_type not in ["hdris", "textures", "models", "all"]:
                 return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
                 
-            response = requests.get(f"https://api.polyhaven.com/categories/{asset_type}")
+            response = _http.get(f"{POLYHAVEN_API_URL}/categories/{asset_type}")
             if response.status_code == 200:
                 return {"categories": response.json()}
             else:
@@ -431,41 +3359,61 @@ class BlenderMCPServer:
         except Exception as e:
             return {"error": str(e)}
     
-    def search_polyhaven_assets(self, asset_type=None, categories=None):
-        """Search for assets from Polyhaven with optional filtering"""
+    def search_polyhaven_assets(self, asset_type=None, categories=None, query=None, limit=20, offset=0,
+                                fields=None, refresh=False):
+        """
+        Search the local Poly Haven catalog.
+
+        Results are ranked by how well query matches names, ids, tags and
+        categories, then by popularity; limit/offset page through them and
+        fields picks the attributes returned for each asset.
+        """
         try:
-            url = "https://api.polyhaven.com/assets"
-            params = {}
+            if asset_type and asset_type != "all" and asset_type not in POLYHAVEN_ASSET_TYPES:
+                return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
             
-            if asset_type and asset_type != "all":
-                if asset_type not in ["hdris", "textures", "models"]:
-                    return {"error": f"Invalid asset type: {asset_type}. Must be one of: hdris, textures, models, all"}
-                params["type"] = asset_type
-                
-            if categories:
-                params["categories"] = categories
-                
-            response = requests.get(url, params=params)
-            if response.status_code == 200:
-                # Limit the response size to avoid overwhelming Blender
-                assets = response.json()
-                # Return only the first 20 assets to keep response size manageable
-                limited_assets = {}
-                for i, (key, value) in enumerate(assets.items()):
-                    if i >= 20:  # Limit to 20 assets
-                        break
-                    limited_assets[key] = value
-                
-                return {"assets": limited_assets, "total_count": len(assets), "returned_count": len(limited_assets)}
-            else:
-                return {"error": f"API request failed with status code {response.status_code}"}
+            index = _polyhaven_catalog.index(force_refresh=refresh)
+            if isinstance(categories, str):
+                categories = [c.strip() for c in categories.split(",") if c.strip()]
+            ranked = index.search(query, asset_type, categories or ())
+            
+            offset = max(int(offset), 0)
+            page = ranked[offset:offset + max(int(limit), 0)]
+            fields = fields or POLYHAVEN_DEFAULT_PROJECTION
+            assets = {}
+            for asset_id in page:
+                asset = index.assets[asset_id]
+                assets[asset_id] = {field: asset[field] for field in fields if field in asset}
+            
+            next_offset = offset + len(page)
+            return {
+                "assets": assets,
+                "total_count": len(ranked),
+                "returned_count": len(assets),
+                "offset": offset,
+                "next_offset": next_offset if next_offset < len(ranked) else None,
+                "catalog_age": time.time() - index.fetched_at
+            }
         except Exception as e:
             return {"error": str(e)}
     
     def download_polyhaven_asset(self, asset_id, asset_type, resolution="1k", file_format=None):
         try:
+            # A texture set imported before is reused as is, without touching the network
+            if asset_type == "textures":
+                material_key = _assets.key("polyhaven", asset_id, resolution, f"material.{file_format or 'jpg'}")
+                mat = _assets.get("materials", material_key)
+                if mat is not None:
+                    return {
+                        "success": True,
+                        "message": f"Texture {asset_id} already imported, reusing its material",
+                        "material": mat.name,
+                        "maps": _registered_maps(mat),
+                        "reused": True
+                    }
+
             # First get the files information
-            files_response = requests.get(f"https://api.polyhaven.com/files/{asset_id}")
+            files_response = _http.get(f"{POLYHAVEN_API_URL}/files/{asset_id}")
             if files_response.status_code != 200:
                 return {"error": f"Failed to get asset files: {files_response.status_code}"}
             
@@ -477,20 +3425,24 @@ class BlenderMCPServer:
                 if not file_format:
                     file_format = "hdr"  # Default format for HDRIs
                 
-                if "hdri" in files_data and resolution in files_data["hdri"] and file_format in files_data["hdri"][resolution]:
-                    file_info = files_data["hdri"][resolution][file_format]
-                    file_url = file_info["url"]
-                    
-                    # For HDRIs, we need to save to a temporary file first
-                    # since Blender can't properly load HDR data directly from memory
-                    with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
-                        # Download the file
-                        response = requests.get(file_url)
-                        if response.status_code != 200:
-                            return {"error": f"Failed to download HDRI: {response.status_code}"}
+                image_key = _assets.key("polyhaven", asset_id, resolution, f"hdri.{file_format}")
+                image = _assets.get("images", image_key)
+                reused = image is not None
+                if reused or ("hdri" in files_data and resolution in files_data["hdri"] and file_format in files_data["hdri"][resolution]):
+                    if not reused:
+                        file_info = files_data["hdri"][resolution][file_format]
+                        file_url = file_info["url"]
                         
-                        tmp_file.write(response.content)
-                        tmp_path = tmp_file.name
+                        # For HDRIs, we need to save to a temporary file first
+                        # since Blender can't properly load HDR data directly from memory
+                        with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
+                            # Download the file
+                            response = _http.get(file_url)
+                            if response.status_code != 200:
+                                return {"error": f"Failed to download HDRI: {response.status_code}"}
+                            
+                            tmp_file.write(response.content)
+                            tmp_path = tmp_file.name
                     
                     try:
                         # Create a new world if none exists
@@ -512,27 +3464,30 @@ class BlenderMCPServer:
                         mapping = node_tree.nodes.new(type='ShaderNodeMapping')
                         mapping.location = (-600, 0)
                         
-                        # Load the image from the temporary file
-                        env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
-                        env_tex.location = (-400, 0)
-                        env_tex.image = bpy.data.images.load(tmp_path)
-                        
-                        # Use a color space that exists in all Blender versions
-                        if file_format.lower() == 'exr':
-                            # Try to use Linear color space for EXR files
-                            try:
-                                env_tex.image.colorspace_settings.name = 'Linear'
-                            except:
-                                # Fallback to Non-Color if Linear isn't available
-                                env_tex.image.colorspace_settings.name = 'Non-Color'
-                        else:  # hdr
-                            # For HDR files, try these options in order
-                            for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
+                        # Load the image from the temporary file, unless an earlier download left it in the file
+                        if not reused:
+                            image = _assets.register("images", image_key, bpy.data.images.load(tmp_path))
+                            
+                            # Use a color space that exists in all Blender versions
+                            if file_format.lower() == 'exr':
+                                # Try to use Linear color space for EXR files
                                 try:
-                                    env_tex.image.colorspace_settings.name = color_space
-                                    break  # Stop if we successfully set a color space
+                                    image.colorspace_settings.name = 'Linear'
                                 except:
-                                    continue
+                                    # Fallback to Non-Color if Linear isn't available
+                                    image.colorspace_settings.name = 'Non-Color'
+                            else:  # hdr
+                                # For HDR files, try these options in order
+                                for color_space in ['Linear', 'Linear Rec.709', 'Non-Color']:
+                                    try:
+                                        image.colorspace_settings.name = color_space
+                                        break  # Stop if we successfully set a color space
+                                    except:
+                                        continue
+                        
+                        env_tex = node_tree.nodes.new(type='ShaderNodeTexEnvironment')
+                        env_tex.location = (-400, 0)
+                        env_tex.image = image
                         
                         background = node_tree.nodes.new(type='ShaderNodeBackground')
                         background.location = (-200, 0)
@@ -558,7 +3513,8 @@ class BlenderMCPServer:
                         return {
                             "success": True, 
                             "message": f"HDRI {asset_id} imported successfully",
-                            "image_name": env_tex.image.name
+                            "image_name": env_tex.image.name,
+                            "reused": reused
                         }
                     except Exception as e:
                         return {"error": f"Failed to set up HDRI in Blender: {str(e)}"}
@@ -575,13 +3531,20 @@ class BlenderMCPServer:
                     for map_type in files_data:
                         if map_type not in ["blend", "gltf"]:  # Skip non-texture files
                             if resolution in files_data[map_type] and file_format in files_data[map_type][resolution]:
+                                # Maps already in the file (e.g. shared with another resolution's material) aren't fetched again
+                                image_key = _assets.key("polyhaven", asset_id, resolution, f"{map_type}.{file_format}")
+                                image = _assets.get("images", image_key)
+                                if image is not None:
+                                    downloaded_maps[map_type] = image
+                                    continue
+                                
                                 file_info = files_data[map_type][resolution][file_format]
                                 file_url = file_info["url"]
                                 
                                 # Use NamedTemporaryFile like we do for HDRIs
                                 with tempfile.NamedTemporaryFile(suffix=f".{file_format}", delete=False) as tmp_file:
                                     # Download the file
-                                    response = requests.get(file_url)
+                                    response = _http.get(file_url)
                                     if response.status_code == 200:
                                         tmp_file.write(response.content)
                                         tmp_path = tmp_file.name
@@ -589,6 +3552,8 @@ class BlenderMCPServer:
                                         # Load image from temporary file
                                         image = bpy.data.images.load(tmp_path)
                                         image.name = f"{asset_id}_{map_type}.{file_format}"
+                                        _assets.register("images", image_key, image)
+                                        _texture_index.add(image)
                                         
                                         # Pack the image into .blend file
                                         image.pack()
@@ -617,78 +3582,8 @@ class BlenderMCPServer:
                         return {"error": f"No texture maps found for the requested resolution and format"}
                     
                     # Create a new material with the downloaded textures
-                    mat = bpy.data.materials.new(name=asset_id)
-                    mat.use_nodes = True
-                    nodes = mat.node_tree.nodes
-                    links = mat.node_tree.links
-                    
-                    # Clear default nodes
-                    for node in nodes:
-                        nodes.remove(node)
-                    
-                    # Create output node
-                    output = nodes.new(type='ShaderNodeOutputMaterial')
-                    output.location = (300, 0)
-                    
-                    # Create principled BSDF node
-                    principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-                    principled.location = (0, 0)
-                    links.new(principled.outputs[0], output.inputs[0])
-                    
-                    # Add texture nodes based on available maps
-                    tex_coord = nodes.new(type='ShaderNodeTexCoord')
-                    tex_coord.location = (-800, 0)
-                    
-                    mapping = nodes.new(type='ShaderNodeMapping')
-                    mapping.location = (-600, 0)
-                    mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
-                    links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
-                    
-                    # Position offset for texture nodes
-                    x_pos = -400
-                    y_pos = 300
-                    
-                    # Connect different texture maps
-                    for map_type, image in downloaded_maps.items():
-                        tex_node = nodes.new(type='ShaderNodeTexImage')
-                        tex_node.location = (x_pos, y_pos)
-                        tex_node.image = image
-                        
-                        # Set color space based on map type
-                        if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                            try:
-                                tex_node.image.colorspace_settings.name = 'sRGB'
-                            except:
-                                pass  # Use default if sRGB not available
-                        else:
-                            try:
-                                tex_node.image.colorspace_settings.name = 'Non-Color'
-                            except:
-                                pass  # Use default if Non-Color not available
-                        
-                        links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
-                        
-                        # Connect to appropriate input on Principled BSDF
-                        if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
-                        elif map_type.lower() in ['roughness', 'rough']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
-                        elif map_type.lower() in ['metallic', 'metalness', 'metal']:
-                            links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
-                        elif map_type.lower() in ['normal', 'nor']:
-                            # Add normal map node
-                            normal_map = nodes.new(type='ShaderNodeNormalMap')
-                            normal_map.location = (x_pos + 200, y_pos)
-                            links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
-                            links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
-                        elif map_type in ['displacement', 'disp', 'height']:
-                            # Add displacement node
-                            disp_node = nodes.new(type='ShaderNodeDisplacement')
-                            disp_node.location = (x_pos + 200, y_pos - 200)
-                            links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
-                            links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-                        
-                        y_pos -= 250
+                    mat = _assets.register("materials", material_key, bpy.data.materials.new(name=asset_id))
+                    _instantiate_template(mat, "pbr", _pbr_bindings(downloaded_maps))
                     
                     return {
                         "success": True, 
@@ -718,7 +3613,7 @@ class BlenderMCPServer:
                         main_file_name = file_url.split("/")[-1]
                         main_file_path = os.path.join(temp_dir, main_file_name)
                         
-                        response = requests.get(file_url)
+                        response = _http.get(file_url)
                         if response.status_code != 200:
                             return {"error": f"Failed to download model: {response.status_code}"}
                         
@@ -736,7 +3631,7 @@ class BlenderMCPServer:
                                 os.makedirs(os.path.dirname(include_file_path), exist_ok=True)
                                 
                                 # Download the included file
-                                include_response = requests.get(include_url)
+                                include_response = _http.get(include_url)
                                 if include_response.status_code == 200:
                                     with open(include_file_path, "wb") as f:
                                         f.write(include_response.content)
@@ -786,7 +3681,7 @@ class BlenderMCPServer:
             return {"error": f"Failed to download asset: {str(e)}"}
 
     def set_texture(self, object_name, texture_id):
-        """Apply a previously downloaded Polyhaven texture to an object by creating a new material"""
+        """Apply a previously downloaded Polyhaven texture to an object through its shared material"""
         try:
             # Get the object
             obj = bpy.data.objects.get(object_name)
@@ -797,252 +3692,17 @@ class BlenderMCPServer:
             if not hasattr(obj, 'data') or not hasattr(obj.data, 'materials'):
                 return {"error": f"Object {object_name} cannot accept materials"}
             
-            # Find all images related to this texture and ensure they're properly loaded
-            texture_images = {}
-            for img in bpy.data.images:
-                if img.name.startswith(texture_id + "_"):
-                    # Extract the map type from the image name
-                    map_type = img.name.split('_')[-1].split('.')[0]
-                    
-                    # Force a reload of the image
-                    img.reload()
-                    
-                    # Ensure proper color space
-                    if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                        try:
-                            img.colorspace_settings.name = 'sRGB'
-                        except:
-                            pass
-                    else:
-                        try:
-                            img.colorspace_settings.name = 'Non-Color'
-                        except:
-                            pass
-                    
-                    # Ensure the image is packed
-                    if not img.packed_file:
-                        img.pack()
-                    
-                    texture_images[map_type] = img
-                    print(f"Loaded texture map: {map_type} - {img.name}")
-                    
-                    # Debug info
-                    print(f"Image size: {img.size[0]}x{img.size[1]}")
-                    print(f"Color space: {img.colorspace_settings.name}")
-                    print(f"File format: {img.file_format}")
-                    print(f"Is packed: {bool(img.packed_file)}")
-
-            if not texture_images:
+            new_mat, texture_images, reused = self._shared_texture_material(texture_id)
+            if new_mat is None:
                 return {"error": f"No texture images found for: {texture_id}. Please download the texture first."}
             
-            # Create a new material
-            new_mat_name = f"{texture_id}_material_{object_name}"
-            
-            # Remove any existing material with this name to avoid conflicts
-            existing_mat = bpy.data.materials.get(new_mat_name)
-            if existing_mat:
-                bpy.data.materials.remove(existing_mat)
-            
-            new_mat = bpy.data.materials.new(name=new_mat_name)
-            new_mat.use_nodes = True
-            
-            # Set up the material nodes
-            nodes = new_mat.node_tree.nodes
-            links = new_mat.node_tree.links
-            
-            # Clear default nodes
-            nodes.clear()
-            
-            # Create output node
-            output = nodes.new(type='ShaderNodeOutputMaterial')
-            output.location = (600, 0)
-            
-            # Create principled BSDF node
-            principled = nodes.new(type='ShaderNodeBsdfPrincipled')
-            principled.location = (300, 0)
-            links.new(principled.outputs[0], output.inputs[0])
-            
-            # Add texture nodes based on available maps
-            tex_coord = nodes.new(type='ShaderNodeTexCoord')
-            tex_coord.location = (-800, 0)
-            
-            mapping = nodes.new(type='ShaderNodeMapping')
-            mapping.location = (-600, 0)
-            mapping.vector_type = 'TEXTURE'  # Changed from default 'POINT' to 'TEXTURE'
-            links.new(tex_coord.outputs['UV'], mapping.inputs['Vector'])
-            
-            # Position offset for texture nodes
-            x_pos = -400
-            y_pos = 300
-            
-            # Connect different texture maps
-            for map_type, image in texture_images.items():
-                tex_node = nodes.new(type='ShaderNodeTexImage')
-                tex_node.location = (x_pos, y_pos)
-                tex_node.image = image
-                
-                # Set color space based on map type
-                if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                    try:
-                        tex_node.image.colorspace_settings.name = 'sRGB'
-                    except:
-                        pass  # Use default if sRGB not available
-                else:
-                    try:
-                        tex_node.image.colorspace_settings.name = 'Non-Color'
-                    except:
-                        pass  # Use default if Non-Color not available
-                
-                links.new(mapping.outputs['Vector'], tex_node.inputs['Vector'])
-                
-                # Connect to appropriate input on Principled BSDF
-                if map_type.lower() in ['color', 'diffuse', 'albedo']:
-                    links.new(tex_node.outputs['Color'], principled.inputs['Base Color'])
-                elif map_type.lower() in ['roughness', 'rough']:
-                    links.new(tex_node.outputs['Color'], principled.inputs['Roughness'])
-                elif map_type.lower() in ['metallic', 'metalness', 'metal']:
-                    links.new(tex_node.outputs['Color'], principled.inputs['Metallic'])
-                elif map_type.lower() in ['normal', 'nor', 'dx', 'gl']:
-                    # Add normal map node
-                    normal_map = nodes.new(type='ShaderNodeNormalMap')
-                    normal_map.location = (x_pos + 200, y_pos)
-                    links.new(tex_node.outputs['Color'], normal_map.inputs['Color'])
-                    links.new(normal_map.outputs['Normal'], principled.inputs['Normal'])
-                elif map_type.lower() in ['displacement', 'disp', 'height']:
-                    # Add displacement node
-                    disp_node = nodes.new(type='ShaderNodeDisplacement')
-                    disp_node.location = (x_pos + 200, y_pos - 200)
-                    disp_node.inputs['Scale'].default_value = 0.1  # Reduce displacement strength
-                    links.new(tex_node.outputs['Color'], disp_node.inputs['Height'])
-                    links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-                
-                y_pos -= 250
-            
-            # Second pass: Connect nodes with proper handling for special cases
-            texture_nodes = {}
-            
-            # First find all texture nodes and store them by map type
-            for node in nodes:
-                if node.type == 'TEX_IMAGE' and node.image:
-                    for map_type, image in texture_images.items():
-                        if node.image == image:
-                            texture_nodes[map_type] = node
-                            break
-            
-            # Now connect everything using the nodes instead of images
-            # Handle base color (diffuse)
-            for map_name in ['color', 'diffuse', 'albedo']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Base Color'])
-                    print(f"Connected {map_name} to Base Color")
-                    break
-            
-            # Handle roughness
-            for map_name in ['roughness', 'rough']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Roughness'])
-                    print(f"Connected {map_name} to Roughness")
-                    break
-            
-            # Handle metallic
-            for map_name in ['metallic', 'metalness', 'metal']:
-                if map_name in texture_nodes:
-                    links.new(texture_nodes[map_name].outputs['Color'], principled.inputs['Metallic'])
-                    print(f"Connected {map_name} to Metallic")
-                    break
-            
-            # Handle normal maps
-            for map_name in ['gl', 'dx', 'nor']:
-                if map_name in texture_nodes:
-                    normal_map_node = nodes.new(type='ShaderNodeNormalMap')
-                    normal_map_node.location = (100, 100)
-                    links.new(texture_nodes[map_name].outputs['Color'], normal_map_node.inputs['Color'])
-                    links.new(normal_map_node.outputs['Normal'], principled.inputs['Normal'])
-                    print(f"Connected {map_name} to Normal")
-                    break
-            
-            # Handle displacement
-            for map_name in ['displacement', 'disp', 'height']:
-                if map_name in texture_nodes:
-                    disp_node = nodes.new(type='ShaderNodeDisplacement')
-                    disp_node.location = (300, -200)
-                    disp_node.inputs['Scale'].default_value = 0.1  # Reduce displacement strength
-                    links.new(texture_nodes[map_name].outputs['Color'], disp_node.inputs['Height'])
-                    links.new(disp_node.outputs['Displacement'], output.inputs['Displacement'])
-                    print(f"Connected {map_name} to Displacement")
-                    break
-            
-            # Handle ARM texture (Ambient Occlusion, Roughness, Metallic)
-            if 'arm' in texture_nodes:
-                separate_rgb = nodes.new(type='ShaderNodeSeparateRGB')
-                separate_rgb.location = (-200, -100)
-                links.new(texture_nodes['arm'].outputs['Color'], separate_rgb.inputs['Image'])
-                
-                # Connect Roughness (G) if no dedicated roughness map
-                if not any(map_name in texture_nodes for map_name in ['roughness', 'rough']):
-                    links.new(separate_rgb.outputs['G'], principled.inputs['Roughness'])
-                    print("Connected ARM.G to Roughness")
-                
-                # Connect Metallic (B) if no dedicated metallic map
-                if not any(map_name in texture_nodes for map_name in ['metallic', 'metalness', 'metal']):
-                    links.new(separate_rgb.outputs['B'], principled.inputs['Metallic'])
-                    print("Connected ARM.B to Metallic")
-                
-                # For AO (R channel), multiply with base color if we have one
-                base_color_node = None
-                for map_name in ['color', 'diffuse', 'albedo']:
-                    if map_name in texture_nodes:
-                        base_color_node = texture_nodes[map_name]
-                        break
-                
-                if base_color_node:
-                    mix_node = nodes.new(type='ShaderNodeMixRGB')
-                    mix_node.location = (100, 200)
-                    mix_node.blend_type = 'MULTIPLY'
-                    mix_node.inputs['Fac'].default_value = 0.8  # 80% influence
-                    
-                    # Disconnect direct connection to base color
-                    for link in base_color_node.outputs['Color'].links:
-                        if link.to_socket == principled.inputs['Base Color']:
-                            links.remove(link)
-                    
-                    # Connect through the mix node
-                    links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
-                    links.new(separate_rgb.outputs['R'], mix_node.inputs[2])
-                    links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
-                    print("Connected ARM.R to AO mix with Base Color")
-            
-            # Handle AO (Ambient Occlusion) if separate
-            if 'ao' in texture_nodes:
-                base_color_node = None
-                for map_name in ['color', 'diffuse', 'albedo']:
-                    if map_name in texture_nodes:
-                        base_color_node = texture_nodes[map_name]
-                        break
+            # CRITICAL: Make sure the object uses only this material
+            if list(obj.data.materials) != [new_mat]:
+                while len(obj.data.materials) > 0:
+                    obj.data.materials.pop(index=0)
                 
-                if base_color_node:
-                    mix_node = nodes.new(type='ShaderNodeMixRGB')
-                    mix_node.location = (100, 200)
-                    mix_node.blend_type = 'MULTIPLY'
-                    mix_node.inputs['Fac'].default_value = 0.8  # 80% influence
-                    
-                    # Disconnect direct connection to base color
-                    for link in base_color_node.outputs['Color'].links:
-                        if link.to_socket == principled.inputs['Base Color']:
-                            links.remove(link)
-                    
-                    # Connect through the mix node
-                    links.new(base_color_node.outputs['Color'], mix_node.inputs[1])
-                    links.new(texture_nodes['ao'].outputs['Color'], mix_node.inputs[2])
-                    links.new(mix_node.outputs['Color'], principled.inputs['Base Color'])
-                    print("Connected AO to mix with Base Color")
-            
-            # CRITICAL: Make sure to clear all existing materials from the object
-            while len(obj.data.materials) > 0:
-                obj.data.materials.pop(index=0)
-            
-            # Assign the new material to the object
-            obj.data.materials.append(new_mat)
+                # Assign the shared material to the object
+                obj.data.materials.append(new_mat)
             
             # CRITICAL: Make the object active and select it
             bpy.context.view_layer.objects.active = obj
@@ -1061,33 +3721,424 @@ class BlenderMCPServer:
                 "node_count": len(new_mat.node_tree.nodes),
                 "texture_nodes": []
             }
-            
-            for node in new_mat.node_tree.nodes:
-                if node.type == 'TEX_IMAGE' and node.image:
-                    connections = []
-                    for output in node.outputs:
-                        for link in output.links:
-                            connections.append(f"{output.name} → {link.to_node.name}.{link.to_socket.name}")
-                    
-                    material_info["texture_nodes"].append({
-                        "name": node.name,
-                        "image": node.image.name,
-                        "colorspace": node.image.colorspace_settings.name,
-                        "connections": connections
-                    })
-            
+            
+            for node in new_mat.node_tree.nodes:
+                if node.type == 'TEX_IMAGE' and node.image:
+                    connections = []
+                    for output in node.outputs:
+                        for link in output.links:
+                            connections.append(f"{output.name} → {link.to_node.name}.{link.to_socket.name}")
+                    
+                    material_info["texture_nodes"].append({
+                        "name": node.name,
+                        "image": node.image.name,
+                        "colorspace": node.image.colorspace_settings.name,
+                        "connections": connections
+                    })
+            
+            return {
+                "success": True,
+                "message": f"Applied {'shared' if reused else 'new'} material with texture {texture_id} to {object_name}",
+                "material": new_mat.name,
+                "maps": texture_maps,
+                "material_info": material_info
+            }
+            
+        except Exception as e:
+            print(f"Error in set_texture: {str(e)}")
+            traceback.print_exc()
+            return {"error": f"Failed to apply texture: {str(e)}"}
+
+    def _shared_texture_material(self, texture_id):
+        """
+        The one material every object textured with texture_id shares, built on first use.
+
+        Returns (material, {map type: image}, reused); material is None if no
+        images of the texture are loaded.
+        """
+        material_key = _assets.key("polyhaven", texture_id, "any", "set_texture")
+        material = _assets.get("materials", material_key)
+        texture_images = _texture_index.images(texture_id)
+        if material is not None:
+            bound = {
+                _TextureIndex._map_type(node.image.name): node.image
+                for node in material.node_tree.nodes if node.type == 'TEX_IMAGE' and node.image
+            }
+            # Reuse the graph unless another resolution or more maps were downloaded since
+            if {image.name for image in bound.values()} == set(_pbr_bindings(texture_images).values()):
+                return material, bound, True
+        
+        # The images are already loaded: only fix up color space and packing, no reload
+        for map_type, img in texture_images.items():
+            _set_colorspace(img, map_type)
+            if not img.packed_file:
+                img.pack()
+            print(f"Found texture map: {map_type} - {img.name}")
+        if not texture_images:
+            return None, {}, False
+        
+        if material is None:
+            material = _assets.register("materials", material_key, bpy.data.materials.new(name=f"{texture_id}_material"))
+        _instantiate_template(material, "pbr", _pbr_bindings(texture_images))
+        return material, texture_images, False
+
+    def set_texture_many(self, object_names, texture_id):
+        """Apply one shared Polyhaven texture material to many objects in a single pass"""
+        try:
+            material, texture_images, reused = self._shared_texture_material(texture_id)
+            if material is None:
+                return {"error": f"No texture images found for: {texture_id}. Please download the texture first."}
+            
+            applied, skipped = [], {}
+            for object_name in object_names:
+                obj = bpy.data.objects.get(object_name)
+                if not obj:
+                    skipped[object_name] = "not found"
+                    continue
+                if not hasattr(obj, 'data') or not hasattr(obj.data, 'materials'):
+                    skipped[object_name] = "cannot accept materials"
+                    continue
+                if list(obj.data.materials) != [material]:
+                    obj.data.materials.clear()
+                    obj.data.materials.append(material)
+                applied.append(object_name)
+            
+            # One depsgraph update for the whole batch
+            bpy.context.view_layer.update()
+            
+            return {
+                "success": bool(applied),
+                "message": f"Applied texture {texture_id} to {len(applied)} of {len(object_names)} objects",
+                "material": material.name,
+                "maps": list(texture_images.keys()),
+                "applied": applied,
+                "skipped": skipped
+            }
+        except Exception as e:
+            print(f"Error in set_texture_many: {str(e)}")
+            traceback.print_exc()
+            return {"error": f"Failed to apply texture: {str(e)}"}
+
+    def create_material_from_template(self, template, bindings=None, material_name=None):
+        """Create a material from a node-graph template (a built-in name or a template spec)"""
+        try:
+            if not isinstance(template, (str, dict)):
+                return {"error": "template must be a template name or a template object"}
+            name = material_name or (template if isinstance(template, str) else template.get("name", "Material"))
+            material = bpy.data.materials.new(name=name)
+            try:
+                group = _instantiate_template(material, template, bindings)
+            except Exception:
+                bpy.data.materials.remove(material)
+                raise
+            return {
+                "success": True,
+                "material": material.name,
+                "node_group": group.name if group else None,
+                "node_count": len(material.node_tree.nodes)
+            }
+        except Exception as e:
+            print(f"Error in create_material_from_template: {str(e)}")
+            return {"error": f"Failed to create material from template: {str(e)}"}
+
+    #region Animation
+    def sample_transforms(self, targets, frames=None, frame_start=None, frame_end=None, frame_step=1):
+        """
+        World location, rotation (quaternion w, x, y, z) and scale of objects or pose bones at many frames.
+
+        targets are object names or {"object": armature name, "bone": bone name}.
+        Frames default to the scene's range. Each target's values come back as
+        flat float32 arrays with one row per frame.
+        """
+        try:
+            resolved = []
+            for target in targets:
+                name, bone_name = (target, None) if isinstance(target, str) else (target.get("object"), target.get("bone"))
+                obj = bpy.data.objects.get(name)
+                if obj is None:
+                    return {"error": f"Object not found: {name}"}
+                pose_bone = None
+                if bone_name:
+                    pose_bone = obj.pose.bones.get(bone_name) if obj.pose else None
+                    if pose_bone is None:
+                        return {"error": f"Bone not found in {name}: {bone_name}"}
+                resolved.append((obj, pose_bone))
+
+            frame_list = _frame_list(frames, frame_start, frame_end, frame_step)
+            matrices, reasons = _sample_world_matrices(resolved, frame_list)
+
+            results = []
+            for (obj, pose_bone), world, reason in zip(resolved, matrices, reasons):
+                location, rotation, scale = array.array("f"), array.array("f"), array.array("f")
+                for matrix in world:
+                    matrix_location, matrix_rotation, matrix_scale = matrix.decompose()
+                    location.extend(matrix_location)
+                    rotation.extend(matrix_rotation)
+                    scale.extend(matrix_scale)
+                entry = {
+                    "object": obj.name,
+                    "bone": pose_bone.name if pose_bone else None,
+                    "method": "depsgraph" if reason else "fcurves",
+                    "location": location,
+                    "rotation": rotation,
+                    "scale": scale,
+                }
+                if reason:
+                    entry["reason"] = reason
+                results.append(entry)
+            return {"frames": array.array("f", frame_list), "targets": results}
+        except Exception as e:
+            print(f"Error in sample_transforms: {str(e)}")
+            return {"error": f"Failed to sample transforms: {str(e)}"}
+
+    def set_keyframes(self, target, data_path, frames, values, interpolation="BEZIER", index=None):
+        """
+        Replace the animation of one property with a key at each of the given frames.
+
+        target is an object name, {"object": armature name, "bone": bone name} for a
+        pose bone, or {"object": name, "data": true} for the object's data (a camera's
+        lens, say). values holds one number per frame, or for array properties one row
+        (or a flat run of values) per frame; index keys a single component instead.
+        """
+        try:
+            name = target if isinstance(target, str) else target.get("object")
+            obj = bpy.data.objects.get(name)
+            if obj is None:
+                return {"error": f"Object not found: {name}"}
+            id_data, prefix, group = obj, "", None
+            if isinstance(target, dict) and target.get("bone"):
+                pose_bone = obj.pose.bones.get(target["bone"]) if obj.pose else None
+                if pose_bone is None:
+                    return {"error": f"Bone not found in {name}: {target['bone']}"}
+                prefix = f'pose.bones["{bpy.utils.escape_identifier(pose_bone.name)}"].'
+                group = pose_bone.name
+            elif isinstance(target, dict) and target.get("data"):
+                if obj.data is None:
+                    return {"error": f"Object has no data: {name}"}
+                id_data = obj.data
+
+            full_path = prefix + data_path
+            try:
+                current = id_data.path_resolve(full_path)
+            except ValueError:
+                return {"error": f"Property not found on {id_data.name}: {full_path}"}
+            if isinstance(current, str):
+                return {"error": f"Property can't be animated: {full_path}"}
+            width = 1 if isinstance(current, (bool, int, float)) else len(current)
+
+            frames = [float(frame) for frame in frames]
+            if index is not None and not 0 <= index < width:
+                return {"error": f"Index {index} out of range for {full_path} (length {width})"}
+            if values and isinstance(values[0], (list, tuple)):
+                columns = [list(column) for column in zip(*values)]
+                if any(len(row) != width for row in values):
+                    return {"error": f"Each row of values needs {width} values for {full_path}"}
+                indices = range(width)
+            elif index is None and width > 1:
+                if len(values) != len(frames) * width:
+                    return {"error": f"Expected {len(frames) * width} values ({width} per frame) for {full_path}"}
+                columns = [list(values[i::width]) for i in range(width)]
+                indices = range(width)
+            else:
+                columns = [list(values)]
+                indices = [index or 0]
+            if any(len(column) != len(frames) for column in columns):
+                return {"error": f"Got {len(frames)} frames but {len(columns[0])} values"}
+            if interpolation not in bpy.types.Keyframe.bl_rna.properties["interpolation"].enum_items:
+                return {"error": f"Unknown interpolation: {interpolation}"}
+
+            channels = _ensure_channels(id_data)
+            for component, column in zip(indices, columns):
+                _write_fcurve(channels, full_path, component, frames, column, interpolation, group)
+            id_data.update_tag(refresh={'TIME'})
+
+            return {
+                "target": id_data.name,
+                "data_path": full_path,
+                "action": id_data.animation_data.action.name,
+                "fcurves": len(columns),
+                "keyframes": len(columns) * len(frames),
+            }
+        except Exception as e:
+            print(f"Error in set_keyframes: {str(e)}")
+            return {"error": f"Failed to set keyframes: {str(e)}"}
+
+    def sample_motion_path(self, object_name, frame_start=None, frame_end=None, frame_step=1):
+        """
+        World positions of an object over a frame range (the scene's by default).
+
+        Unlike the paths_calculate operator this leaves selection, the active object and
+        the current frame alone. Results for unchanged animation are served from a cache.
+        """
+        try:
+            obj = bpy.data.objects.get(object_name)
+            if obj is None:
+                return {"error": f"Object not found: {object_name}"}
+            frames, positions, reason, cached = _motion_path(obj, frame_start, frame_end, frame_step,
+                                                             cache=self._motion_paths)
+            result = {
+                "object": obj.name,
+                "frames": array.array("f", frames),
+                "positions": positions,
+                "method": "depsgraph" if reason else "fcurves",
+                "cached": cached,
+            }
+            if reason:
+                result["reason"] = reason
+            return result
+        except Exception as e:
+            print(f"Error in sample_motion_path: {str(e)}")
+            return {"error": f"Failed to sample motion path: {str(e)}"}
+
+    def create_follow_path_camera(self, source, curve_name="curve_path", camera_name="motion_curve_cam",
+                                  frame_start=None, frame_end=None, frames=None, track_target=None,
+                                  interpolation="BEZIER"):
+        """
+        Build a curve through source's motion path and a camera that follows it at the source's speed.
+
+        The camera's Follow Path offset_factor is keyed at the source's location keys
+        (or the given frames) from the distance travelled along the path. Existing
+        objects called curve_name and camera_name are replaced. track_target names an
+        object the camera should aim at; an empty is created if it doesn't exist.
+        """
+        try:
+            obj = bpy.data.objects.get(source)
+            if obj is None:
+                return {"error": f"Object not found: {source}"}
+            fcurves = _action_fcurves(obj.animation_data)
+            if frame_start is None or frame_end is None:
+                if obj.motion_path is not None and len(obj.motion_path.points) > 1:
+                    default_range = (obj.motion_path.frame_start,
+                                     obj.motion_path.frame_start + len(obj.motion_path.points) - 1)
+                elif obj.animation_data and obj.animation_data.action:
+                    default_range = tuple(int(frame) for frame in obj.animation_data.action.frame_range)
+                else:
+                    default_range = (bpy.context.scene.frame_start, bpy.context.scene.frame_end)
+                frame_start = default_range[0] if frame_start is None else frame_start
+                frame_end = default_range[1] if frame_end is None else frame_end
+            frame_start, frame_end = int(frame_start), int(frame_end)
+            if frame_end <= frame_start:
+                return {"error": f"Empty frame range: {frame_start} to {frame_end}"}
+
+            _, points, _, _ = _motion_path(obj, frame_start, frame_end, cache=self._motion_paths)
+            lengths = _path_lengths(points)
+            total = float(lengths[-1])
+            if total <= 0.0:
+                return {"error": f"{source} doesn't move between frames {frame_start} and {frame_end}"}
+
+            key_frames = sorted(float(frame) for frame in frames) if frames is not None else \
+                [frame for frame in _keyed_frames(fcurves, "location") if frame_start <= frame <= frame_end]
+            if not key_frames:
+                key_frames = [float(frame) for frame in range(frame_start, frame_end + 1)]
+            point_frames = range(frame_start, frame_end + 1)
+            offsets = [length / total for length in _interpolate(key_frames, point_frames, lengths)]
+
+            curve_data = bpy.data.curves.new(curve_name, type='CURVE')
+            curve_data.dimensions = '3D'
+            curve_data.use_path = True
+            spline = curve_data.splines.new('NURBS')
+            spline.points.add(len(points) // 3 - 1)
+            co = [1.0] * (len(points) // 3 * 4)
+            for axis in range(3):
+                co[axis::4] = points[axis::3]
+            spline.points.foreach_set("co", co)
+            # The path starts and ends on the first and last positions
+            spline.use_endpoint_u = True
+            curve_obj = _replace_object(curve_name, curve_data)
+
+            camera_data = bpy.data.cameras.new(camera_name)
+            if obj.type == 'CAMERA':
+                camera_data.lens = obj.data.lens
+                camera_data.sensor_width = obj.data.sensor_width
+            camera = _replace_object(camera_name, camera_data)
+            follow = camera.constraints.new(type='FOLLOW_PATH')
+            follow.name = FOLLOW_PATH_CONSTRAINT
+            follow.target = curve_obj
+            follow.forward_axis = 'FORWARD_X'
+            follow.up_axis = 'UP_Z'
+            follow.use_fixed_location = True
+            follow.use_curve_follow = True
+            if track_target:
+                target = bpy.data.objects.get(track_target) or _replace_object(track_target, None)
+                track = camera.constraints.new(type='TRACK_TO')
+                track.target = target
+                track.track_axis = 'TRACK_NEGATIVE_Z'
+                track.up_axis = 'UP_Y'
+
+            _write_fcurve(_ensure_channels(camera), f'constraints["{FOLLOW_PATH_CONSTRAINT}"].offset_factor', 0,
+                          key_frames, offsets, interpolation)
+
             return {
-                "success": True,
-                "message": f"Created new material and applied texture {texture_id} to {object_name}",
-                "material": new_mat.name,
-                "maps": texture_maps,
-                "material_info": material_info
+                "camera": camera.name,
+                "curve": curve_obj.name,
+                "frame_range": [frame_start, frame_end],
+                "path_length": total,
+                "keyframes": len(key_frames),
             }
-            
         except Exception as e:
-            print(f"Error in set_texture: {str(e)}")
-            traceback.print_exc()
-            return {"error": f"Failed to apply texture: {str(e)}"}
+            print(f"Error in create_follow_path_camera: {str(e)}")
+            return {"error": f"Failed to create follow path camera: {str(e)}"}
+
+    def bake_camera_sequence(self, collection_name="world", camera_name="AnimatedCamera", start_frame=1,
+                             interpolation="BEZIER"):
+        """
+        Bake the cameras of a collection (and its child collections) into one animated camera.
+
+        Cameras are ordered by natural name order and keyed one per frame from
+        start_frame: world location, rotation and lens. Rotation is quaternion if the
+        first camera uses quaternions, Euler XYZ otherwise. An existing object called
+        camera_name is replaced.
+        """
+        try:
+            collection = bpy.data.collections.get(collection_name)
+            if collection is None:
+                return {"error": f"Collection not found: {collection_name}"}
+            cameras = sorted((obj for obj in collection.all_objects if obj.type == 'CAMERA' and obj.name != camera_name),
+                             key=lambda obj: _natural_key(obj.name))
+            if not cameras:
+                return {"error": f"No cameras in collection: {collection_name}"}
+
+            # One evaluation so freshly imported or edited cameras have current world matrices
+            bpy.context.view_layer.update()
+            matrices = [obj.matrix_world for obj in cameras]
+            quaternion = cameras[0].rotation_mode == 'QUATERNION'
+            locations = array.array("f")
+            for matrix in matrices:
+                locations.extend(matrix.translation)
+            rotations = _camera_rotations(matrices, quaternion)
+            lenses = [obj.data.lens for obj in cameras]
+            frames = [float(start_frame + i) for i in range(len(cameras))]
+
+            camera_data = bpy.data.cameras.new(camera_name)
+            camera_data.sensor_width = cameras[0].data.sensor_width
+            camera_data.lens = lenses[0]
+            camera = _replace_object(camera_name, camera_data)
+            camera.rotation_mode = 'QUATERNION' if quaternion else 'XYZ'
+
+            channels = _ensure_channels(camera)
+            for index in range(3):
+                _write_fcurve(channels, "location", index, frames, locations[index::3], interpolation)
+            rotation_path, width = ("rotation_quaternion", 4) if quaternion else ("rotation_euler", 3)
+            for index in range(width):
+                _write_fcurve(channels, rotation_path, index, frames, rotations[index::width], interpolation)
+            _write_fcurve(_ensure_channels(camera_data), "lens", 0, frames, lenses, interpolation)
+
+            scene = bpy.context.scene
+            end_frame = start_frame + len(cameras) - 1
+            scene.frame_start = min(scene.frame_start, start_frame)
+            scene.frame_end = max(scene.frame_end, end_frame)
+
+            return {
+                "camera": camera.name,
+                "cameras": len(cameras),
+                "frame_range": [start_frame, end_frame],
+                "first": cameras[0].name,
+                "last": cameras[-1].name,
+            }
+        except Exception as e:
+            print(f"Error in bake_camera_sequence: {str(e)}")
+            return {"error": f"Failed to bake camera sequence: {str(e)}"}
+    #endregion
 
     def get_polyhaven_status(self):
         """Get the current status of PolyHaven integration"""
@@ -1146,30 +4197,48 @@ class BlenderMCPServer:
             self,
             text_prompt: str=None,
             images: list[tuple[str, str]]=None,
-            bbox_condition=None
+            bbox_condition=None,
+            image_paths: list[str]=None,
+            max_image_size: int=RODIN_MAX_IMAGE_SIZE
         ):
+        """
+        Call Rodin API, get the job uuid and subscription key.
+
+        Images are (suffix, bytes) pairs sent with the command, or image_paths
+        on this machine that are streamed from disk. Both are downscaled to
+        max_image_size first (0 keeps them as they are).
+        """
         try:
-            if images is None:
-                images = []
-            """Call Rodin API, get the job uuid and subscription key"""
-            files = [
-                *[("images", (f"{i:04d}{img_suffix}", img)) for i, (img_suffix, img) in enumerate(images)],
-                ("tier", (None, "Sketch")),
-                ("mesh_mode", (None, "Raw")),
-            ]
-            if text_prompt:
-                files.append(("prompt", (None, text_prompt)))
-            if bbox_condition:
-                files.append(("bbox_condition", (None, json.dumps(bbox_condition))))
-            response = requests.post(
-                "https://hyperhuman.deemos.com/api/v2/rodin",
-                headers={
-                    "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-                },
-                files=files
-            )
-            data = response.json()
-            return data
+            unreadable = [path for path in image_paths or [] if not os.path.isfile(path)]
+            if unreadable:
+                # The client runs on another machine (or container); it resends the image data instead
+                return {"error": "Image paths are not readable from Blender", "unreadable_image_paths": unreadable}
+
+            uploads, temp_files = [], []
+            try:
+                for suffix, data in images or []:
+                    if isinstance(data, str):
+                        data = base64.b64decode(data)  # Sent through the unframed JSON protocol
+                    uploads.append((suffix, data))
+                uploads += [(os.path.splitext(path)[1], path) for path in image_paths or []]
+                if max_image_size:
+                    for i, (suffix, data) in enumerate(uploads):
+                        if not isinstance(data, str):
+                            fd, path = tempfile.mkstemp(suffix=suffix)
+                            with os.fdopen(fd, "wb") as f:
+                                f.write(data)
+                            temp_files.append(path)
+                            data = path
+                        resized = _downscaled_image(data, max_image_size)
+                        if resized != data:
+                            temp_files.append(resized)
+                        uploads[i] = (os.path.splitext(resized)[1], resized)
+                return self._submit_rodin_job("MAIN_SITE", bpy.context.scene.blendermcp_hyper3d_api_key,
+                                              text_prompt, uploads, bbox_condition)
+            finally:
+                for path in temp_files:
+                    with suppress(OSError):
+                        os.unlink(path)
         except Exception as e:
             return {"error": str(e)}
     
@@ -1177,9 +4246,47 @@ class BlenderMCPServer:
             self,
             text_prompt: str=None,
             images: list[tuple[str, str]]=None,
-            bbox_condition=None
+            bbox_condition=None,
+            image_paths: list[str]=None,
+            max_image_size: int=None
         ):
+        if image_paths:
+            return {"error": "Hyper3D Rodin mode FAL_AI takes image URLs, not files"}
         try:
+            return self._submit_rodin_job("FAL_AI", bpy.context.scene.blendermcp_hyper3d_api_key,
+                                          text_prompt, images, bbox_condition)
+        except Exception as e:
+            return {"error": str(e)}
+
+    @staticmethod
+    def _submit_rodin_job(mode, api_key, text_prompt=None, images=None, bbox_condition=None, session=None):
+        """
+        Submit one generation; safe to call off the main thread with the thread's own session.
+
+        MAIN_SITE images are (suffix, bytes or file path) pairs, FAL_AI images are URLs.
+        """
+        session = session or _http
+        if mode == "MAIN_SITE":
+            fields = [
+                *[("images", f"{i:04d}{img_suffix}", img) for i, (img_suffix, img) in enumerate(images or [])],
+                ("tier", None, "Sketch"),
+                ("mesh_mode", None, "Raw"),
+            ]
+            if text_prompt:
+                fields.append(("prompt", None, text_prompt))
+            if bbox_condition:
+                fields.append(("bbox_condition", None, json.dumps(bbox_condition)))
+            body = _MultipartBody(fields)
+            response = session.post(
+                f"{RODIN_API_URL}/rodin",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                    "Content-Type": body.content_type,
+                },
+                data=body,
+                timeout=60
+            )
+        else:
             req_data = {
                 "tier": "Sketch",
             }
@@ -1189,18 +4296,16 @@ class BlenderMCPServer:
                 req_data["prompt"] = text_prompt
             if bbox_condition:
                 req_data["bbox_condition"] = bbox_condition
-            response = requests.post(
-                "https://queue.fal.run/fal-ai/hyper3d/rodin",
+            response = session.post(
+                f"{FAL_AI_API_URL}/rodin",
                 headers={
-                    "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                    "Authorization": f"Key {api_key}",
                     "Content-Type": "application/json",
                 },
-                json=req_data
+                json=req_data,
+                timeout=30
             )
-            data = response.json()
-            return data
-        except Exception as e:
-            return {"error": str(e)}
+        return response.json()
 
     def poll_rodin_job_status(self, *args, **kwargs):
         match bpy.context.scene.blendermcp_hyper3d_mode:
@@ -1213,33 +4318,98 @@ class BlenderMCPServer:
 
     def poll_rodin_job_status_main_site(self, subscription_key: str):
         """Call the job status API to get the job status"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/status",
-            headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-            json={
-                "subscription_key": subscription_key,
-            },
-        )
-        data = response.json()
-        return {
-            "status_list": [i["status"] for i in data["jobs"]]
-        }
+        return self._rodin_job_status("MAIN_SITE", bpy.context.scene.blendermcp_hyper3d_api_key, subscription_key)
     
     def poll_rodin_job_status_fal_ai(self, request_id: str):
         """Call the job status API to get the job status"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}/status",
+        return self._rodin_job_status("FAL_AI", bpy.context.scene.blendermcp_hyper3d_api_key, request_id)
+
+    @staticmethod
+    def _rodin_job_status(mode, api_key, job_key, session=None):
+        """Status of a job by subscription key (MAIN_SITE) or request id (FAL_AI)"""
+        session = session or _http
+        if mode == "MAIN_SITE":
+            response = session.post(
+                f"{RODIN_API_URL}/status",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                },
+                json={
+                    "subscription_key": job_key,
+                },
+                timeout=30,
+            )
+            data = response.json()
+            return {
+                "status_list": [i["status"] for i in data["jobs"]]
+            }
+        response = session.get(
+            f"{FAL_AI_API_URL}/requests/{job_key}/status",
             headers={
-                "Authorization": f"KEY {bpy.context.scene.blendermcp_hyper3d_api_key}",
+                "Authorization": f"KEY {api_key}",
             },
+            timeout=30,
         )
-        data = response.json()
-        return data
+        return response.json()
+
+    @staticmethod
+    def _download_rodin_glb(mode, api_key, job_key, session=None):
+        """Download the GLB of a finished job (by task uuid or request id) to a temporary file"""
+        session = session or _http
+        if mode == "MAIN_SITE":
+            response = session.post(
+                f"{RODIN_API_URL}/download",
+                headers={
+                    "Authorization": f"Bearer {api_key}",
+                },
+                json={
+                    'task_uuid': job_key
+                },
+                timeout=30
+            )
+            urls = [i["url"] for i in response.json()["list"] if i["name"].endswith(".glb")]
+            if not urls:
+                raise RuntimeError("Generation failed. Please first make sure that all jobs of the task are done and then try again later.")
+            url = urls[0]
+        else:
+            response = session.get(
+                f"{FAL_AI_API_URL}/requests/{job_key}",
+                headers={
+                    "Authorization": f"Key {api_key}",
+                },
+                timeout=30
+            )
+            url = response.json()["model_mesh"]["url"]
+
+        temp_file = tempfile.NamedTemporaryFile(
+            delete=False,
+            prefix=job_key,
+            suffix=".glb",
+        )
+        try:
+            # Download the content
+            response = session.get(url, timeout=60, stream=True)
+            response.raise_for_status()  # Raise an exception for HTTP errors
+            
+            # Write the content to the temporary file
+            for chunk in response.iter_content(chunk_size=8192):
+                _check_cancelled()
+                temp_file.write(chunk)
+            temp_file.close()
+        except Exception:
+            # Clean up the file if there's an error
+            temp_file.close()
+            os.unlink(temp_file.name)
+            raise
+        return temp_file.name
 
     @staticmethod
     def _clean_imported_glb(filepath, mesh_name=None):
+        # Simple single-mesh files need neither the operator nor the cleanup below
+        obj = _import_simple_glb(filepath, mesh_name)
+        if obj is not None:
+            return obj
+
         # Get the set of existing objects before import
         existing_objects = set(bpy.data.objects)
 
@@ -1316,108 +4486,25 @@ class BlenderMCPServer:
 
     def import_generated_asset_main_site(self, task_uuid: str, name: str):
         """Fetch the generated asset, import into blender"""
-        response = requests.post(
-            "https://hyperhuman.deemos.com/api/v2/download",
-            headers={
-                "Authorization": f"Bearer {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            },
-            json={
-                'task_uuid': task_uuid
-            }
-        )
-        data_ = response.json()
-        temp_file = None
-        for i in data_["list"]:
-            if i["name"].endswith(".glb"):
-                temp_file = tempfile.NamedTemporaryFile(
-                    delete=False,
-                    prefix=task_uuid,
-                    suffix=".glb",
-                )
-    
-                try:
-                    # Download the content
-                    response = requests.get(i["url"], stream=True)
-                    response.raise_for_status()  # Raise an exception for HTTP errors
-                    
-                    # Write the content to the temporary file
-                    for chunk in response.iter_content(chunk_size=8192):
-                        temp_file.write(chunk)
-                        
-                    # Close the file
-                    temp_file.close()
-                    
-                except Exception as e:
-                    # Clean up the file if there's an error
-                    temp_file.close()
-                    os.unlink(temp_file.name)
-                    return {"succeed": False, "error": str(e)}
-                
-                break
-        else:
-            return {"succeed": False, "error": "Generation failed. Please first make sure that all jobs of the task are done and then try again later."}
-
         try:
-            obj = self._clean_imported_glb(
-                filepath=temp_file.name,
-                mesh_name=name
-            )
-            result = {
-                "name": obj.name,
-                "type": obj.type,
-                "location": [obj.location.x, obj.location.y, obj.location.z],
-                "rotation": [obj.rotation_euler.x, obj.rotation_euler.y, obj.rotation_euler.z],
-                "scale": [obj.scale.x, obj.scale.y, obj.scale.z],
-            }
-
-            if obj.type == "MESH":
-                bounding_box = self._get_aabb(obj)
-                result["world_bounding_box"] = bounding_box
-            
-            return {
-                "succeed": True, **result
-            }
+            filepath = self._download_rodin_glb("MAIN_SITE", bpy.context.scene.blendermcp_hyper3d_api_key, task_uuid)
         except Exception as e:
             return {"succeed": False, "error": str(e)}
+        return self._import_rodin_glb(filepath, name)
     
     def import_generated_asset_fal_ai(self, request_id: str, name: str):
         """Fetch the generated asset, import into blender"""
-        response = requests.get(
-            f"https://queue.fal.run/fal-ai/hyper3d/requests/{request_id}",
-            headers={
-                "Authorization": f"Key {bpy.context.scene.blendermcp_hyper3d_api_key}",
-            }
-        )
-        data_ = response.json()
-        temp_file = None
-        
-        temp_file = tempfile.NamedTemporaryFile(
-            delete=False,
-            prefix=request_id,
-            suffix=".glb",
-        )
-
         try:
-            # Download the content
-            response = requests.get(data_["model_mesh"]["url"], stream=True)
-            response.raise_for_status()  # Raise an exception for HTTP errors
-            
-            # Write the content to the temporary file
-            for chunk in response.iter_content(chunk_size=8192):
-                temp_file.write(chunk)
-                
-            # Close the file
-            temp_file.close()
-            
+            filepath = self._download_rodin_glb("FAL_AI", bpy.context.scene.blendermcp_hyper3d_api_key, request_id)
         except Exception as e:
-            # Clean up the file if there's an error
-            temp_file.close()
-            os.unlink(temp_file.name)
             return {"succeed": False, "error": str(e)}
+        return self._import_rodin_glb(filepath, name)
 
+    def _import_rodin_glb(self, filepath, name):
+        """Import a downloaded GLB as one named object and describe it"""
         try:
             obj = self._clean_imported_glb(
-                filepath=temp_file.name,
+                filepath=filepath,
                 mesh_name=name
             )
             result = {
@@ -1437,6 +4524,77 @@ class BlenderMCPServer:
             }
         except Exception as e:
             return {"succeed": False, "error": str(e)}
+        finally:
+            # The importer packs the GLB's images, so the download is no longer needed
+            with suppress(OSError):
+                os.unlink(filepath)
+
+    def create_rodin_batch(self, text_prompts, names=None, bbox_condition=None, concurrency=RODIN_BATCH_CONCURRENCY):
+        """
+        Submit several text generations at once.
+
+        Worker threads submit, poll and download the jobs in the background;
+        import_rodin_batch then imports every finished model in one pass.
+        """
+        mode = bpy.context.scene.blendermcp_hyper3d_mode
+        if mode not in ("MAIN_SITE", "FAL_AI"):
+            return {"error": "Unknown Hyper3D Rodin mode!"}
+        if isinstance(text_prompts, str):
+            text_prompts = [text_prompts]
+        if not text_prompts:
+            return {"error": "No prompts given"}
+        if len(text_prompts) > RODIN_BATCH_MAX_JOBS:
+            return {"error": f"A batch holds at most {RODIN_BATCH_MAX_JOBS} prompts"}
+        if names is not None and len(names) != len(text_prompts):
+            return {"error": "names must have one entry per prompt"}
+
+        jobs = [{
+            "index": i,
+            "name": names[i] if names else (re.sub(r"\W+", "_", prompt).strip("_")[:48] or f"Rodin_{i}"),
+            "prompt": prompt,
+            "bbox_condition": bbox_condition,
+            "state": "queued",
+        } for i, prompt in enumerate(text_prompts)]
+        concurrency = max(1, min(int(concurrency), RODIN_BATCH_MAX_CONCURRENCY))
+        batch = _RodinBatch(mode, bpy.context.scene.blendermcp_hyper3d_api_key, jobs, concurrency)
+        self._rodin_batches[batch.id] = batch
+        while len(self._rodin_batches) > RODIN_BATCH_HISTORY:
+            _, evicted = self._rodin_batches.popitem(last=False)
+            evicted.discard()
+        return batch.snapshot()
+
+    def get_rodin_batch_status(self, batch_id):
+        """Per-job state of a batch"""
+        batch = self._rodin_batches.get(batch_id)
+        if batch is None:
+            return {"error": f"Unknown Rodin batch: {batch_id}"}
+        return batch.snapshot()
+
+    def import_rodin_batch(self, batch_id):
+        """Import every downloaded model of a batch that is not imported yet"""
+        batch = self._rodin_batches.get(batch_id)
+        if batch is None:
+            return {"error": f"Unknown Rodin batch: {batch_id}"}
+
+        imported, failed = [], []
+        for job in batch.ready_jobs():
+            _check_cancelled()
+            result = self._import_rodin_glb(job["file"], job["name"])
+            if result.get("succeed"):
+                batch.update(job, state="imported", object=result["name"])
+                imported.append(result)
+            else:
+                batch.update(job, state="failed", error=result.get("error"))
+                failed.append({"name": job["name"], "error": result.get("error")})
+
+        snapshot = batch.snapshot()
+        return {
+            "batch_id": batch_id,
+            "imported": imported,
+            "failed": failed,
+            "counts": snapshot["counts"],
+            "done": snapshot["done"],
+        }
     #endregion
 
     #region Sketchfab API
@@ -1452,8 +4610,8 @@ class BlenderMCPServer:
                     "Authorization": f"Token {api_key}"
                 }
                 
-                response = requests.get(
-                    "https://api.sketchfab.com/v3/me",
+                response = _http.get(
+                    f"{SKETCHFAB_API_URL}/me",
                     headers=headers,
                     timeout=30  # Add timeout of 30 seconds
                 )
@@ -1502,12 +4660,43 @@ class BlenderMCPServer:
                             4. Restart the connection to Claude"""
             }
     
-    def search_sketchfab_models(self, query, categories=None, count=20, downloadable=True):
-        """Search for models on Sketchfab based on query and optional filters"""
+    @staticmethod
+    def _project_sketchfab_model(model):
+        """The few fields of a Sketchfab search result a client needs"""
+        images = sorted(((model.get("thumbnails") or {}).get("images") or []), key=lambda image: image.get("width") or 0)
+        thumbnail = next((image for image in images if (image.get("width") or 0) >= SKETCHFAB_THUMBNAIL_WIDTH),
+                         images[-1] if images else None)
+        user = model.get("user") or {}
+        license_data = model.get("license") or {}
+        return {
+            "uid": model.get("uid"),
+            "name": model.get("name"),
+            "faceCount": model.get("faceCount"),
+            "license": license_data.get("label") if isinstance(license_data, dict) else license_data,
+            "thumbnail": thumbnail.get("url") if thumbnail else None,
+            "author": user.get("username") if isinstance(user, dict) else None,
+            "isDownloadable": model.get("isDownloadable"),
+        }
+
+    def search_sketchfab_models(self, query, categories=None, count=20, downloadable=True, cursor=None, raw=False):
+        """
+        Search for models on Sketchfab based on query and optional filters.
+
+        Results are projected to a few fields (raw=True returns Sketchfab's full
+        objects) and cached for SKETCHFAB_SEARCH_TTL. Pass the returned
+        next_cursor as cursor to fetch the following page.
+        """
         try:
             api_key = bpy.context.scene.blendermcp_sketchfab_api_key
             if not api_key:
                 return {"error": "Sketchfab API key is not configured"}
+            
+            if isinstance(categories, str):
+                categories = ",".join(sorted(c.strip() for c in categories.split(",") if c.strip()))
+            cache_key = (" ".join(str(query).lower().split()), categories or None, int(count), bool(downloadable), cursor, bool(raw))
+            cached = self._sketchfab_searches.get(cache_key)
+            if cached is not None:
+                return dict(cached, cached=True)
                 
             # Build search parameters with exact fields from Sketchfab API docs
             params = {
@@ -1520,6 +4709,8 @@ class BlenderMCPServer:
             
             if categories:
                 params["categories"] = categories
+            if cursor:
+                params["cursor"] = cursor
                 
             # Make API request to Sketchfab search endpoint
             # The proper format according to Sketchfab API docs for API key auth
@@ -1529,8 +4720,8 @@ class BlenderMCPServer:
             
             
             # Use the search endpoint as specified in the API documentation
-            response = requests.get(
-                "https://api.sketchfab.com/v3/search",
+            response = _http.get(
+                f"{SKETCHFAB_API_URL}/search",
                 headers=headers,
                 params=params,
                 timeout=30  # Add timeout of 30 seconds
@@ -1552,8 +4743,17 @@ class BlenderMCPServer:
             results = response_data.get("results", [])
             if not isinstance(results, list):
                 return {"error": f"Unexpected response format from Sketchfab API: {response_data}"}
-                
-            return response_data
+            
+            # Sketchfab's "next" is a full URL; its cursor parameter is all a client needs to continue
+            next_url = response_data.get("next")
+            next_cursor = parse_qs(urlparse(next_url).query).get("cursor", [None])[0] if next_url else None
+            
+            result = {
+                "results": results if raw else [self._project_sketchfab_model(model) for model in results if model],
+                "next_cursor": next_cursor,
+            }
+            self._sketchfab_searches.put(cache_key, result)
+            return result
         
         except requests.exceptions.Timeout:
             return {"error": "Request timed out. Check your internet connection."}
@@ -1571,15 +4771,23 @@ class BlenderMCPServer:
             if not api_key:
                 return {"error": "Sketchfab API key is not configured"}
                 
+            try:
+                main_file = _cached_sketchfab_model(uid)
+            except ValueError as e:
+                return {"error": str(e)}
+            if main_file:
+                # Extracted before: no download and no decompression
+                return self._import_sketchfab_file(main_file, cached=True)
+                
             # Use proper authorization header for API key auth
             headers = {
                 "Authorization": f"Token {api_key}"
             }
             
             # Request download URL using the exact endpoint from the documentation
-            download_endpoint = f"https://api.sketchfab.com/v3/models/{uid}/download"
+            download_endpoint = f"{SKETCHFAB_API_URL}/models/{uid}/download"
             
-            response = requests.get(
+            response = _http.get(
                 download_endpoint,
                 headers=headers,
                 timeout=30  # Add timeout of 30 seconds
@@ -1606,74 +4814,27 @@ class BlenderMCPServer:
             if not download_url:
                 return {"error": "No download URL available for this model. Make sure the model is downloadable and you have access."}
                 
-            # Download the model (already has timeout)
-            model_response = requests.get(download_url, timeout=60)  # 60 second timeout
+            # Stream the archive to disk rather than holding it in memory
+            model_response = _http.get(download_url, timeout=60, stream=True)  # 60 second timeout
             
             if model_response.status_code != 200:
                 return {"error": f"Model download failed with status code {model_response.status_code}"}
                 
-            # Save to temporary file
-            temp_dir = tempfile.mkdtemp()
-            zip_file_path = os.path.join(temp_dir, f"{uid}.zip")
-            
-            with open(zip_file_path, "wb") as f:
-                f.write(model_response.content)
-                
-            # Extract the zip file with enhanced security
-            with zipfile.ZipFile(zip_file_path, 'r') as zip_ref:
-                # More secure zip slip prevention
-                for file_info in zip_ref.infolist():
-                    # Get the path of the file
-                    file_path = file_info.filename
-                    
-                    # Convert directory separators to the current OS style
-                    # This handles both / and \ in zip entries
-                    target_path = os.path.join(temp_dir, os.path.normpath(file_path))
-                    
-                    # Get absolute paths for comparison
-                    abs_temp_dir = os.path.abspath(temp_dir)
-                    abs_target_path = os.path.abspath(target_path)
-                    
-                    # Ensure the normalized path doesn't escape the target directory
-                    if not abs_target_path.startswith(abs_temp_dir):
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with path traversal attempt"}
+            archive_file = tempfile.NamedTemporaryFile(suffix=".zip", delete=False)
+            try:
+                # A cancel or network error mid-download must not leave the partial archive behind
+                with archive_file, model_response:
+                    for chunk in model_response.iter_content(chunk_size=1 << 20):
+                        _check_cancelled()
+                        archive_file.write(chunk)
+                main_file = _store_sketchfab_model(uid, archive_file.name)
+            except (ValueError, FileNotFoundError, zipfile.BadZipFile) as e:
+                return {"error": str(e)}
+            finally:
+                with suppress(OSError):
+                    os.unlink(archive_file.name)
                     
-                    # Additional explicit check for directory traversal
-                    if ".." in file_path:
-                        with suppress(Exception):
-                            shutil.rmtree(temp_dir)
-                        return {"error": "Security issue: Zip contains files with directory traversal sequence"}
-                
-                # If all files passed security checks, extract them
-                zip_ref.extractall(temp_dir)
-                
-            # Find the main glTF file
-            gltf_files = [f for f in os.listdir(temp_dir) if f.endswith('.gltf') or f.endswith('.glb')]
-            
-            if not gltf_files:
-                with suppress(Exception):
-                    shutil.rmtree(temp_dir)
-                return {"error": "No glTF file found in the downloaded model"}
-                
-            main_file = os.path.join(temp_dir, gltf_files[0])
-            
-            # Import the model
-            bpy.ops.import_scene.gltf(filepath=main_file)
-            
-            # Get the names of imported objects
-            imported_objects = [obj.name for obj in bpy.context.selected_objects]
-            
-            # Clean up temporary files
-            with suppress(Exception):
-                shutil.rmtree(temp_dir)
-            
-            return {
-                "success": True,
-                "message": "Model imported successfully",
-                "imported_objects": imported_objects
-            }
+            return self._import_sketchfab_file(main_file, cached=False)
         
         except requests.exceptions.Timeout:
             return {"error": "Request timed out. Check your internet connection and try again with a simpler model."}
@@ -1683,6 +4844,20 @@ class BlenderMCPServer:
             import traceback
             traceback.print_exc()
             return {"error": f"Failed to download model: {str(e)}"}
+
+    def _import_sketchfab_file(self, main_file, cached):
+        """Import an extracted glTF and report the objects it created"""
+        bpy.ops.import_scene.gltf(filepath=main_file)
+        
+        # Get the names of imported objects
+        imported_objects = [obj.name for obj in bpy.context.selected_objects]
+        
+        return {
+            "success": True,
+            "message": "Model imported from cache" if cached else "Model imported successfully",
+            "imported_objects": imported_objects,
+            "cached": cached
+        }
     #endregion
 
 # Blender UI Panel
@@ -1698,6 +4873,7 @@ class BLENDERMCP_PT_Panel(bpy.types.Panel):
         scene = context.scene
         
         layout.prop(scene, "blendermcp_port")
+        layout.prop(scene, "blendermcp_socket_path")
         layout.prop(scene, "blendermcp_use_polyhaven", text="Use assets from Poly Haven")
 
         layout.prop(scene, "blendermcp_use_hyper3d", text="Use Hyper3D Rodin 3D model generation")
@@ -1714,7 +4890,10 @@ class BLENDERMCP_PT_Panel(bpy.types.Panel):
             layout.operator("blendermcp.start_server", text="Connect to MCP server")
         else:
             layout.operator("blendermcp.stop_server", text="Disconnect from MCP server")
-            layout.label(text=f"Running on port {scene.blendermcp_port}")
+            if scene.blendermcp_socket_path:
+                layout.label(text=f"Running on {scene.blendermcp_socket_path}")
+            else:
+                layout.label(text=f"Running on port {scene.blendermcp_port}")
 
 # Operator to set Hyper3D API Key
 class BLENDERMCP_OT_SetFreeTrialHyper3DAPIKey(bpy.types.Operator):
@@ -1738,7 +4917,10 @@ class BLENDERMCP_OT_StartServer(bpy.types.Operator):
         
         # Create a new server instance
         if not hasattr(bpy.types, "blendermcp_server") or not bpy.types.blendermcp_server:
-            bpy.types.blendermcp_server = BlenderMCPServer(port=scene.blendermcp_port)
+            bpy.types.blendermcp_server = BlenderMCPServer(
+                port=scene.blendermcp_port,
+                socket_path=bpy.path.abspath(scene.blendermcp_socket_path) or None,
+            )
         
         # Start the server
         bpy.types.blendermcp_server.start()
@@ -1774,6 +4956,13 @@ def register():
         max=65535
     )
     
+    bpy.types.Scene.blendermcp_socket_path = StringProperty(
+        name="Socket Path",
+        description="Listen on this Unix domain socket instead of the TCP port (same-machine setups)",
+        subtype="FILE_PATH",
+        default=""
+    )
+    
     bpy.types.Scene.blendermcp_server_running = bpy.props.BoolProperty(
         name="Server Running",
         default=False
@@ -1826,6 +5015,11 @@ def register():
     bpy.utils.register_class(BLENDERMCP_OT_StartServer)
     bpy.utils.register_class(BLENDERMCP_OT_StopServer)
     
+    for handler_list, function in _APP_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_list)
+        if function not in handlers:
+            handlers.append(function)
+    
     print("BlenderMCP addon registered")
 
 def unregister():
@@ -1839,7 +5033,13 @@ def unregister():
     bpy.utils.unregister_class(BLENDERMCP_OT_StartServer)
     bpy.utils.unregister_class(BLENDERMCP_OT_StopServer)
     
+    for handler_list, function in _APP_HANDLERS:
+        handlers = getattr(bpy.app.handlers, handler_list)
+        if function in handlers:
+            handlers.remove(function)
+    
     del bpy.types.Scene.blendermcp_port
+    del bpy.types.Scene.blendermcp_socket_path
     del bpy.types.Scene.blendermcp_server_running
     del bpy.types.Scene.blendermcp_use_polyhaven
     del bpy.types.Scene.blendermcp_use_hyper3d
@@ -0,0 +1,552 @@
+"""
+Protocol and dispatch benchmark for the Blender addon, runnable without Blender.
+
+The addon's BlenderMCPServer is imported against the fake bpy module from
+fake_bpy.py and serves a synthetic scene. The main thread pumps the fake
+bpy.app.timers exactly like Blender would, while load-generator threads drive
+BlenderConnection from the MCP server package over the real socket.
+
+For every command type and payload size the report contains latency
+percentiles (p50/p99), throughput and memory (peak traced allocations in the
+addon process plus the RSS high-water mark).
+
+Example:
+    python benchmarks/bench_protocol.py --objects 10000 100000 --payload-sizes 1k 64k 1m
+    python benchmarks/bench_protocol.py --clients 4 --iterations 500 --json results.json
+    python benchmarks/bench_protocol.py --encoding legacy json msgpack
+    python benchmarks/bench_protocol.py --encoding json --compression zlib --compression-threshold 16k
+    python benchmarks/bench_protocol.py --transport unix --shared-memory on
+    python benchmarks/bench_protocol.py --smoke
+"""
+
+import argparse
+import array
+import importlib.util
+import json
+import os
+import resource
+import socket
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import types
+import zlib
+from multiprocessing import shared_memory
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(BENCH_DIR)
+sys.path.insert(0, BENCH_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+
+import fake_bpy
+
+
+def parse_size(text):
+    """Parse sizes such as 512, 64k or 1m into a byte count"""
+    text = text.strip().lower()
+    multiplier = 1
+    if text[-1] in "kmg":
+        multiplier = {"k": 1024, "m": 1024 ** 2, "g": 1024 ** 3}[text[-1]]
+        text = text[:-1]
+    return int(float(text) * multiplier)
+
+
+def format_size(size):
+    for unit in ("B", "KiB", "MiB", "GiB"):
+        if size < 1024 or unit == "GiB":
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+
+
+def load_addon(object_count):
+    """Install the fake bpy with a fresh scene and import addon.py against it"""
+    fake_bpy.install(object_count=object_count)
+    spec = importlib.util.spec_from_file_location("blendermcp_addon", os.path.join(REPO_ROOT, "addon.py"))
+    addon = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(addon)
+    # Keep handler chatter out of the measurements
+    addon.print = lambda *args, **kwargs: None
+    return addon
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+def build_workload(object_count, payload_sizes):
+    """Return (label, command_type, params) tuples covering each command type"""
+    workload = [
+        ("get_scene_info", "get_scene_info", {}),
+        ("get_object_info", "get_object_info", {"name": f"Object.{object_count // 2:06d}"}),
+        ("get_polyhaven_status", "get_polyhaven_status", {}),
+    ]
+    for size in payload_sizes:
+        # Request payload: a large code string that does almost nothing
+        workload.append((
+            f"execute_code request {format_size(size)}",
+            "execute_code",
+            {"code": "#" + "x" * size + "\npass"},
+        ))
+        # Response payload: a tiny code string that prints size bytes
+        workload.append((
+            f"execute_code response {format_size(size)}",
+            "execute_code",
+            {"code": f"print('y' * {size}, end='')"},
+        ))
+    return workload
+
+
+def percentile(samples, pct):
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def run_case(connection_factory, command_type, params, iterations, clients, warmup):
+    """Drive one command from several client threads and collect latencies"""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(clients)
+
+    def client_worker():
+        connection = connection_factory()
+        try:
+            for _ in range(warmup):
+                connection.send_command(command_type, params)
+            barrier.wait()
+            local = []
+            for _ in range(iterations):
+                start = time.perf_counter()
+                connection.send_command(command_type, params)
+                local.append(time.perf_counter() - start)
+            with lock:
+                latencies.extend(local)
+        except Exception as e:
+            with lock:
+                errors.append(str(e))
+            barrier.abort()
+        finally:
+            connection.disconnect()
+
+    threads = [threading.Thread(target=client_worker, daemon=True) for _ in range(clients)]
+    wall_start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    return threads, latencies, errors, wall_start
+
+
+#region Smoke checks
+# --smoke runs these instead of the benchmark: behavioral checks of the frame
+# codec, shared-memory ring, command queue, result cache and template compiler,
+# then a round trip over the socket for every encoding and compression.
+# Failures raise SmokeCheckFailed (not assert, which python -O strips).
+
+class SmokeCheckFailed(Exception):
+    pass
+
+
+def check(condition, message):
+    if not condition:
+        raise SmokeCheckFailed(message)
+
+
+def sample_message():
+    """A message using everything the codecs special-case"""
+    return {
+        "status": "success",
+        "result": {
+            "text": "héllo ✓ " * 50,
+            "numbers": [0, -1, 2 ** 40, 1.5, None, True],
+            "nested": {"empty": {}, "list": [[], [{}]]},
+            "blob": bytes(range(256)) * 300,
+            "floats": array.array("f", [0.5, -1.25, 3.0] * 1000),
+            "doubles": array.array("d", [1e300, -0.0]),
+            "ints": array.array("i", [-(2 ** 31), 2 ** 31 - 1, 0]),
+            "shorts": array.array("H", [0, 65535]),
+            # Looks like an encoded array but has extra keys, so must stay a dict
+            "lookalike": {"__bytes__": "AAAA", "other": 1},
+        },
+    }
+
+
+def smoke_codec(addon, client):
+    """Messages round-trip between the addon's and the MCP server's codecs in both directions"""
+    message = sample_message()
+    compressions = [None] + addon._supported_compressions()
+    for encoding in addon._supported_encodings():
+        for compression in compressions:
+            label = f"{encoding}/{compression or 'none'}"
+            level = addon._compression_level(compression, None)
+            codec = addon._FrameCodec(encoding, compression, threshold=1024, level=level)
+            frame = codec.encode(message)
+            flags, length = addon.FRAME_HEADER.unpack_from(frame)
+            payload = frame[addon.FRAME_HEADER.size:]
+            check(length == len(payload), f"{label}: header length {length} != payload {len(payload)}")
+            check(bool(flags & addon.FRAME_FLAG_COMPRESSED) == (compression is not None),
+                  f"{label}: compressed flag is {bool(flags & addon.FRAME_FLAG_COMPRESSED)}")
+            if compression:
+                payload = client._decompress(compression, payload)
+            check(client.decode_message(payload, flags) == message, f"{label}: addon -> client changed the message")
+
+            flags, payload = client.encode_message(message, encoding)
+            if compression:
+                payload, flags = client._compress(compression, payload, level), flags | addon.FRAME_FLAG_COMPRESSED
+            check(codec.decode(flags, payload) == message, f"{label}: client -> addon changed the message")
+
+        # Trace spans are appended to already encoded responses
+        flags, payload = addon._encode_message(message, encoding)
+        merged = addon._decode_message(addon._append_field(payload, flags, "spans", [{"name": "x"}], encoding), flags)
+        check(merged == dict(message, spans=[{"name": "x"}]), f"{encoding}: _append_field lost data")
+
+    for algorithm, (low, high) in addon.COMPRESSION_LEVEL_RANGES.items():
+        check(addon._compression_level(algorithm, low - 10) == low, f"{algorithm} level not clamped up to {low}")
+        check(addon._compression_level(algorithm, high + 10) == high, f"{algorithm} level not clamped down to {high}")
+    bomb = zlib.compress(bytes(4096))
+    original_limit, addon.MAX_FRAME_SIZE = addon.MAX_FRAME_SIZE, 1024
+    try:
+        addon._decompress("zlib", bomb)
+        check(False, "zlib output beyond MAX_FRAME_SIZE was accepted")
+    except ValueError:
+        pass
+    finally:
+        addon.MAX_FRAME_SIZE = original_limit
+    return [f"{e}/{c or 'none'}" for e in addon._supported_encodings() for c in compressions]
+
+
+def smoke_shared_memory_ring(addon):
+    """Ring offsets, fallback when full, release, and frames that carry only a handle"""
+    segment = shared_memory.SharedMemory(create=True, size=64)
+    try:
+        ring = addon._SharedMemoryRing(segment)
+        check(ring.write(b"a" * 24) == 0, "first region doesn't start at 0")
+        check(ring.write(b"b" * 24) == 24, "second region doesn't follow the first")
+        check(ring.write(b"c" * 24) is None, "a region past the end of the ring was accepted")
+        check(bytes(segment.buf[:48]) == b"a" * 24 + b"b" * 24, "ring contents overwritten")
+        ring.release_sent()
+        check(ring.write(b"d" * 40) == 0, "released space isn't reused from the start")
+        check(ring.write(b"e" * 40) is None, "unreleased region was overwritten")
+        ring.release_sent()
+        check(ring.write(b"f" * 65) is None, "payload larger than the ring was accepted")
+
+        ring.release_sent()
+        codec = addon._FrameCodec("json", ring=ring, shared_memory_threshold=16)
+        message = {"status": "success", "result": "x" * 20}
+        frame = codec.encode(message)
+        flags, _ = addon.FRAME_HEADER.unpack_from(frame)
+        check(flags & addon.FRAME_FLAG_SHARED_MEMORY, "large payload wasn't sent through the ring")
+        offset, length = addon.SHARED_MEMORY_HANDLE.unpack_from(frame, addon.FRAME_HEADER.size)
+        payload = bytes(segment.buf[offset:offset + length])
+        check(addon._decode_message(payload, flags) == message, "ring payload doesn't decode to the message")
+        frame = codec.encode({"status": "success", "result": "y" * 60})
+        flags, _ = addon.FRAME_HEADER.unpack_from(frame)
+        check(not flags & addon.FRAME_FLAG_SHARED_MEMORY, "full ring didn't fall back to the socket")
+    finally:
+        segment.close()
+        segment.unlink()
+
+
+def smoke_command_queue(addon):
+    """Priority classes, round-robin between clients, admission limits, cancellation and deadlines"""
+    clients = [types.SimpleNamespace(id=i, closed=False) for i in range(3)]
+    interactive, mutation, bulk = range(len(addon.PRIORITY_NAMES))
+
+    def entry(client, request_id, priority=mutation, **command):
+        return addon._QueuedCommand(clients[client], dict(command, id=request_id), None, priority)
+
+    queue = addon._CommandQueue(max_queued=6, max_per_client=3)
+    for e in (entry(0, "bulk", bulk), entry(0, "a1"), entry(0, "a2"), entry(1, "b1"), entry(2, "fast", interactive)):
+        check(queue.offer(e) is None, f"{e.request_id} wasn't admitted")
+    order = [queue.pop().request_id for _ in range(5)]
+    check(order == ["fast", "a1", "b1", "a2", "bulk"], f"unexpected execution order {order}")
+    check(queue.pop() is None and queue.depth == 0, "queue not empty after popping everything")
+
+    for i in range(3):
+        queue.offer(entry(0, f"a{i}"))
+    retry_after = queue.offer(entry(0, "a3"))
+    check(retry_after is not None and 0.05 <= retry_after <= 30.0, f"per-client limit gave retry_after {retry_after}")
+    for i in range(3):
+        check(queue.offer(entry(1, f"b{i}")) is None, "other client blocked by the first one's limit")
+    retry_after = queue.offer(entry(2, "c0"))
+    check(retry_after is not None and 0.05 <= retry_after <= 30.0, f"global limit gave retry_after {retry_after}")
+    stats = queue.stats()
+    check(stats["rejected"] == 2 and stats["depth"] == 6, f"wrong counters {stats}")
+
+    check(queue.cancel("b1").request_id == "b1" and queue.cancel("b1") is None, "cancel by request id failed")
+    check(len(queue.remove_client(0)) == 3, "remove_client didn't drop every command of the client")
+    check([queue.pop().request_id for _ in range(2)] == ["b0", "b2"] and queue.depth == 0, "queue damaged by removals")
+
+    timed = entry(0, "t", timeout=0.01)
+    keyed = entry(0, "k", timeout=0.01, idempotency_key="key")
+    untimed = entry(0, "u")
+    check(not timed.should_stop(), "command stopped before its deadline")
+    time.sleep(0.02)
+    check(timed.expired() and timed.should_stop(), "command past its deadline wasn't stopped")
+    check(keyed.expired() and not keyed.should_stop(), "keyed command stopped at its deadline")
+    check(not untimed.should_stop(), "command without a timeout stopped")
+    untimed.cancelled = True
+    check(untimed.should_stop(), "cancelled command wasn't stopped")
+
+
+def smoke_result_cache(addon, bpy):
+    """Only successes are cached, and only while their datablocks exist and the entry is fresh"""
+    cache = addon._ResultCache(max_entries=2, ttl=60)
+    success = {"status": "success", "result": {"material": "SmokeMaterial"}}
+    cache.put("set_texture", "k", success)
+    check(cache.get("set_texture", "k") is None, "result replayed though its material doesn't exist")
+    bpy.data.materials.new("SmokeMaterial")
+    cache.put("set_texture", "k", success)
+    check(cache.get("set_texture", "k") is success, "cached result not replayed")
+    cache.put("set_texture", "error", {"status": "success", "result": {"error": "failed"}})
+    cache.put("set_texture", "failed", {"status": "error", "message": "failed"})
+    check(cache.get("set_texture", "error") is None and cache.get("set_texture", "failed") is None,
+          "failed command cached")
+    cache.put("create_rodin_job", "a", {"status": "success", "result": {}})
+    cache.put("create_rodin_job", "b", {"status": "success", "result": {}})
+    check(cache.get("set_texture", "k") is None, "least recently used entry not evicted")
+    cache.ttl = 0
+    time.sleep(0.01)
+    check(cache.get("create_rodin_job", "b") is None, "expired entry replayed")
+
+
+def smoke_templates(addon):
+    """requires/unless pruning of nodes and links, and which bindings split the shared group"""
+    def compiled(*bound):
+        template = addon._compile_template("pbr", bound)
+        links = {link[:4] for link in template.inner_links + template.outer_links}
+        return template, links
+
+    template, links = compiled("color", "roughness")
+    check({"color", "roughness", "ao_mix", "bsdf", "output"} <= set(template.nodes), "bound nodes left out")
+    check(not {"normal", "normal_map", "arm", "arm_split", "displacement_node"} & set(template.nodes),
+          "nodes kept without their required bindings")
+    check(("ao_mix", "Color", "bsdf", "Base Color") in links, "base color doesn't go through ao_mix")
+
+    _, links = compiled("color", "arm", "ao")
+    check(("ao", "Color", "ao_mix", "2") in links, "ao map not multiplied in")
+    check(("arm_split", "R", "ao_mix", "2") not in links, "arm's AO linked though an ao map is bound")
+    check(("arm_split", "G", "bsdf", "Roughness") in links, "arm roughness not used without a roughness map")
+
+    template, links = compiled("color", "arm", "skip_ao")
+    check("ao_mix" not in template.nodes, "ao_mix kept with skip_ao")
+    check(("color", "Color", "bsdf", "Base Color") in links, "skip_ao didn't link the color map directly")
+
+    check(compiled("color", "unrelated")[0].group_key == compiled("color")[0].group_key,
+          "a binding the template doesn't mention split the shared group")
+    check(compiled("color", "skip_ao")[0].group_key != compiled("color")[0].group_key,
+          "skip_ao variant shares the group of the AO variant")
+    try:
+        addon._compile_template({"nodes": {"a": {"type": "ShaderNodeMath"}}, "links": [["a", "Value", "b", "0"]]}, [])
+        check(False, "link to an unknown node was accepted")
+    except ValueError:
+        pass
+
+
+def smoke_round_trips(addon, connection_factory, encodings, compressions, shared_memory_modes):
+    """The same commands give the same results over every encoding, compression and shared-memory setting"""
+    payload = "é" * 200_000  # Beyond the compression and shared-memory thresholds
+    commands = [
+        ("get_scene_info", {}),
+        ("execute_code", {"code": f"print({payload!r}, end='')"}),
+        ("execute_code", {"code": "#" + "x" * 200_000 + "\nprint('ok', end='')"}),
+    ]
+    expected = expected_label = None
+    combinations = []
+    for encoding in encodings:
+        for compression in compressions if encoding != "legacy" else ["none"]:
+            for shm in shared_memory_modes if encoding != "legacy" else ["off"]:
+                label = f"{encoding}/{compression}/shm {shm}"
+                results, errors = [], []
+
+                def client():
+                    connection = connection_factory(encoding, compression, shm)
+                    try:
+                        results.extend(connection.send_command(command_type, params)
+                                       for command_type, params in commands)
+                    except Exception as e:
+                        errors.append(e)
+                    finally:
+                        connection.disconnect()
+
+                thread = threading.Thread(target=client, daemon=True)
+                thread.start()
+                while thread.is_alive():
+                    fake_bpy.timers.run_pending(timeout=0.001)
+                check(not errors, f"{label}: {errors[0] if errors else ''}")
+                check(results[1]["result"] == payload, f"{label}: response payload changed in transit")
+                check(results[2]["result"] == "ok", f"{label}: request payload changed in transit")
+                if expected is None:
+                    expected, expected_label = results, label
+                check(results == expected, f"{label}: results differ from {expected_label}")
+                combinations.append(label)
+    return combinations
+
+
+def run_smoke(args, BlenderConnection):
+    """Run every smoke check; returns the number of failures"""
+    import blender_mcp.server as client
+    addon = load_addon(100)
+    bpy = sys.modules["bpy"]
+    failures = 0
+
+    def run(name, function, *function_args):
+        nonlocal failures
+        try:
+            detail = function(*function_args)
+            print(f"  ok    {name}" + (f" ({', '.join(detail)})" if detail else ""))
+        except Exception as e:
+            failures += 1
+            print(f"  FAIL  {name}: {type(e).__name__}: {e}")
+
+    missing = [name for name, module in (("msgpack", addon.msgpack), ("zstd", addon.zstandard)) if module is None]
+    if missing:
+        print(f"Not installed, so not checked: {', '.join(missing)}")
+    run("frame codec", smoke_codec, addon, client)
+    run("shared-memory ring", smoke_shared_memory_ring, addon)
+    run("command queue", smoke_command_queue, addon)
+    run("result cache", smoke_result_cache, addon, bpy)
+    run("template compiler", smoke_templates, addon)
+
+    port = free_port()
+    socket_path = None
+    if args.transport == "unix":
+        socket_path = os.path.join(tempfile.mkdtemp(prefix="blendermcp-smoke-"), "blender.sock")
+    server = addon.BlenderMCPServer(port=port, socket_path=socket_path)
+    server.start()
+    try:
+        encodings = ["legacy", "json"] + (["msgpack"] if addon.msgpack is not None else [])
+        compressions = ["none", "zlib"] + (["zstd"] if addon.zstandard is not None else [])
+        run("socket round trips", smoke_round_trips, addon,
+            lambda encoding, compression, shm: BlenderConnection(
+                host="localhost", port=port, socket_path=socket_path, preferred_encoding=encoding,
+                preferred_compression=compression, compression_threshold=1024, preferred_shared_memory=shm),
+            encodings, compressions, ["off", "on"])
+    finally:
+        server.stop()
+    print("Smoke checks passed" if not failures else f"{failures} smoke check(s) failed")
+    return failures
+#endregion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--objects", type=int, nargs="+", default=[10000, 100000],
+                        help="synthetic scene sizes to benchmark (default: 10000 100000)")
+    parser.add_argument("--payload-sizes", nargs="+", default=["1k", "64k", "1m"],
+                        help="request/response payload sizes for execute_code (default: 1k 64k 1m)")
+    parser.add_argument("--iterations", type=int, default=200, help="measured calls per client (default: 200)")
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured calls per client (default: 10)")
+    parser.add_argument("--clients", type=int, default=1, help="concurrent client connections (default: 1)")
+    parser.add_argument("--encoding", nargs="+", default=["auto"],
+                        choices=("auto", "legacy", "json", "msgpack"),
+                        help="socket encodings to compare; msgpack needs the msgpack package (default: auto)")
+    parser.add_argument("--compression", default="none", choices=("auto", "zstd", "zlib", "none"),
+                        help="frame compression for negotiated connections (default: none)")
+    parser.add_argument("--compression-threshold", type=parse_size, default=None,
+                        help="compress frames at least this large (default: the server's threshold)")
+    parser.add_argument("--transport", default="tcp", choices=("tcp", "unix"),
+                        help="loopback TCP or a Unix domain socket (default: tcp)")
+    parser.add_argument("--shared-memory", default="off", choices=("auto", "on", "off"),
+                        help="shared-memory ring for large responses (default: off)")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="track peak Python allocations per case with tracemalloc (slower)")
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    parser.add_argument("--smoke", action="store_true",
+                        help="check round trips and queue/template behavior instead of benchmarking; "
+                             "exits non-zero on failure")
+    args = parser.parse_args()
+
+    payload_sizes = [parse_size(s) for s in args.payload_sizes]
+
+    # The MCP server logs every command at INFO level, which would dominate the timings
+    import logging
+    from blender_mcp.server import BlenderConnection
+    logging.getLogger("BlenderMCPServer").setLevel(logging.WARNING)
+
+    if args.smoke:
+        sys.exit(1 if run_smoke(args, BlenderConnection) else 0)
+
+    connection_options = {"preferred_compression": args.compression, "preferred_shared_memory": args.shared_memory}
+    if args.compression_threshold is not None:
+        connection_options["compression_threshold"] = args.compression_threshold
+
+    results = []
+    for object_count in args.objects:
+        build_start = time.perf_counter()
+        addon = load_addon(object_count)
+        print(f"\nScene with {object_count} objects built in {time.perf_counter() - build_start:.2f}s")
+
+        port = free_port()
+        socket_path = None
+        if args.transport == "unix":
+            socket_path = os.path.join(tempfile.mkdtemp(prefix="blendermcp-bench-"), "blender.sock")
+            connection_options["socket_path"] = socket_path
+        server = addon.BlenderMCPServer(port=port, socket_path=socket_path)
+        try:
+            server.start()
+            cases = [
+                (encoding, label, command_type, params)
+                for encoding in args.encoding
+                for label, command_type, params in build_workload(object_count, payload_sizes)
+            ]
+            for encoding, label, command_type, params in cases:
+                if len(args.encoding) > 1:
+                    label = f"{label} [{encoding}]"
+                if args.trace_memory:
+                    tracemalloc.start()
+                threads, latencies, errors, wall_start = run_case(
+                    lambda: BlenderConnection(host="localhost", port=port, preferred_encoding=encoding,
+                                              **connection_options),
+                    command_type, params, args.iterations, args.clients, args.warmup,
+                )
+                # Act as Blender's main thread until every client is done
+                while any(t.is_alive() for t in threads):
+                    fake_bpy.timers.run_pending(timeout=0.001)
+                wall = time.perf_counter() - wall_start
+                peak = 0
+                if args.trace_memory:
+                    _, peak = tracemalloc.get_traced_memory()
+                    tracemalloc.stop()
+
+                result = {
+                    "objects": object_count,
+                    "case": label,
+                    "encoding": encoding,
+                    "compression": args.compression,
+                    "transport": args.transport,
+                    "shared_memory": args.shared_memory,
+                    "command": command_type,
+                    "clients": args.clients,
+                    "calls": len(latencies),
+                    "errors": errors[:3],
+                    "p50_ms": percentile(latencies, 50) * 1000,
+                    "p99_ms": percentile(latencies, 99) * 1000,
+                    "mean_ms": (statistics.fmean(latencies) * 1000) if latencies else 0.0,
+                    "throughput_per_s": len(latencies) / wall if wall > 0 else 0.0,
+                    "traced_peak_bytes": peak,
+                    "max_rss_bytes": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024,
+                }
+                results.append(result)
+                print(f"  {label:<34} p50 {result['p50_ms']:8.2f} ms  p99 {result['p99_ms']:8.2f} ms  "
+                      f"{result['throughput_per_s']:8.1f}/s"
+                      + (f"  peak {format_size(peak)}" if args.trace_memory else "")
+                      + (f"  ERRORS: {errors[0]}" if errors else ""))
+        finally:
+            server.stop()
+
+    print(f"\nMax RSS: {format_size(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024)}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Results written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
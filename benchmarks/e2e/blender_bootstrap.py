@@ -0,0 +1,62 @@
+"""
+Entry point executed inside `blender --background`.
+
+Loads addon.py, enables every integration with dummy keys, builds the
+requested benchmark scene and serves MCP commands on the main thread until the
+process is terminated. Launched by run_e2e.py:
+
+    blender --background --factory-startup --python blender_bootstrap.py -- \\
+        --addon /path/to/addon.py --port 9876 --scene many_objects --size 10000
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+import time
+
+import bpy
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import scenes
+
+
+def parse_args():
+    argv = sys.argv[sys.argv.index("--") + 1:] if "--" in sys.argv else []
+    parser = argparse.ArgumentParser(prog="blender_bootstrap.py")
+    parser.add_argument("--addon", required=True)
+    parser.add_argument("--port", type=int, default=9876)
+    parser.add_argument("--scene", choices=sorted(scenes.SCENES), default="many_objects")
+    parser.add_argument("--size", type=int, default=None)
+    parser.add_argument("--hyper3d-mode", choices=("MAIN_SITE", "FAL_AI"), default="MAIN_SITE")
+    return parser.parse_args(argv)
+
+
+def main():
+    args = parse_args()
+
+    spec = importlib.util.spec_from_file_location("blendermcp_addon", args.addon)
+    addon = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(addon)
+    addon.register()
+
+    start = time.perf_counter()
+    info = scenes.build(args.scene, args.size)
+    print(f"BENCH scene {args.scene} built in {time.perf_counter() - start:.2f}s: {info}", flush=True)
+
+    scene = bpy.context.scene
+    scene.blendermcp_use_polyhaven = True
+    scene.blendermcp_use_hyper3d = True
+    scene.blendermcp_hyper3d_mode = args.hyper3d_mode
+    scene.blendermcp_hyper3d_api_key = "benchmark-key"
+    scene.blendermcp_use_sketchfab = True
+    scene.blendermcp_sketchfab_api_key = "benchmark-key"
+
+    server = addon.BlenderMCPServer(port=args.port)
+    server.start()
+    print(f"BENCH ready on port {args.port}", flush=True)
+    server.serve_forever()
+
+
+main()
@@ -0,0 +1,257 @@
+"""
+End-to-end benchmark: real Blender, real addon, real MCP tool functions.
+
+For every standard scene (see scene_catalog.py and scenes.py) this launches
+`blender --background` with the addon, points the addon's Poly Haven,
+Sketchfab and Rodin endpoints at local stand-ins (stub_services.py), and
+times every MCP tool in src/blender_mcp/server.py against it. Nothing leaves
+the machine, so results are reproducible offline.
+
+Example:
+    python benchmarks/e2e/run_e2e.py --blender /opt/blender/blender
+    python benchmarks/e2e/run_e2e.py --scenes many_objects earbud_rig --size 50000 --repeat 10 --json e2e.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import queue
+import shutil
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+E2E_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_ROOT = os.path.dirname(os.path.dirname(E2E_DIR))
+sys.path.insert(0, E2E_DIR)
+sys.path.insert(0, os.path.join(REPO_ROOT, "src"))
+
+import scene_catalog
+import stub_services
+
+# A mesh object that exists in each scene, for tools that need a target
+SCENE_TARGETS = {
+    "many_objects": "Cube.000000",
+    "heavy_mesh": "HeavyGrid",
+    "earbud_rig": "Earbud_Left",
+    "camera_path": "cam_0-96",
+    "camera_sequence": "camera_0",
+}
+
+
+def free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("localhost", 0))
+        return s.getsockname()[1]
+
+
+class BlenderProcess:
+    """A headless Blender running the addon through blender_bootstrap.py"""
+
+    def __init__(self, blender, scene, size, port, env, hyper3d_mode="MAIN_SITE"):
+        self.port = port
+        command = [
+            blender, "--background", "--factory-startup",
+            "--python", os.path.join(E2E_DIR, "blender_bootstrap.py"),
+            "--",
+            "--addon", os.path.join(REPO_ROOT, "addon.py"),
+            "--port", str(port),
+            "--scene", scene,
+            "--hyper3d-mode", hyper3d_mode,
+        ]
+        if size is not None:
+            command += ["--size", str(size)]
+        self.process = subprocess.Popen(
+            command, env=env, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True, bufsize=1
+        )
+        self.lines = queue.Queue()
+        self.log = []
+        threading.Thread(target=self._pump_output, daemon=True).start()
+
+    def _pump_output(self):
+        for line in self.process.stdout:
+            self.log.append(line)
+            self.lines.put(line)
+
+    def wait_ready(self, timeout):
+        """Block until the addon reports it is serving; return the scene build line"""
+        deadline = time.monotonic() + timeout
+        build_line = ""
+        while time.monotonic() < deadline:
+            try:
+                line = self.lines.get(timeout=0.5)
+            except queue.Empty:
+                if self.process.poll() is not None:
+                    break
+                continue
+            if line.startswith("BENCH scene"):
+                build_line = line.strip()
+            if line.startswith("BENCH ready"):
+                return build_line
+        raise RuntimeError("Blender did not become ready:\n" + "".join(self.log[-40:]))
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def tool_calls(server, target, image_path, hyper3d_mode):
+    """(label, callable) pairs covering every MCP tool, in a dependency-friendly order"""
+    def generate_job():
+        return json.loads(server.generate_hyper3d_model_via_text(None, text_prompt="benchmark prop"))
+
+    state = {}
+
+    def generate_via_text():
+        state["job"] = generate_job()
+        return state["job"]
+
+    def poll():
+        job = state.get("job") or generate_job()
+        if hyper3d_mode == "MAIN_SITE":
+            return server.poll_rodin_job_status(None, subscription_key=job.get("subscription_key"))
+        return server.poll_rodin_job_status(None, request_id=job.get("request_id"))
+
+    def import_asset():
+        job = state.get("job") or generate_job()
+        if hyper3d_mode == "MAIN_SITE":
+            return server.import_generated_asset(None, name="BenchAsset", task_uuid=job.get("task_uuid"))
+        return server.import_generated_asset(None, name="BenchAsset", request_id=job.get("request_id"))
+
+    return [
+        ("get_scene_info", lambda: server.get_scene_info(None)),
+        ("get_object_info", lambda: server.get_object_info(None, object_name=target)),
+        ("get_viewport_screenshot", lambda: server.get_viewport_screenshot(None, max_size=400)),
+        ("execute_blender_code", lambda: server.execute_blender_code(None, code="print(len(bpy.data.objects))")),
+        ("get_polyhaven_status", lambda: server.get_polyhaven_status(None)),
+        ("get_hyper3d_status", lambda: server.get_hyper3d_status(None)),
+        ("get_sketchfab_status", lambda: server.get_sketchfab_status(None)),
+        ("get_polyhaven_categories", lambda: server.get_polyhaven_categories(None, asset_type="textures")),
+        ("search_polyhaven_assets", lambda: server.search_polyhaven_assets(None, asset_type="textures")),
+        ("download_polyhaven_asset[hdris]", lambda: server.download_polyhaven_asset(
+            None, asset_id="asset_00000", asset_type="hdris", resolution="1k")),
+        ("download_polyhaven_asset[textures]", lambda: server.download_polyhaven_asset(
+            None, asset_id="asset_00001", asset_type="textures", resolution="1k")),
+        ("download_polyhaven_asset[models]", lambda: server.download_polyhaven_asset(
+            None, asset_id="asset_00002", asset_type="models", resolution="1k")),
+        ("set_texture", lambda: server.set_texture(None, object_name=target, texture_id="asset_00001")),
+        ("search_sketchfab_models", lambda: server.search_sketchfab_models(None, query="chair", count=24)),
+        ("download_sketchfab_model", lambda: server.download_sketchfab_model(None, uid=f"{0:032x}")),
+        ("generate_hyper3d_model_via_text", generate_via_text),
+        ("generate_hyper3d_model_via_images", lambda: server.generate_hyper3d_model_via_images(
+            None, input_image_paths=[image_path]) if hyper3d_mode == "MAIN_SITE" else
+            server.generate_hyper3d_model_via_images(None, input_image_urls=["http://127.0.0.1/image.png"])),
+        ("poll_rodin_job_status", poll),
+        ("import_generated_asset", import_asset),
+        ("configure_blender_profiling", lambda: server.configure_blender_profiling(None, sample_rate=0.0)),
+        ("get_blender_profiles", lambda: server.get_blender_profiles(None, limit=1)),
+    ]
+
+
+def is_error(result):
+    if isinstance(result, str):
+        return result.startswith("Error") or result.startswith("Failed")
+    if isinstance(result, dict):
+        return "error" in result or result.get("succeed") is False
+    return False
+
+
+def time_tools(calls, repeat):
+    results = {}
+    for label, call in calls:
+        samples, errors = [], []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            try:
+                outcome = call()
+                failed = is_error(outcome)
+            except Exception as e:
+                outcome, failed = str(e), True
+            elapsed = time.perf_counter() - start
+            if failed:
+                errors.append(str(outcome)[:200])
+            else:
+                samples.append(elapsed)
+        ordered = sorted(samples)
+        results[label] = {
+            "ok": len(samples),
+            "errors": len(errors),
+            "first_error": errors[0] if errors else None,
+            "p50_ms": ordered[len(ordered) // 2] * 1000 if ordered else None,
+            "p99_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.99))] * 1000 if ordered else None,
+            "mean_ms": statistics.fmean(samples) * 1000 if samples else None,
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--blender", default=os.environ.get("BLENDER", shutil.which("blender") or "blender"),
+                        help="Blender executable (default: $BLENDER or blender on PATH)")
+    parser.add_argument("--scenes", nargs="+", choices=sorted(scene_catalog.DEFAULT_SIZES),
+                        default=sorted(scene_catalog.DEFAULT_SIZES))
+    parser.add_argument("--size", type=int, default=None, help="override the size parameter of every scene")
+    parser.add_argument("--repeat", type=int, default=5, help="calls per tool (default: 5)")
+    parser.add_argument("--latency", type=float, default=0.0, help="artificial stand-in API latency in seconds")
+    parser.add_argument("--hyper3d-mode", choices=("MAIN_SITE", "FAL_AI"), default="MAIN_SITE")
+    parser.add_argument("--startup-timeout", type=float, default=600.0)
+    parser.add_argument("--json", metavar="PATH", help="also write the results as JSON")
+    args = parser.parse_args()
+
+    logging.getLogger("BlenderMCPServer").setLevel(logging.WARNING)
+    from blender_mcp import server
+
+    services = stub_services.StubServices(latency=args.latency).start()
+    env = dict(os.environ, **services.environment())
+
+    image_file = tempfile.NamedTemporaryFile(suffix=".png", delete=False)
+    image_file.write(stub_services.make_png(512, (90, 160, 220)))
+    image_file.close()
+
+    report = {"blender": args.blender, "repeat": args.repeat, "scenes": {}}
+    try:
+        for scene_name in args.scenes:
+            port = free_port()
+            blender = BlenderProcess(args.blender, scene_name, args.size, port, env, args.hyper3d_mode)
+            try:
+                build_line = blender.wait_ready(args.startup_timeout)
+                print(f"\n{build_line}")
+
+                # Point the MCP server module at this Blender instance
+                server.DEFAULT_BLENDER_PORT = port
+                server._blender_connection = None
+
+                calls = tool_calls(server, SCENE_TARGETS[scene_name], image_file.name, args.hyper3d_mode)
+                results = time_tools(calls, args.repeat)
+                report["scenes"][scene_name] = {"build": build_line, "tools": results}
+                for label, r in results.items():
+                    timing = (f"p50 {r['p50_ms']:9.2f} ms  p99 {r['p99_ms']:9.2f} ms"
+                              if r["ok"] else " " * 32)
+                    suffix = f"  {r['errors']} error(s): {r['first_error']}" if r["errors"] else ""
+                    print(f"  {label:<38} {timing}{suffix}")
+            finally:
+                if server._blender_connection:
+                    server._blender_connection.disconnect()
+                    server._blender_connection = None
+                blender.stop()
+    finally:
+        services.stop()
+        os.unlink(image_file.name)
+
+    report["stub_requests"] = services.request_counts
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
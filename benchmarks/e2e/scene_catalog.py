@@ -0,0 +1,14 @@
+"""
+Names and default sizes of the standard benchmark scenes.
+
+This module has no bpy dependency so run_e2e.py, which runs outside Blender,
+can list the scenes; the builders themselves live in scenes.py.
+"""
+
+DEFAULT_SIZES = {
+    "many_objects": 10000,
+    "heavy_mesh": 1_000_000,
+    "earbud_rig": 2000,
+    "camera_path": 2000,
+    "camera_sequence": 1000,
+}
@@ -0,0 +1,185 @@
+"""
+Standard benchmark scenes, built inside Blender with the data API only.
+
+Each builder starts from an empty scene and is deterministic for a given size,
+so timings are comparable between runs and machines:
+
+- many_objects:    N cube objects sharing one mesh on a grid
+- heavy_mesh:      one subdivided grid with roughly N vertices
+- earbud_rig:      an armature with bone_Earbud_Left/Right animated over N
+                   frames and Earbud_Left/Right meshes parented to the bones
+                   (the rig that user/fix_earbud_clipping.py operates on)
+- camera_path:     camera "cam_0-96" keyed on every frame along a long
+                   helix (the input of user/dev_motion_path)
+- camera_sequence: N static cameras in a "world" collection, as produced by
+                   Monst3r/COLMAP glTF exports (user/Monst3r)
+"""
+
+import math
+
+import bmesh
+import bpy
+
+from scene_catalog import DEFAULT_SIZES
+
+
+def reset_scene():
+    """Remove every object and orphaned datablock from the current file"""
+    for obj in list(bpy.data.objects):
+        bpy.data.objects.remove(obj, do_unlink=True)
+    for collection in (bpy.data.meshes, bpy.data.materials, bpy.data.images, bpy.data.actions,
+                       bpy.data.cameras, bpy.data.armatures, bpy.data.curves):
+        for datablock in list(collection):
+            collection.remove(datablock)
+    for collection in list(bpy.data.collections):
+        bpy.data.collections.remove(collection)
+    scene = bpy.context.scene
+    scene.frame_start = 1
+    scene.frame_end = 250
+    scene.frame_set(1)
+    return scene
+
+
+def _cube_mesh(name="BenchCube", size=1.0):
+    mesh = bpy.data.meshes.new(name)
+    bm = bmesh.new()
+    bmesh.ops.create_cube(bm, size=size)
+    bm.to_mesh(mesh)
+    bm.free()
+    return mesh
+
+
+def _keyframe_curve(action, data_path, index, frames, values, group=None):
+    """Write a whole F-curve at once with keyframe_points.add + foreach_set"""
+    fcurve = action.fcurves.new(data_path=data_path, index=index, action_group=group or "")
+    fcurve.keyframe_points.add(len(frames))
+    co = [0.0] * (2 * len(frames))
+    co[0::2] = frames
+    co[1::2] = values
+    fcurve.keyframe_points.foreach_set("co", co)
+    fcurve.update()
+    return fcurve
+
+
+def build_many_objects(count=10000):
+    scene = reset_scene()
+    mesh = _cube_mesh()
+    side = max(int(math.sqrt(count)), 1)
+    collection = scene.collection
+    for i in range(count):
+        obj = bpy.data.objects.new(f"Cube.{i:06d}", mesh)
+        obj.location = ((i % side) * 2.5, (i // side) * 2.5, 0.0)
+        collection.objects.link(obj)
+    return {"objects": count}
+
+
+def build_heavy_mesh(vertices=1_000_000):
+    scene = reset_scene()
+    segments = max(int(math.sqrt(vertices)), 2)
+    mesh = bpy.data.meshes.new("HeavyGrid")
+    bm = bmesh.new()
+    bmesh.ops.create_grid(bm, x_segments=segments, y_segments=segments, size=50.0)
+    # Some relief so the mesh is not trivially planar
+    for v in bm.verts:
+        v.co.z = math.sin(v.co.x * 0.3) * math.cos(v.co.y * 0.3)
+    bm.to_mesh(mesh)
+    bm.free()
+    obj = bpy.data.objects.new("HeavyGrid", mesh)
+    scene.collection.objects.link(obj)
+    return {"vertices": len(mesh.vertices), "polygons": len(mesh.polygons)}
+
+
+def build_earbud_rig(frames=2000):
+    scene = reset_scene()
+    armature = bpy.data.armatures.new("EarbudRig")
+    rig = bpy.data.objects.new("EarbudRig", armature)
+    scene.collection.objects.link(rig)
+
+    bpy.context.view_layer.objects.active = rig
+    rig.select_set(True)
+    bpy.ops.object.mode_set(mode="EDIT")
+    root = armature.edit_bones.new("root")
+    root.head, root.tail = (0, 0, 0), (0, 0, 0.5)
+    for name, x in (("bone_Earbud_Left", -0.3), ("bone_Earbud_Right", 0.3)):
+        bone = armature.edit_bones.new(name)
+        bone.head, bone.tail = (x, 0, 0.5), (x, 0, 0.7)
+        bone.parent = root
+    bpy.ops.object.mode_set(mode="OBJECT")
+
+    rig.animation_data_create()
+    action = bpy.data.actions.new("EarbudRigAction")
+    rig.animation_data.action = action
+    frame_list = [float(f) for f in range(1, frames + 1)]
+    for name, phase in (("bone_Earbud_Left", 0.0), ("bone_Earbud_Right", math.pi)):
+        path = f'pose.bones["{name}"]'
+        for axis in range(3):
+            values = [0.05 * math.sin(f * 0.05 + phase + axis) for f in frame_list]
+            _keyframe_curve(action, f"{path}.location", axis, frame_list, values, group=name)
+        for axis, default in enumerate((1.0, 0.0, 0.0, 0.0)):
+            values = [default + (0.1 * math.sin(f * 0.02 + axis) if axis else 0.0) for f in frame_list]
+            _keyframe_curve(action, f"{path}.rotation_quaternion", axis, frame_list, values, group=name)
+
+    mesh = _cube_mesh("EarbudMesh", size=0.08)
+    for name in ("Earbud_Left", "Earbud_Right"):
+        earbud = bpy.data.objects.new(name, mesh)
+        earbud.parent = rig
+        earbud.parent_type = "BONE"
+        earbud.parent_bone = f"bone_{name}"
+        scene.collection.objects.link(earbud)
+
+    scene.frame_end = frames
+    return {"frames": frames, "bones": len(armature.bones)}
+
+
+def build_camera_path(frames=2000):
+    scene = reset_scene()
+    camera = bpy.data.objects.new("cam_0-96", bpy.data.cameras.new("cam_0-96"))
+    scene.collection.objects.link(camera)
+    camera.animation_data_create()
+    action = bpy.data.actions.new("cam_0-96_Action")
+    camera.animation_data.action = action
+
+    frame_list = [float(f) for f in range(1, frames + 1)]
+    # Helix with varying speed so distance- and frame-based mappings differ
+    t = [f / frames * 8 * math.pi + 0.5 * math.sin(f * 0.01) for f in frame_list]
+    _keyframe_curve(action, "location", 0, frame_list, [10 * math.cos(v) for v in t])
+    _keyframe_curve(action, "location", 1, frame_list, [10 * math.sin(v) for v in t])
+    _keyframe_curve(action, "location", 2, frame_list, [v * 0.5 for v in t])
+    _keyframe_curve(action, "rotation_euler", 0, frame_list, [math.radians(70)] * frames)
+    _keyframe_curve(action, "rotation_euler", 2, frame_list, [v + math.pi / 2 for v in t])
+
+    scene.frame_end = frames
+    return {"frames": frames}
+
+
+def build_camera_sequence(count=1000):
+    scene = reset_scene()
+    collection = bpy.data.collections.new("world")
+    scene.collection.children.link(collection)
+    world = bpy.data.objects.new("world", None)
+    collection.objects.link(world)
+    lens_data = bpy.data.cameras.new("SequenceCamera")
+    for i in range(count):
+        camera = bpy.data.objects.new(f"camera_{i}", lens_data)
+        angle = i / count * 2 * math.pi
+        camera.location = (6 * math.cos(angle), 6 * math.sin(angle), 1.5 + 0.2 * math.sin(i * 0.1))
+        camera.rotation_euler = (math.radians(80), 0.0, angle + math.pi / 2)
+        camera.parent = world
+        collection.objects.link(camera)
+    return {"cameras": count}
+
+
+BUILDERS = {
+    "many_objects": build_many_objects,
+    "heavy_mesh": build_heavy_mesh,
+    "earbud_rig": build_earbud_rig,
+    "camera_path": build_camera_path,
+    "camera_sequence": build_camera_sequence,
+}
+SCENES = {name: (BUILDERS[name], size) for name, size in DEFAULT_SIZES.items()}
+
+
+def build(name, size=None):
+    """Build the named scene, using its default size when size is None"""
+    builder, default_size = SCENES[name]
+    return builder(default_size if size is None else size)
@@ -0,0 +1,419 @@
+"""
+Local stand-ins for the Poly Haven, Sketchfab and Hyper3D Rodin (main site and
+fal.ai) HTTP APIs used by the addon.
+
+All assets are generated in memory: solid-color PNG textures, a small Radiance
+HDR, and a textured cube as glTF (+ .bin + texture), GLB and a Sketchfab-style
+zip. Every provider answers just enough of its API for the addon's handlers
+to run end to end, so asset-pipeline throughput can be measured offline.
+
+Run standalone to poke at it:
+    python benchmarks/e2e/stub_services.py --port 8765
+"""
+
+import argparse
+import io
+import itertools
+import json
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+TEXTURE_MAPS = ("Diffuse", "nor_gl", "Rough", "Displacement", "arm")
+RESOLUTIONS = ("1k", "2k", "4k")
+
+
+#region Synthetic assets
+def make_png(size=256, rgb=(128, 128, 128)):
+    """Encode a solid-color RGB PNG"""
+    def chunk(kind, data):
+        body = kind + data
+        return struct.pack(">I", len(data)) + body + struct.pack(">I", zlib.crc32(body) & 0xFFFFFFFF)
+
+    row = b"\x00" + bytes(rgb) * size
+    raw = zlib.compress(row * size, 6)
+    header = struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", header) + chunk(b"IDAT", raw) + chunk(b"IEND", b"")
+
+
+def make_hdr(width=256, height=128):
+    """Encode a flat (non-RLE) Radiance HDR sky gradient"""
+    header = f"#?RADIANCE\nFORMAT=32-bit_rle_rgbe\n\n-Y {height} +X {width}\n".encode("ascii")
+    pixels = bytearray()
+    for y in range(height):
+        # Brighter towards the top, encoded with a shared exponent of 2^1
+        level = int(64 + 128 * (1 - y / height))
+        pixels += bytes((level, level, min(level + 40, 255), 129)) * width
+    return header + bytes(pixels)
+
+
+def _cube_geometry():
+    """Positions, normals, UVs and indices for a unit cube with per-face normals"""
+    faces = [
+        ((1, 0, 0), [(1, -1, -1), (1, 1, -1), (1, 1, 1), (1, -1, 1)]),
+        ((-1, 0, 0), [(-1, 1, -1), (-1, -1, -1), (-1, -1, 1), (-1, 1, 1)]),
+        ((0, 1, 0), [(1, 1, -1), (-1, 1, -1), (-1, 1, 1), (1, 1, 1)]),
+        ((0, -1, 0), [(-1, -1, -1), (1, -1, -1), (1, -1, 1), (-1, -1, 1)]),
+        ((0, 0, 1), [(-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)]),
+        ((0, 0, -1), [(-1, 1, -1), (1, 1, -1), (1, -1, -1), (-1, -1, -1)]),
+    ]
+    positions, normals, uvs, indices = [], [], [], []
+    for normal, corners in faces:
+        base = len(positions)
+        for corner, uv in zip(corners, ((0, 0), (1, 0), (1, 1), (0, 1))):
+            positions.append(tuple(c * 0.5 for c in corner))
+            normals.append(normal)
+            uvs.append(uv)
+        indices += [base, base + 1, base + 2, base, base + 2, base + 3]
+    return positions, normals, uvs, indices
+
+
+def _pad4(data, fill=b"\x00"):
+    return data + fill * (-len(data) % 4)
+
+
+def make_cube_gltf(image_uri="textures/cube_diff.png", buffer_uri="cube.bin", embed_image=None):
+    """
+    Build a textured cube as (gltf_json_dict, bin_bytes).
+
+    If embed_image is given, the image is stored in the binary buffer (for GLB)
+    instead of being referenced by image_uri.
+    """
+    positions, normals, uvs, indices = _cube_geometry()
+    position_bytes = b"".join(struct.pack("<3f", *p) for p in positions)
+    normal_bytes = b"".join(struct.pack("<3f", *n) for n in normals)
+    uv_bytes = b"".join(struct.pack("<2f", *uv) for uv in uvs)
+    index_bytes = _pad4(struct.pack(f"<{len(indices)}H", *indices))
+
+    views = []
+    blob = b""
+    for data, target in ((position_bytes, 34962), (normal_bytes, 34962), (uv_bytes, 34962), (index_bytes, 34963)):
+        views.append({"buffer": 0, "byteOffset": len(blob), "byteLength": len(data), "target": target})
+        blob += data
+
+    image = {"uri": image_uri, "mimeType": "image/png"}
+    if embed_image is not None:
+        views.append({"buffer": 0, "byteOffset": len(blob), "byteLength": len(embed_image)})
+        blob += _pad4(embed_image)
+        image = {"bufferView": len(views) - 1, "mimeType": "image/png"}
+
+    gltf = {
+        "asset": {"version": "2.0", "generator": "blendermcp-benchmark"},
+        "scene": 0,
+        "scenes": [{"nodes": [0]}],
+        "nodes": [{"mesh": 0, "name": "Cube"}],
+        "meshes": [{
+            "name": "Cube",
+            "primitives": [{
+                "attributes": {"POSITION": 0, "NORMAL": 1, "TEXCOORD_0": 2},
+                "indices": 3,
+                "material": 0,
+            }],
+        }],
+        "materials": [{
+            "name": "CubeMaterial",
+            "pbrMetallicRoughness": {"baseColorTexture": {"index": 0}, "metallicFactor": 0.0, "roughnessFactor": 0.8},
+        }],
+        "textures": [{"source": 0}],
+        "images": [image],
+        "accessors": [
+            {"bufferView": 0, "componentType": 5126, "count": len(positions), "type": "VEC3",
+             "min": [-0.5, -0.5, -0.5], "max": [0.5, 0.5, 0.5]},
+            {"bufferView": 1, "componentType": 5126, "count": len(normals), "type": "VEC3"},
+            {"bufferView": 2, "componentType": 5126, "count": len(uvs), "type": "VEC2"},
+            {"bufferView": 3, "componentType": 5123, "count": len(indices), "type": "SCALAR"},
+        ],
+        "bufferViews": views,
+        "buffers": [{"byteLength": len(blob)} if embed_image is not None else {"uri": buffer_uri, "byteLength": len(blob)}],
+    }
+    return gltf, blob
+
+
+def make_cube_glb():
+    """Encode the textured cube as a self-contained GLB"""
+    gltf, blob = make_cube_gltf(embed_image=make_png(128, (180, 90, 40)))
+    json_chunk = _pad4(json.dumps(gltf, separators=(",", ":")).encode("utf-8"), b" ")
+    bin_chunk = _pad4(blob)
+    length = 12 + 8 + len(json_chunk) + 8 + len(bin_chunk)
+    return (
+        struct.pack("<4sII", b"glTF", 2, length)
+        + struct.pack("<I4s", len(json_chunk), b"JSON") + json_chunk
+        + struct.pack("<I4s", len(bin_chunk), b"BIN\x00") + bin_chunk
+    )
+
+
+def make_sketchfab_zip(padding_bytes=0):
+    """Zip a glTF scene the way Sketchfab archives are laid out"""
+    gltf, blob = make_cube_gltf(image_uri="textures/material_baseColor.png", buffer_uri="scene.bin")
+    buffer = io.BytesIO()
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr("scene.gltf", json.dumps(gltf))
+        archive.writestr("scene.bin", blob)
+        archive.writestr("textures/material_baseColor.png", make_png(512, (200, 200, 200)))
+        archive.writestr("license.txt", "CC-BY benchmark asset")
+        if padding_bytes:
+            # Unreferenced payload that a selective extractor can skip
+            archive.writestr("source/original.blend", b"\x00" * padding_bytes)
+    return buffer.getvalue()
+#endregion
+
+
+class StubServices:
+    """Threaded HTTP server exposing all provider stand-ins under one port"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, asset_count=500, zip_padding=0):
+        self.latency = latency
+        self.asset_count = asset_count
+        self._ids = itertools.count(1)
+        self._blobs = {
+            "texture.png": make_png(256, (140, 120, 100)),
+            "sky.hdr": make_hdr(),
+            "cube.glb": make_cube_glb(),
+            "model.zip": make_sketchfab_zip(zip_padding),
+        }
+        gltf, blob = make_cube_gltf()
+        self._blobs["cube.gltf"] = json.dumps(gltf).encode("utf-8")
+        self._blobs["cube.bin"] = blob
+        self.request_counts = {}
+        self._lock = threading.Lock()
+
+        services = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                services._dispatch(self, "GET")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    self.rfile.read(length)
+                elif self.headers.get("Transfer-Encoding") == "chunked":
+                    while True:
+                        size = int(self.rfile.readline().strip() or b"0", 16)
+                        self.rfile.read(size + 2)
+                        if size == 0:
+                            break
+                services._dispatch(self, "POST")
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = None
+
+    @property
+    def base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def environment(self):
+        """Environment variables that point the addon at these stand-ins"""
+        return {
+            "BLENDERMCP_POLYHAVEN_API_URL": f"{self.base_url}/polyhaven",
+            "BLENDERMCP_SKETCHFAB_API_URL": f"{self.base_url}/sketchfab/v3",
+            "BLENDERMCP_RODIN_API_URL": f"{self.base_url}/rodin/api/v2",
+            "BLENDERMCP_FAL_AI_API_URL": f"{self.base_url}/fal/fal-ai/hyper3d",
+        }
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    #region Routing
+    def _dispatch(self, handler, method):
+        if self.latency:
+            time.sleep(self.latency)
+        parsed = urlparse(handler.path)
+        parts = [p for p in parsed.path.split("/") if p]
+        query = {k: v[-1] for k, v in parse_qs(parsed.query).items()}
+        provider = parts[0] if parts else ""
+        with self._lock:
+            key = f"{method} /{'/'.join(parts[:3])}"
+            self.request_counts[key] = self.request_counts.get(key, 0) + 1
+
+        routes = {
+            "polyhaven": self._polyhaven,
+            "sketchfab": self._sketchfab,
+            "rodin": self._rodin,
+            "fal": self._fal,
+            "blobs": self._blob,
+        }
+        route = routes.get(provider)
+        if route is None:
+            return self._send(handler, 404, {"error": "unknown provider"})
+        try:
+            status, body = route(method, parts[1:], query)
+        except KeyError as e:
+            status, body = 404, {"error": f"not found: {e}"}
+        self._send(handler, status, body)
+
+    def _send(self, handler, status, body):
+        if isinstance(body, (dict, list)):
+            data = json.dumps(body).encode("utf-8")
+            content_type = "application/json"
+        else:
+            data = body
+            content_type = "application/octet-stream"
+        handler.send_response(status)
+        handler.send_header("Content-Type", content_type)
+        handler.send_header("Content-Length", str(len(data)))
+        handler.end_headers()
+        handler.wfile.write(data)
+
+    def _blob_url(self, name):
+        return f"{self.base_url}/blobs/{name}"
+
+    def _blob(self, method, parts, query):
+        return 200, self._blobs[parts[-1]]
+    #endregion
+
+    #region Poly Haven
+    def _polyhaven_asset(self, i):
+        kind = i % 3
+        category = ["nature", "indoor", "urban", "studio", "rock"][i % 5]
+        return {
+            "name": f"Benchmark Asset {i}",
+            "type": kind,
+            "categories": [category, "benchmark"],
+            "tags": [category, f"tag{i % 17}", "synthetic"],
+            "download_count": (i * 7919) % 100000,
+            "date_published": 1600000000 + i,
+        }
+
+    def _polyhaven(self, method, parts, query):
+        endpoint = parts[0]
+        if endpoint == "categories":
+            return 200, {"nature": 120, "indoor": 80, "urban": 60, "studio": 40, "rock": 30, "benchmark": self.asset_count}
+        if endpoint == "assets":
+            kinds = {"hdris": 0, "textures": 1, "models": 2}
+            wanted = kinds.get(query.get("type"))
+            assets = {}
+            for i in range(self.asset_count):
+                asset = self._polyhaven_asset(i)
+                if wanted is not None and asset["type"] != wanted:
+                    continue
+                if query.get("categories") and query["categories"] not in asset["categories"]:
+                    continue
+                assets[f"asset_{i:05d}"] = asset
+            return 200, assets
+        if endpoint == "files":
+            files = {
+                "hdri": {res: {"hdr": {"url": self._blob_url("sky.hdr"), "size": len(self._blobs["sky.hdr"])},
+                               "exr": {"url": self._blob_url("sky.hdr"), "size": len(self._blobs["sky.hdr"])}}
+                         for res in RESOLUTIONS},
+                "gltf": {res: {"gltf": {
+                    "url": self._blob_url("cube.gltf"),
+                    "include": {
+                        "cube.bin": {"url": self._blob_url("cube.bin")},
+                        "textures/cube_diff.png": {"url": self._blob_url("texture.png")},
+                    },
+                }} for res in RESOLUTIONS},
+                "blend": {},
+            }
+            for map_type in TEXTURE_MAPS:
+                files[map_type] = {res: {"jpg": {"url": self._blob_url("texture.png")},
+                                         "png": {"url": self._blob_url("texture.png")}}
+                                   for res in RESOLUTIONS}
+            return 200, files
+        raise KeyError(endpoint)
+    #endregion
+
+    #region Sketchfab
+    def _sketchfab_model(self, i):
+        uid = f"{i:032x}"
+        return {
+            "uid": uid,
+            "name": f"Benchmark Model {i}",
+            "faceCount": 1000 + i,
+            "vertexCount": 600 + i,
+            "isDownloadable": True,
+            "user": {"username": f"artist{i % 9}", "displayName": f"Artist {i % 9}", "uri": f"{self.base_url}/users/{i}"},
+            "license": {"label": "CC Attribution", "slug": "by", "fullName": "Creative Commons Attribution"},
+            "thumbnails": {"images": [
+                {"url": f"{self.base_url}/thumb/{uid}/{w}.jpg", "width": w, "height": w}
+                for w in (64, 256, 720, 1024)
+            ]},
+            "tags": [{"name": f"tag{t}", "slug": f"tag{t}"} for t in range(8)],
+            "categories": [{"name": "benchmark"}],
+        }
+
+    def _sketchfab(self, method, parts, query):
+        # parts: ["v3", endpoint, ...]
+        endpoint = parts[1]
+        if endpoint == "me":
+            return 200, {"username": "benchmark"}
+        if endpoint == "search":
+            count = int(query.get("count", 24))
+            cursor = int(query.get("cursor", 0))
+            results = [self._sketchfab_model(i) for i in range(cursor, cursor + count)]
+            next_url = f"{self.base_url}/sketchfab/v3/search?{'&'.join(f'{k}={v}' for k, v in query.items() if k != 'cursor')}&cursor={cursor + count}"
+            return 200, {"results": results, "next": next_url, "previous": None, "cursors": {"next": str(cursor + count)}}
+        if endpoint == "models":
+            return 200, {"gltf": {"url": self._blob_url("model.zip"), "size": len(self._blobs["model.zip"]), "expires": 300}}
+        raise KeyError(endpoint)
+    #endregion
+
+    #region Hyper3D Rodin
+    def _rodin(self, method, parts, query):
+        # parts: ["api", "v2", endpoint]
+        endpoint = parts[2]
+        if endpoint == "rodin":
+            job = next(self._ids)
+            return 201, {
+                "uuid": f"task-{job}",
+                "jobs": {"uuids": [f"job-{job}"], "subscription_key": f"sub-{job}"},
+                "submit_time": time.strftime("%Y-%m-%dT%H:%M:%SZ"),
+            }
+        if endpoint == "status":
+            return 200, {"jobs": [{"uuid": "job", "status": "Done"}]}
+        if endpoint == "download":
+            return 200, {"list": [
+                {"name": "preview.webp", "url": self._blob_url("texture.png")},
+                {"name": "base.glb", "url": self._blob_url("cube.glb")},
+            ]}
+        raise KeyError(endpoint)
+
+    def _fal(self, method, parts, query):
+        # parts: ["fal-ai", "hyper3d", "rodin"] or ["fal-ai", "hyper3d", "requests", id(, "status")]
+        endpoint = parts[2]
+        if endpoint == "rodin":
+            return 200, {"request_id": f"req-{next(self._ids)}"}
+        if endpoint == "requests":
+            if len(parts) > 4 and parts[4] == "status":
+                return 200, {"status": "COMPLETED"}
+            return 200, {"model_mesh": {"url": self._blob_url("cube.glb"), "file_size": len(self._blobs["cube.glb"])}}
+        raise KeyError(endpoint)
+    #endregion
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="artificial per-request latency in seconds")
+    args = parser.parse_args()
+
+    services = StubServices(args.host, args.port, latency=args.latency).start()
+    print(f"Stub services listening on {services.base_url}")
+    for key, value in services.environment().items():
+        print(f"  {key}={value}")
+    try:
+        services.thread.join()
+    except KeyboardInterrupt:
+        services.stop()
+
+
+if __name__ == "__main__":
+    main()
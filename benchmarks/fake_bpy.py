@@ -0,0 +1,329 @@
+"""
+Lightweight stand-in for the parts of bpy/mathutils the addon touches.
+
+It is only meant to let addon.py be imported and driven outside Blender so the
+socket protocol and command dispatch can be measured. Scenes are synthetic:
+every object is a plain Python object with the attributes the read-only
+handlers need (name, type, transforms, bounding box, mesh counts).
+
+Usage:
+    import fake_bpy
+    fake_bpy.install(object_count=10000)
+    import addon  # now imports against the fake modules
+    ...
+    fake_bpy.timers.run_pending()  # on the "main thread"
+"""
+
+import heapq
+import itertools
+import sys
+import threading
+import time
+import types
+
+
+#region mathutils
+class Vector(tuple):
+    """Immutable 3D/4D vector with the accessors the addon uses"""
+
+    def __new__(cls, values=(0.0, 0.0, 0.0)):
+        return super().__new__(cls, (float(v) for v in values))
+
+    x = property(lambda self: self[0])
+    y = property(lambda self: self[1])
+    z = property(lambda self: self[2])
+
+    def __add__(self, other):
+        return Vector(a + b for a, b in zip(self, other))
+
+    def __sub__(self, other):
+        return Vector(a - b for a, b in zip(self, other))
+
+    @property
+    def length(self):
+        return sum(v * v for v in self) ** 0.5
+
+    def copy(self):
+        return Vector(self)
+
+
+class Matrix:
+    """Translation-only 4x4 matrix; enough for world-space bounding boxes"""
+
+    def __init__(self, translation=(0.0, 0.0, 0.0)):
+        self.translation = Vector(translation)
+
+    def __matmul__(self, other):
+        if isinstance(other, Matrix):
+            return Matrix(self.translation + other.translation)
+        return Vector(other) + self.translation
+
+    def inverted(self):
+        return Matrix(Vector(-v for v in self.translation))
+
+    @classmethod
+    def Identity(cls, size=4):
+        return cls()
+#endregion
+
+
+#region Data model
+class IDCollection:
+    """Ordered name -> datablock mapping behaving like bpy.data.* collections"""
+
+    def __init__(self, factory=None):
+        self._items = {}
+        self._factory = factory
+
+    def __iter__(self):
+        return iter(list(self._items.values()))
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, key):
+        if isinstance(key, int):
+            return list(self._items.values())[key]
+        return self._items[key]
+
+    def __contains__(self, key):
+        return key in self._items
+
+    def get(self, name, default=None):
+        return self._items.get(name, default)
+
+    def keys(self):
+        return list(self._items.keys())
+
+    def values(self):
+        return list(self._items.values())
+
+    def items(self):
+        return list(self._items.items())
+
+    def new(self, name, *args, **kwargs):
+        unique = name
+        for i in itertools.count(1):
+            if unique not in self._items:
+                break
+            unique = f"{name}.{i:03d}"
+        item = self._factory(unique, *args, **kwargs) if self._factory else types.SimpleNamespace(name=unique)
+        self._items[unique] = item
+        return item
+
+    def link(self, item):
+        self._items[item.name] = item
+
+    def remove(self, item, **kwargs):
+        self._items.pop(item.name, None)
+
+
+class Mesh:
+    def __init__(self, name, vertex_count=8):
+        self.name = name
+        self.vertices = [None] * vertex_count
+        self.edges = [None] * (vertex_count * 3 // 2)
+        self.polygons = [None] * max(vertex_count - 2, 0)
+        self.materials = []
+
+
+class Object:
+    """Synthetic scene object"""
+
+    def __init__(self, name, data=None, location=(0.0, 0.0, 0.0), obj_type=None):
+        self.name = name
+        self.data = data
+        self.type = obj_type or ("MESH" if isinstance(data, Mesh) else "EMPTY")
+        self.location = Vector(location)
+        self.rotation_euler = Vector((0.0, 0.0, 0.0))
+        self.scale = Vector((1.0, 1.0, 1.0))
+        self.matrix_world = Matrix(location)
+        self.bound_box = [
+            (x, y, z) for x in (-1.0, 1.0) for y in (-1.0, 1.0) for z in (-1.0, 1.0)
+        ]
+        self.material_slots = []
+        self.parent = None
+        self.children = []
+        self.animation_data = None
+        self._selected = False
+
+    def visible_get(self):
+        return True
+
+    def select_get(self):
+        return self._selected
+
+    def select_set(self, state):
+        self._selected = bool(state)
+
+
+class Scene:
+    """Scene with the addon's registered properties preset to sensible defaults"""
+
+    def __init__(self, name="Scene"):
+        self.name = name
+        self.objects = IDCollection()
+        self.world = None
+        self.frame_start = 1
+        self.frame_end = 250
+        self.frame_current = 1
+        self.blendermcp_port = 9876
+        self.blendermcp_server_running = False
+        self.blendermcp_use_polyhaven = True
+        self.blendermcp_use_hyper3d = False
+        self.blendermcp_hyper3d_mode = "MAIN_SITE"
+        self.blendermcp_hyper3d_api_key = ""
+        self.blendermcp_use_sketchfab = False
+        self.blendermcp_sketchfab_api_key = ""
+
+    def frame_set(self, frame, subframe=0.0):
+        self.frame_current = frame
+#endregion
+
+
+#region Timers
+class FakeTimers:
+    """
+    Deterministic replacement for bpy.app.timers.
+
+    Callbacks registered from any thread are queued and only run when the
+    owner of the "main thread" calls run_pending(), mirroring how Blender
+    executes them between UI events.
+    """
+
+    def __init__(self):
+        self._heap = []
+        self._counter = itertools.count()
+        self._cond = threading.Condition()
+
+    def register(self, function, first_interval=0.0, persistent=False):
+        with self._cond:
+            due = time.perf_counter() + (first_interval or 0.0)
+            heapq.heappush(self._heap, (due, next(self._counter), function))
+            self._cond.notify()
+
+    def unregister(self, function):
+        with self._cond:
+            self._heap = [entry for entry in self._heap if entry[2] is not function]
+            heapq.heapify(self._heap)
+
+    def is_registered(self, function):
+        with self._cond:
+            return any(entry[2] is function for entry in self._heap)
+
+    def run_pending(self, timeout=0.05):
+        """Run every callback that is due, waiting up to timeout for one to arrive"""
+        with self._cond:
+            if not self._heap:
+                self._cond.wait(timeout)
+            now = time.perf_counter()
+            due = []
+            while self._heap and self._heap[0][0] <= now:
+                due.append(heapq.heappop(self._heap)[2])
+        ran = 0
+        for function in due:
+            interval = function()
+            ran += 1
+            if interval is not None:
+                self.register(function, first_interval=interval)
+        return ran
+
+
+timers = FakeTimers()
+#endregion
+
+
+#region Installation
+def _prop(**kwargs):
+    return kwargs.get("default")
+
+
+def _persistent(function):
+    return function
+
+
+def build_scene(object_count=1000, mesh_vertices=8):
+    """Populate a fresh scene with object_count synthetic mesh objects on a grid"""
+    scene = Scene()
+    objects = IDCollection()
+    meshes = IDCollection()
+    side = max(int(object_count ** 0.5), 1)
+    for i in range(object_count):
+        mesh = Mesh(f"Mesh.{i:06d}", mesh_vertices)
+        meshes.link(mesh)
+        obj = Object(f"Object.{i:06d}", mesh, location=(i % side, i // side, 0.0))
+        objects.link(obj)
+        scene.objects.link(obj)
+    return scene, objects, meshes
+
+
+def install(object_count=1000, mesh_vertices=8):
+    """Install fake bpy/mathutils modules into sys.modules and return the bpy module"""
+    scene, objects, meshes = build_scene(object_count, mesh_vertices)
+
+    bpy = types.ModuleType("bpy")
+    bpy.props = types.ModuleType("bpy.props")
+    for name in ("StringProperty", "IntProperty", "BoolProperty", "EnumProperty",
+                 "FloatProperty", "FloatVectorProperty", "PointerProperty", "CollectionProperty"):
+        setattr(bpy.props, name, _prop)
+
+    bpy.types = types.SimpleNamespace(
+        Panel=type("Panel", (), {}),
+        Operator=type("Operator", (), {}),
+        Scene=Scene,
+        Object=Object,
+        Mesh=Mesh,
+    )
+    bpy.utils = types.SimpleNamespace(
+        register_class=lambda cls: None,
+        unregister_class=lambda cls: None,
+        user_resource=lambda resource_type, path="", create=False: "",
+    )
+    bpy.app = types.SimpleNamespace(
+        timers=timers,
+        version=(4, 2, 0),
+        background=False,
+        handlers=types.SimpleNamespace(
+            persistent=_persistent,
+            load_post=[],
+            undo_post=[],
+            redo_post=[],
+            depsgraph_update_post=[],
+        ),
+    )
+    view_layer = types.SimpleNamespace(
+        objects=types.SimpleNamespace(active=None),
+        update=lambda: None,
+    )
+    bpy.context = types.SimpleNamespace(
+        scene=scene,
+        view_layer=view_layer,
+        collection=types.SimpleNamespace(objects=scene.objects),
+        selected_objects=[],
+        screen=types.SimpleNamespace(areas=[]),
+    )
+    bpy.data = types.SimpleNamespace(
+        objects=objects,
+        meshes=meshes,
+        materials=IDCollection(),
+        images=IDCollection(),
+        worlds=IDCollection(),
+        actions=IDCollection(),
+        cameras=IDCollection(),
+        curves=IDCollection(),
+        collections=IDCollection(),
+        node_groups=IDCollection(),
+        scenes=IDCollection(),
+    )
+    bpy.data.scenes.link(scene)
+    bpy.ops = types.SimpleNamespace()
+
+    mathutils = types.ModuleType("mathutils")
+    mathutils.Vector = Vector
+    mathutils.Matrix = Matrix
+
+    sys.modules["bpy"] = bpy
+    sys.modules["bpy.props"] = bpy.props
+    sys.modules["mathutils"] = mathutils
+    return bpy
+#endregion
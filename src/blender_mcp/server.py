@@ -5,24 +5,317 @@ import json
 import asyncio
 import logging
 import tempfile
-from dataclasses import dataclass
-from contextlib import asynccontextmanager
-from typing import AsyncIterator, Dict, Any, List
+import time
+import secrets
+import threading
+import queue
+import itertools
+import struct
+import array
+import sys
+import urllib.request
+import zlib
+from dataclasses import dataclass, field
+from multiprocessing import shared_memory
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Dict, Any, List, Optional
 import os
 from pathlib import Path
 import base64
 from urllib.parse import urlparse
 
+# Optional binary encoding for the Blender socket; JSON is used without it
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+# Optional zstd compression for large frames; zlib is always available
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
 # Configure logging
 logging.basicConfig(level=logging.INFO, 
                     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger("BlenderMCPServer")
 
+# Tracing: export spans as JSON lines to a file and/or to an OTLP/HTTP collector
+TRACE_FILE = os.environ.get("BLENDER_MCP_TRACE_FILE")
+OTLP_ENDPOINT = os.environ.get("BLENDER_MCP_OTLP_ENDPOINT")  # e.g. http://localhost:4318/v1/traces
+
+@dataclass
+class Span:
+    """A finished or in-flight unit of work in a command's trace"""
+    name: str
+    trace_id: str
+    parent_span_id: Optional[str] = None
+    span_id: str = field(default_factory=lambda: secrets.token_hex(8))
+    start_time_unix_nano: int = field(default_factory=time.time_ns)
+    end_time_unix_nano: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    service: str = "blender-mcp-server"
+    status: str = "OK"
+
+    @property
+    def traceparent(self) -> str:
+        return f"00-{self.trace_id}-{self.span_id}-01"
+
+    def end(self):
+        self.end_time_unix_nano = time.time_ns()
+
+    def child(self, name: str, **attributes) -> "Span":
+        return Span(name=name, trace_id=self.trace_id, parent_span_id=self.span_id, attributes=attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_span_id": self.parent_span_id,
+            "start_time_unix_nano": self.start_time_unix_nano,
+            "end_time_unix_nano": self.end_time_unix_nano,
+            "service": self.service,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+class SpanExporter:
+    """Writes finished traces to a JSON-lines file and/or an OTLP/HTTP JSON endpoint"""
+
+    def __init__(self, trace_file: str = None, otlp_endpoint: str = None):
+        self.trace_file = trace_file
+        self.otlp_endpoint = otlp_endpoint
+        self._file_lock = threading.Lock()
+        self._otlp_queue = None
+        if otlp_endpoint:
+            # Ship to the collector from a background thread so tool calls never wait on it
+            self._otlp_queue = queue.Queue(maxsize=1000)
+            threading.Thread(target=self._otlp_worker, daemon=True).start()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.trace_file or self.otlp_endpoint)
+
+    def export(self, spans: List[Dict[str, Any]]):
+        if self.trace_file:
+            try:
+                with self._file_lock, open(self.trace_file, "a", encoding="utf-8") as f:
+                    for span in spans:
+                        f.write(json.dumps(span) + "\n")
+            except OSError as e:
+                logger.warning(f"Failed to write spans to {self.trace_file}: {str(e)}")
+        if self._otlp_queue is not None:
+            try:
+                self._otlp_queue.put_nowait(spans)
+            except queue.Full:
+                logger.warning("Dropping spans: OTLP export queue is full")
+
+    def _otlp_worker(self):
+        while True:
+            spans = self._otlp_queue.get()
+            try:
+                request = urllib.request.Request(
+                    self.otlp_endpoint,
+                    data=json.dumps(self._to_otlp(spans)).encode("utf-8"),
+                    headers={"Content-Type": "application/json"},
+                    method="POST",
+                )
+                urllib.request.urlopen(request, timeout=5).close()
+            except Exception as e:
+                logger.warning(f"Failed to export spans to {self.otlp_endpoint}: {str(e)}")
+
+    @staticmethod
+    def _to_otlp(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Convert spans to the OTLP/HTTP JSON encoding, grouped by service"""
+        def attribute(key, value):
+            if isinstance(value, bool):
+                return {"key": key, "value": {"boolValue": value}}
+            if isinstance(value, int):
+                return {"key": key, "value": {"intValue": str(value)}}
+            if isinstance(value, float):
+                return {"key": key, "value": {"doubleValue": value}}
+            return {"key": key, "value": {"stringValue": str(value)}}
+
+        by_service: Dict[str, List[Dict[str, Any]]] = {}
+        for span in spans:
+            otlp_span = {
+                "traceId": span["trace_id"],
+                "spanId": span["span_id"],
+                "name": span["name"],
+                "kind": 3 if span["parent_span_id"] is None else 1,  # CLIENT for roots, INTERNAL otherwise
+                "startTimeUnixNano": str(span["start_time_unix_nano"]),
+                "endTimeUnixNano": str(span["end_time_unix_nano"] or span["start_time_unix_nano"]),
+                "attributes": [attribute(k, v) for k, v in span.get("attributes", {}).items()],
+                "status": {"code": 2 if span.get("status") == "ERROR" else 1},
+            }
+            if span["parent_span_id"]:
+                otlp_span["parentSpanId"] = span["parent_span_id"]
+            by_service.setdefault(span.get("service", "blender-mcp-server"), []).append(otlp_span)
+
+        return {"resourceSpans": [
+            {
+                "resource": {"attributes": [attribute("service.name", service)]},
+                "scopeSpans": [{"scope": {"name": "blender-mcp"}, "spans": service_spans}],
+            }
+            for service, service_spans in by_service.items()
+        ]}
+
+span_exporter = SpanExporter(TRACE_FILE, OTLP_ENDPOINT)
+
+@contextmanager
+def _child_span(spans: List[Span], parent: Optional[Span], name: str, **attributes):
+    """Record a child span of parent into spans; a no-op when tracing is off"""
+    if parent is None:
+        yield None
+        return
+    span = parent.child(name, **attributes)
+    try:
+        yield span
+    except Exception as e:
+        span.status = "ERROR"
+        span.attributes["error.message"] = str(e)
+        raise
+    finally:
+        span.end()
+        spans.append(span)
+
+# Socket protocol. After "negotiate_protocol" succeeds every message is a frame:
+# a header (flags, payload length) followed by the encoded payload. Must match addon.py.
+PROTOCOL_VERSION = 1
+FRAME_HEADER = struct.Struct("!BI")
+FRAME_FLAG_MSGPACK = 0x01
+FRAME_FLAG_COMPRESSED = 0x02
+FRAME_FLAG_SHARED_MEMORY = 0x04
+MAX_FRAME_SIZE = 1 << 30
+SHARED_MEMORY_HANDLE = struct.Struct("!QQ")  # (offset, length) of a payload in the ring
+MSGPACK_EXT_ARRAY = 1  # array.array: typecode byte + little-endian items
+
+# "auto" prefers msgpack when installed, "json" keeps frames human-readable,
+# "legacy" skips negotiation and speaks the original unframed JSON
+BLENDER_MCP_ENCODING = os.environ.get("BLENDER_MCP_ENCODING", "auto")
+
+# Frame compression in both directions: "auto" (zstd if installed, else zlib),
+# "zstd", "zlib" or "none"; frames below the threshold are sent uncompressed
+BLENDER_MCP_COMPRESSION = os.environ.get("BLENDER_MCP_COMPRESSION", "auto")
+BLENDER_MCP_COMPRESSION_THRESHOLD = int(os.environ.get("BLENDER_MCP_COMPRESSION_THRESHOLD", 64 * 1024))
+BLENDER_MCP_COMPRESSION_LEVEL = (int(os.environ["BLENDER_MCP_COMPRESSION_LEVEL"])
+                                 if os.environ.get("BLENDER_MCP_COMPRESSION_LEVEL") else None)
+
+# Same-host bulk transfer: large responses are written to a shared-memory ring
+# owned by this process and only their offset travels over the socket.
+# "auto" offers it for Unix sockets and loopback TCP, "off" disables it.
+BLENDER_MCP_SHARED_MEMORY = os.environ.get("BLENDER_MCP_SHARED_MEMORY", "auto")
+BLENDER_MCP_SHARED_MEMORY_SIZE = int(os.environ.get("BLENDER_MCP_SHARED_MEMORY_SIZE", 64 * 1024 * 1024))
+BLENDER_MCP_SHARED_MEMORY_THRESHOLD = int(os.environ.get("BLENDER_MCP_SHARED_MEMORY_THRESHOLD", 256 * 1024))
+LOOPBACK_HOSTS = ("localhost", "127.0.0.1", "::1")
+
+def _create_shared_memory(size: int) -> shared_memory.SharedMemory:
+    """Create a segment that this process unlinks itself on disconnect"""
+    try:
+        return shared_memory.SharedMemory(create=True, size=size, track=False)
+    except TypeError:
+        # Before Python 3.13 there is no track flag; the resource tracker still
+        # cleans up after a crash, which is what we want for a segment we own
+        return shared_memory.SharedMemory(create=True, size=size)
+
+def _compress(algorithm: str, data: bytes, level: int) -> bytes:
+    if algorithm == "zstd":
+        return zstandard.ZstdCompressor(level=level).compress(data)
+    return zlib.compress(data, level)
+
+def _decompress(algorithm: str, data: bytes) -> bytes:
+    if algorithm == "zstd":
+        return zstandard.ZstdDecompressor().decompress(data, max_output_size=MAX_FRAME_SIZE)
+    decompressor = zlib.decompressobj()
+    result = decompressor.decompress(data, MAX_FRAME_SIZE)
+    if decompressor.unconsumed_tail:
+        raise ValueError(f"Decompressed frame exceeds {MAX_FRAME_SIZE} bytes")
+    return result
+
+def _array_to_bytes(values: array.array) -> bytes:
+    if sys.byteorder == "big":
+        values = array.array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _array_from_bytes(typecode: str, data: bytes) -> array.array:
+    values = array.array(typecode)
+    values.frombytes(data)
+    if sys.byteorder == "big":
+        values.byteswap()
+    return values
+
+def _json_default(obj):
+    """Represent bytes and typed arrays in JSON so they survive the debug encoding"""
+    if isinstance(obj, (bytes, bytearray, memoryview)):
+        return {"__bytes__": base64.b64encode(obj).decode("ascii")}
+    if isinstance(obj, array.array):
+        return {"__array__": obj.typecode, "data": base64.b64encode(_array_to_bytes(obj)).decode("ascii")}
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+def _json_object_hook(obj):
+    if "__bytes__" in obj and len(obj) == 1:
+        return base64.b64decode(obj["__bytes__"])
+    if "__array__" in obj and len(obj) == 2:
+        return _array_from_bytes(obj["__array__"], base64.b64decode(obj["data"]))
+    return obj
+
+def _msgpack_default(obj):
+    if isinstance(obj, array.array):
+        return msgpack.ExtType(MSGPACK_EXT_ARRAY, obj.typecode.encode("ascii") + _array_to_bytes(obj))
+    if isinstance(obj, memoryview):
+        return obj.tobytes()
+    raise TypeError(f"Object of type {type(obj).__name__} is not msgpack serializable")
+
+def _msgpack_ext_hook(code: int, data: bytes):
+    if code == MSGPACK_EXT_ARRAY:
+        return _array_from_bytes(data[:1].decode("ascii"), data[1:])
+    return msgpack.ExtType(code, data)
+
+def encode_message(obj: Any, encoding: str) -> tuple:
+    """Encode a message body; returns (frame flags, payload bytes)"""
+    if encoding == "msgpack":
+        return FRAME_FLAG_MSGPACK, msgpack.packb(obj, default=_msgpack_default, use_bin_type=True)
+    return 0, json.dumps(obj, default=_json_default).encode('utf-8')
+
+def decode_message(payload, flags: int) -> Any:
+    """Decode a frame payload (bytes, or a memoryview into the shared-memory ring)"""
+    if flags & FRAME_FLAG_MSGPACK:
+        return msgpack.unpackb(payload, ext_hook=_msgpack_ext_hook, raw=False, strict_map_key=False)
+    return json.loads(bytes(payload).decode('utf-8'), object_hook=_json_object_hook)
+
+# Seconds to wait for a response; also sent to the addon as the command's deadline
+BLENDER_MCP_TIMEOUT = float(os.environ.get("BLENDER_MCP_TIMEOUT", "15.0"))
+
+# How often send_command retries when the addon answers "busy" (its queue is saturated)
+BLENDER_MCP_BUSY_RETRIES = int(os.environ.get("BLENDER_MCP_BUSY_RETRIES", "5"))
+
+class BlenderBusyError(Exception):
+    """The addon refused a command because its queue is full"""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
 @dataclass
 class BlenderConnection:
     host: str
     port: int
     sock: socket.socket = None  # Changed from 'socket' to 'sock' to avoid naming conflict
+    preferred_encoding: str = BLENDER_MCP_ENCODING
+    encoding: Optional[str] = None  # Negotiated frame encoding; None for the unframed JSON protocol
+    preferred_compression: str = BLENDER_MCP_COMPRESSION
+    compression_threshold: int = BLENDER_MCP_COMPRESSION_THRESHOLD
+    compression_level: Optional[int] = BLENDER_MCP_COMPRESSION_LEVEL
+    compression: Optional[str] = None  # Negotiated compression algorithm, if any
+    socket_path: Optional[str] = None  # Connect to this Unix domain socket instead of host:port
+    preferred_shared_memory: str = BLENDER_MCP_SHARED_MEMORY
+    shared_memory_size: int = BLENDER_MCP_SHARED_MEMORY_SIZE
+    shared_memory_threshold: int = BLENDER_MCP_SHARED_MEMORY_THRESHOLD
+    shm: Optional[shared_memory.SharedMemory] = None  # Response ring, once the addon attached to it
+    timeout: float = BLENDER_MCP_TIMEOUT
     
     def connect(self) -> bool:
         """Connect to the Blender addon socket server"""
@@ -30,9 +323,15 @@ class BlenderConnection:
             return True
             
         try:
-            self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            self.sock.connect((self.host, self.port))
-            logger.info(f"Connected to Blender at {self.host}:{self.port}")
+            if self.socket_path:
+                self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                self.sock.connect(self.socket_path)
+                logger.info(f"Connected to Blender at {self.socket_path}")
+            else:
+                self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+                self.sock.connect((self.host, self.port))
+                logger.info(f"Connected to Blender at {self.host}:{self.port}")
+            self._negotiate()
             return True
         except Exception as e:
             logger.error(f"Failed to connect to Blender: {str(e)}")
@@ -48,12 +347,123 @@ class BlenderConnection:
                 logger.error(f"Error disconnecting from Blender: {str(e)}")
             finally:
                 self.sock = None
+                self.encoding = None
+                self.compression = None
+        self._release_shared_memory()
+
+    def _release_shared_memory(self):
+        if self.shm is not None:
+            try:
+                self.shm.close()
+                self.shm.unlink()
+            except (BufferError, FileNotFoundError) as e:
+                logger.warning(f"Error releasing shared memory: {str(e)}")
+            self.shm = None
+
+    @property
+    def supports_binary(self) -> bool:
+        """Whether bytes and typed arrays travel natively rather than as base64"""
+        return self.encoding == "msgpack"
+
+    def _negotiate(self):
+        """Agree on framing and an encoding with the addon; older addons stay on unframed JSON"""
+        self.encoding = None
+        self.compression = None
+        self._release_shared_memory()
+        if self.preferred_encoding == "legacy":
+            return
+        if self.preferred_encoding == "auto":
+            encodings = (["msgpack"] if msgpack is not None else []) + ["json"]
+        else:
+            encodings = [self.preferred_encoding]
+        if self.preferred_compression == "auto":
+            compression = (["zstd"] if zstandard is not None else []) + ["zlib"]
+        elif self.preferred_compression == "none":
+            compression = []
+        else:
+            compression = [self.preferred_compression]
+        
+        shm_offer = None
+        if self.preferred_shared_memory == "on" or (
+                self.preferred_shared_memory == "auto" and (self.socket_path or self.host in LOOPBACK_HOSTS)):
+            try:
+                self.shm = _create_shared_memory(self.shared_memory_size)
+                token = secrets.token_hex(16)
+                self.shm.buf[:16] = bytes.fromhex(token)
+                shm_offer = {"name": self.shm.name, "token": token, "threshold": self.shared_memory_threshold}
+            except OSError as e:
+                logger.warning(f"Shared memory unavailable: {str(e)}")
+                self.shm = None
+        
+        self.sock.sendall(json.dumps({
+            "type": "negotiate_protocol",
+            "params": {
+                "version": PROTOCOL_VERSION,
+                "encodings": encodings,
+                "compression": compression,
+                "compression_threshold": self.compression_threshold,
+                "compression_level": self.compression_level,
+                "shared_memory": shm_offer,
+            },
+        }).encode('utf-8'))
+        response = json.loads(self.receive_full_response(self.sock).decode('utf-8'))
+        if response.get("status") == "success":
+            result = response["result"]
+            self.encoding = result["encoding"]
+            # Addons without compression support leave these out
+            self.compression = result.get("compression")
+            if result.get("compression_level") is not None:
+                self.compression_level = result["compression_level"]
+            if not result.get("shared_memory"):
+                # The addon is on another host (e.g. behind a tunnel) or could not attach
+                self._release_shared_memory()
+            logger.info(f"Using {self.encoding} frames, compression: {self.compression}, "
+                        f"shared memory: {self.shm is not None}")
+        else:
+            self._release_shared_memory()
+            logger.info(f"Protocol negotiation declined, using unframed JSON: {response.get('message')}")
+
+    def _recv_exact(self, size: int) -> bytes:
+        data = bytearray()
+        while len(data) < size:
+            chunk = self.sock.recv(min(size - len(data), 1 << 20))
+            if not chunk:
+                raise ConnectionError("Connection closed while receiving a frame")
+            data += chunk
+        return bytes(data)
+
+    def encode_frame(self, obj: Any) -> bytes:
+        """Encode a message as a frame, compressing it if it is large"""
+        flags, payload = encode_message(obj, self.encoding)
+        if self.compression and len(payload) >= self.compression_threshold:
+            payload = _compress(self.compression, payload, self.compression_level)
+            flags |= FRAME_FLAG_COMPRESSED
+        return FRAME_HEADER.pack(flags, len(payload)) + payload
+
+    def receive_frame(self) -> tuple:
+        """
+        Receive one frame; returns (flags, payload) with the payload decompressed.
+
+        Payloads in the shared-memory ring come back as a memoryview that is only
+        valid until the next command is sent.
+        """
+        self.sock.settimeout(self.timeout)
+        flags, length = FRAME_HEADER.unpack(self._recv_exact(FRAME_HEADER.size))
+        if length > MAX_FRAME_SIZE:
+            raise ConnectionError(f"Frame of {length} bytes exceeds the limit")
+        payload = self._recv_exact(length)
+        if flags & FRAME_FLAG_SHARED_MEMORY:
+            offset, size = SHARED_MEMORY_HANDLE.unpack(payload)
+            payload = self.shm.buf[offset:offset + size]
+        if flags & FRAME_FLAG_COMPRESSED:
+            payload = _decompress(self.compression, payload)
+        return flags, payload
 
     def receive_full_response(self, sock, buffer_size=8192):
         """Receive the complete response, potentially in multiple chunks"""
         chunks = []
         # Use a consistent timeout value that matches the addon's timeout
-        sock.settimeout(15.0)  # Match the addon's timeout
+        sock.settimeout(self.timeout)
         
         try:
             while True:
@@ -105,8 +515,23 @@ class BlenderConnection:
         else:
             raise Exception("No data received")
 
-    def send_command(self, command_type: str, params: Dict[str, Any] = None) -> Dict[str, Any]:
-        """Send a command to Blender and return the response"""
+    def is_local(self) -> bool:
+        """Whether Blender most likely runs on this machine and can open files by path"""
+        return self.socket_path is not None or self.host in ("localhost", "127.0.0.1", "::1")
+
+    def send_command(self, command_type: str, params: Dict[str, Any] = None, profile: bool = False,
+                     priority: str = None, idempotency_key: str = None) -> Dict[str, Any]:
+        """Send a command to Blender and return the response
+
+        If profile is True, the addon runs the handler under cProfile and keeps
+        the report in its profile store (see get_blender_profiles).
+        priority ("interactive", "mutation" or "bulk") can lower the command's
+        class in the addon's queue. Busy responses are retried after the
+        addon's retry_after hint (with exponential backoff), up to
+        BLENDER_MCP_BUSY_RETRIES times.
+        With an idempotency_key, the addon runs a mutating command at most
+        once: a repeat with the same key gets the first successful result back.
+        """
         if not self.sock and not self.connect():
             raise ConnectionError("Not connected to Blender")
         
@@ -114,25 +539,128 @@ class BlenderConnection:
             "type": command_type,
             "params": params or {}
         }
+        if profile:
+            command["profile"] = True
+        if priority:
+            command["priority"] = priority
+        if idempotency_key:
+            command["idempotency_key"] = idempotency_key
+        # The id matches the response to this request; the addon drops the
+        # command instead of running it once the timeout has passed
+        command["id"] = secrets.token_hex(8)
+        command["timeout"] = self.timeout
+        
+        trace_span = None
+        spans: List[Span] = []
+        if span_exporter.enabled:
+            trace_span = Span(name=f"send_command {command_type}", trace_id=secrets.token_hex(16),
+                              attributes={"blender.command": command_type})
+            command["trace"] = {"traceparent": trace_span.traceparent}
         
+        try:
+            for attempt in itertools.count():
+                try:
+                    return self._exchange(command, trace_span, spans)
+                except BlenderBusyError as e:
+                    if attempt >= BLENDER_MCP_BUSY_RETRIES:
+                        raise Exception(f"Blender is busy, gave up after {attempt + 1} attempts: {str(e)}")
+                    # Honor the addon's estimate, backing off in case the main thread is stalled
+                    delay = max(e.retry_after, 0.1 * 2 ** attempt)
+                    logger.info(f"Blender is busy, retrying {command_type} in {delay:.2f}s")
+                    time.sleep(delay)
+        except Exception as e:
+            if trace_span:
+                trace_span.status = "ERROR"
+                trace_span.attributes["error.message"] = str(e)
+            raise
+        finally:
+            if trace_span:
+                trace_span.end()
+                span_exporter.export([trace_span.to_dict()] + [
+                    span.to_dict() if isinstance(span, Span) else span for span in spans
+                ])
+
+    def cancel(self, request_id: str) -> Dict[str, Any]:
+        """Ask the addon to drop a queued command or stop a running one"""
+        return self.send_command("cancel", {"request_id": request_id})
+
+    def _abandon(self, request_id: Optional[str], keep_running: bool = False):
+        """Best-effort cancel of a timed-out command, then close the socket"""
+        try:
+            if request_id and self.sock and not keep_running:
+                self.sock.settimeout(1.0)
+                message = {"type": "cancel", "params": {"request_id": request_id}}
+                if self.encoding:
+                    self.sock.sendall(self.encode_frame(message))
+                else:
+                    self.sock.sendall(json.dumps(message).encode('utf-8'))
+        except OSError as e:
+            logger.warning(f"Could not cancel request {request_id}: {str(e)}")
+        finally:
+            # The addon also cancels everything a client left behind when it disconnects
+            self.disconnect()
+
+    def _exchange(self, command: Dict[str, Any], trace_span: Optional[Span], spans: list) -> Dict[str, Any]:
+        """Send one command envelope and wait for its response"""
+        command_type = command["type"]
+        params = command["params"]
         try:
             # Log the command being sent
             logger.info(f"Sending command: {command_type} with params: {params}")
             
             # Send the command
-            self.sock.sendall(json.dumps(command).encode('utf-8'))
+            with _child_span(spans, trace_span, "serialize") as span:
+                if self.encoding:
+                    payload = self.encode_frame(command)
+                else:
+                    payload = json.dumps(command, default=_json_default).encode('utf-8')
+                if span:
+                    span.attributes["net.bytes"] = len(payload)
+            with _child_span(spans, trace_span, "send"):
+                self.sock.sendall(payload)
             logger.info(f"Command sent, waiting for response...")
             
             # Set a timeout for receiving - use the same timeout as in receive_full_response
-            self.sock.settimeout(15.0)  # Match the addon's timeout
+            self.sock.settimeout(self.timeout)
             
-            # Receive the response using the improved receive_full_response method
-            response_data = self.receive_full_response(self.sock)
-            logger.info(f"Received {len(response_data)} bytes of data")
-            
-            response = json.loads(response_data.decode('utf-8'))
+            while True:
+                # Receive the response using the improved receive_full_response method
+                with _child_span(spans, trace_span, "wait_response") as span:
+                    if self.encoding:
+                        flags, response_data = self.receive_frame()
+                    else:
+                        flags, response_data = 0, self.receive_full_response(self.sock)
+                    if span:
+                        span.attributes["net.bytes"] = len(response_data)
+                logger.info(f"Received {len(response_data)} bytes of data")
+                
+                with _child_span(spans, trace_span, "parse"):
+                    response = decode_message(response_data, flags)
+                if isinstance(response_data, memoryview):
+                    response_data.release()
+                # Addons that predate request ids don't echo them
+                if response.get("id") in (None, command.get("id")):
+                    break
+                logger.warning(f"Discarding response to an earlier request ({response.get('id')})")
             logger.info(f"Response parsed, status: {response.get('status', 'unknown')}")
             
+            # Spans recorded inside Blender come back with the response
+            spans.extend(response.pop("spans", []))
+            
+            if "profile" in response:
+                profile_data = response["profile"]
+                logger.info(f"Profile #{profile_data.get('id')} for {command_type}: "
+                            f"{profile_data.get('elapsed', 0) * 1000:.1f} ms in Blender")
+            
+            if response.get("idempotent_replay"):
+                logger.info(f"Blender replayed the earlier result of {command_type} (idempotency key)")
+            
+            if response.get("status") == "busy":
+                raise BlenderBusyError(response.get("message", "Blender is busy"), response.get("retry_after", 1.0))
+            
+            if response.get("status") == "cancelled":
+                raise Exception(response.get("message", "Command was cancelled in Blender"))
+            
             if response.get("status") == "error":
                 logger.error(f"Blender error: {response.get('message')}")
                 raise Exception(response.get("message", "Unknown error from Blender"))
@@ -141,8 +669,9 @@ class BlenderConnection:
         except socket.timeout:
             logger.error("Socket timeout while waiting for response from Blender")
             # Don't try to reconnect here - let the get_blender_connection handle reconnection
-            # Just invalidate the current socket so it will be recreated next time
-            self.sock = None
+            # Stop the command in Blender and drop the socket so a late reply can't be misread
+            # A keyed command is left to finish so that a retry picks up its result
+            self._abandon(command.get("id"), keep_running=bool(command.get("idempotency_key")))
             raise Exception("Timeout waiting for Blender response - try simplifying your request")
         except (ConnectionError, BrokenPipeError, ConnectionResetError) as e:
             logger.error(f"Socket connection error: {str(e)}")
@@ -154,6 +683,8 @@ class BlenderConnection:
             if 'response_data' in locals() and response_data:
                 logger.error(f"Raw response (first 200 bytes): {response_data[:200]}")
             raise Exception(f"Invalid response from Blender: {str(e)}")
+        except BlenderBusyError:
+            raise
         except Exception as e:
             logger.error(f"Error communicating with Blender: {str(e)}")
             # Don't try to reconnect here - let the get_blender_connection handle reconnection
@@ -198,6 +729,11 @@ mcp = FastMCP(
 
 # Resource endpoints
 
+# Where the Blender addon listens; overridable for remote or benchmark setups
+DEFAULT_BLENDER_HOST = os.environ.get("BLENDER_HOST", "localhost")
+DEFAULT_BLENDER_PORT = int(os.environ.get("BLENDER_PORT", "9876"))
+DEFAULT_BLENDER_SOCKET_PATH = os.environ.get("BLENDER_SOCKET_PATH")  # Unix domain socket, if set
+
 # Global connection for resources (since resources can't access context)
 _blender_connection = None
 _polyhaven_enabled = False  # Add this global variable
@@ -225,7 +761,8 @@ def get_blender_connection():
     
     # Create a new connection if needed
     if _blender_connection is None:
-        _blender_connection = BlenderConnection(host="localhost", port=9876)
+        _blender_connection = BlenderConnection(host=DEFAULT_BLENDER_HOST, port=DEFAULT_BLENDER_PORT,
+                                                socket_path=DEFAULT_BLENDER_SOCKET_PATH)
         if not _blender_connection.connect():
             logger.error("Failed to connect to Blender")
             _blender_connection = None
@@ -362,7 +899,10 @@ def get_polyhaven_categories(ctx: Context, asset_type: str = "hdris") -> str:
 def search_polyhaven_assets(
     ctx: Context,
     asset_type: str = "all",
-    categories: str = None
+    categories: str = None,
+    query: str = None,
+    limit: int = 20,
+    offset: int = 0
 ) -> str:
     """
     Search for assets on Polyhaven with optional filtering.
@@ -370,14 +910,21 @@ def search_polyhaven_assets(
     Parameters:
     - asset_type: Type of assets to search for (hdris, textures, models, all)
     - categories: Optional comma-separated list of categories to filter by
+    - query: Optional search words, matched against asset names, tags and categories (e.g. "mossy rock")
+    - limit: Maximum number of assets to return (default: 20)
+    - offset: Number of ranked results to skip, for fetching the next page
     
-    Returns a list of matching assets with basic information.
+    Returns a list of matching assets with basic information, best matches first.
     """
     try:
         blender = get_blender_connection()
         result = blender.send_command("search_polyhaven_assets", {
             "asset_type": asset_type,
-            "categories": categories
+            "categories": categories,
+            "query": query,
+            "limit": limit,
+            "offset": offset,
+            "fields": ["name", "type", "categories", "download_count"]
         })
         
         if "error" in result:
@@ -389,19 +936,25 @@ def search_polyhaven_assets(
         returned_count = result["returned_count"]
         
         formatted_output = f"Found {total_count} assets"
+        if query:
+            formatted_output += f" matching '{query}'"
         if categories:
             formatted_output += f" in categories: {categories}"
-        formatted_output += f"\nShowing {returned_count} assets:\n\n"
+        formatted_output += f"\nShowing {returned_count} assets"
+        if result.get("offset"):
+            formatted_output += f" starting at {result['offset']}"
+        formatted_output += ":\n\n"
         
-        # Sort assets by download count (popularity)
-        sorted_assets = sorted(assets.items(), key=lambda x: x[1].get("download_count", 0), reverse=True)
-        
-        for asset_id, asset_data in sorted_assets:
+        # Already ranked by relevance, then popularity
+        for asset_id, asset_data in assets.items():
             formatted_output += f"- {asset_data.get('name', asset_id)} (ID: {asset_id})\n"
             formatted_output += f"  Type: {['HDRI', 'Texture', 'Model'][asset_data.get('type', 0)]}\n"
             formatted_output += f"  Categories: {', '.join(asset_data.get('categories', []))}\n"
             formatted_output += f"  Downloads: {asset_data.get('download_count', 'Unknown')}\n\n"
         
+        if result.get("next_offset") is not None:
+            formatted_output += f"More results available: use offset={result['next_offset']}\n"
+        
         return formatted_output
     except Exception as e:
         logger.error(f"Error searching Polyhaven assets: {str(e)}")
@@ -413,7 +966,8 @@ def download_polyhaven_asset(
     asset_id: str,
     asset_type: str,
     resolution: str = "1k",
-    file_format: str = None
+    file_format: str = None,
+    idempotency_key: str = None
 ) -> str:
     """
     Download and import a Polyhaven asset into Blender.
@@ -423,17 +977,20 @@ def download_polyhaven_asset(
     - asset_type: The type of asset (hdris, textures, models)
     - resolution: The resolution to download (e.g., 1k, 2k, 4k)
     - file_format: Optional file format (e.g., hdr, exr for HDRIs; jpg, png for textures; gltf, fbx for models)
+    - idempotency_key: Optional. A retry with the same key returns the first result instead of importing the asset again.
     
     Returns a message indicating success or failure.
     """
     try:
         blender = get_blender_connection()
-        result = blender.send_command("download_polyhaven_asset", {
+        params = {
             "asset_id": asset_id,
             "asset_type": asset_type,
             "resolution": resolution,
             "file_format": file_format
-        })
+        }
+        result = blender.send_command("download_polyhaven_asset", params,
+                                      idempotency_key=idempotency_key)
         
         if "error" in result:
             return f"Error: {result['error']}"
@@ -462,14 +1019,17 @@ def download_polyhaven_asset(
 def set_texture(
     ctx: Context,
     object_name: str,
-    texture_id: str
+    texture_id: str,
+    idempotency_key: str = None
 ) -> str:
     """
     Apply a previously downloaded Polyhaven texture to an object.
+    All objects given the same texture share one material, so applying it again is cheap.
     
     Parameters:
     - object_name: Name of the object to apply the texture to
     - texture_id: ID of the Polyhaven texture to apply (must be downloaded first)
+    - idempotency_key: Optional. A retry with the same key returns the first result instead of applying the texture again.
     
     Returns a message indicating success or failure.
     """
@@ -479,7 +1039,7 @@ def set_texture(
         result = blender.send_command("set_texture", {
             "object_name": object_name,
             "texture_id": texture_id
-        })
+        }, idempotency_key=idempotency_key)
         
         if "error" in result:
             return f"Error: {result['error']}"
@@ -517,6 +1077,312 @@ def set_texture(
         logger.error(f"Error applying texture: {str(e)}")
         return f"Error applying texture: {str(e)}"
 
+@mcp.tool()
+def create_material_from_template(
+    ctx: Context,
+    template: str,
+    bindings: Dict[str, Any] = None,
+    material_name: str = None
+) -> str:
+    """
+    Create a material from a declarative node-graph template.
+    The template's fixed nodes are built once as a shared node group, so creating many materials is fast.
+    
+    Parameters:
+    - template: A built-in template name ("pbr"), or a JSON template object:
+      {"nodes": {id: {"type": "ShaderNode...", "location": [x, y], "properties": {...}, "inputs": {socket: value},
+      "image": "$binding", "colorspace": "sRGB", "requires": [binding, ...], "unless": [binding, ...]}},
+      "links": [[from_id, from_socket, to_id, to_socket, {"requires": [...], "unless": [...]}]], "defaults": {...}}
+      Values written as "$name" are taken from bindings; nodes and links whose required bindings are missing, or whose "unless" bindings are set, are left out.
+    - bindings: Values for the template's "$name" placeholders. Image bindings are names of images already in the file.
+      For "pbr": color, roughness, metallic, normal, displacement, arm, ao (images), displacement_scale (number)
+      and skip_ao (true to leave ambient occlusion out of the base color).
+    - material_name: Optional name for the new material
+    
+    Returns the created material's name, or an error.
+    """
+    try:
+        spec = template
+        if template.lstrip().startswith("{"):
+            spec = json.loads(template)
+        blender = get_blender_connection()
+        result = blender.send_command("create_material_from_template", {
+            "template": spec,
+            "bindings": bindings or {},
+            "material_name": material_name
+        })
+        
+        if "error" in result:
+            return f"Error: {result['error']}"
+        
+        output = f"Created material '{result['material']}' with {result['node_count']} nodes"
+        if result.get("node_group"):
+            output += f" using shared node group '{result['node_group']}'"
+        return output
+    except Exception as e:
+        logger.error(f"Error creating material from template: {str(e)}")
+        return f"Error creating material from template: {str(e)}"
+
+@mcp.tool()
+def set_texture_many(
+    ctx: Context,
+    object_names: list[str],
+    texture_id: str,
+    idempotency_key: str = None
+) -> str:
+    """
+    Apply a previously downloaded Polyhaven texture to many objects at once.
+    All objects share one material; prefer this over calling set_texture in a loop.
+    
+    Parameters:
+    - object_names: Names of the objects to apply the texture to
+    - texture_id: ID of the Polyhaven texture to apply (must be downloaded first)
+    - idempotency_key: Optional. A retry with the same key returns the first result instead of applying the texture again.
+    
+    Returns a message indicating success or failure.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("set_texture_many", {
+            "object_names": object_names,
+            "texture_id": texture_id
+        }, idempotency_key=idempotency_key)
+        
+        if "error" in result:
+            return f"Error: {result['error']}"
+        
+        output = f"{result.get('message', '')}.\n"
+        output += f"Using material '{result.get('material', '')}' with maps: {', '.join(result.get('maps', []))}.\n"
+        for object_name, reason in result.get("skipped", {}).items():
+            output += f"- Skipped {object_name}: {reason}\n"
+        return output
+    except Exception as e:
+        logger.error(f"Error applying texture: {str(e)}")
+        return f"Error applying texture: {str(e)}"
+
+@mcp.tool()
+def sample_transforms(
+    ctx: Context,
+    targets: list,
+    frames: list[float] = None,
+    frame_start: float = None,
+    frame_end: float = None,
+    frame_step: float = 1
+) -> str:
+    """
+    Sample the world transforms of objects or pose bones over many frames without changing the current frame.
+    Animation is evaluated straight from the F-curves where possible, which is much faster than stepping the scene.
+    
+    Parameters:
+    - targets: Object names, or {"object": armature_name, "bone": bone_name} for pose bones
+    - frames: Optional explicit list of frames (subframes allowed)
+    - frame_start, frame_end, frame_step: Frame range used when frames is not given (defaults to the scene range)
+    
+    Returns JSON with the sampled frames and, per target, location [x, y, z], rotation [w, x, y, z] and
+    scale [x, y, z] for every frame.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("sample_transforms", {
+            "targets": targets,
+            "frames": frames,
+            "frame_start": frame_start,
+            "frame_end": frame_end,
+            "frame_step": frame_step
+        })
+        
+        if "error" in result:
+            return f"Error: {result['error']}"
+        
+        def rows(values, width):
+            return [[round(v, 5) for v in values[i:i + width]] for i in range(0, len(values), width)]
+        
+        for target in result["targets"]:
+            target["location"] = rows(target["location"], 3)
+            target["rotation"] = rows(target["rotation"], 4)
+            target["scale"] = rows(target["scale"], 3)
+        result["frames"] = list(result["frames"])
+        return json.dumps(result)
+    except Exception as e:
+        logger.error(f"Error sampling transforms: {str(e)}")
+        return f"Error sampling transforms: {str(e)}"
+
+@mcp.tool()
+def set_keyframes(
+    ctx: Context,
+    target: str | Dict[str, Any],
+    data_path: str,
+    frames: list[float],
+    values: list,
+    interpolation: str = "BEZIER",
+    index: int = None
+) -> str:
+    """
+    Replace the animation of one property with a keyframe at each of the given frames, in a single call.
+    Prefer this over inserting keys one frame at a time; thousands of keys take milliseconds.
+    
+    Parameters:
+    - target: An object name, {"object": armature_name, "bone": bone_name} for a pose bone,
+      or {"object": name, "data": true} for the object's data (e.g. a camera's lens)
+    - data_path: Property path relative to the target, e.g. "location", "rotation_euler", "lens" or
+      'constraints["Follow Path"].offset_factor'
+    - frames: Frame numbers to key
+    - values: One value per frame; for array properties one [x, y, z, ...] row per frame
+    - interpolation: Keyframe interpolation, e.g. "CONSTANT", "LINEAR" or "BEZIER" (default)
+    - index: Optional. Key only this component of an array property (values are then one number per frame)
+    
+    Returns a message with the number of F-curves and keyframes written.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("set_keyframes", {
+            "target": target,
+            "data_path": data_path,
+            "frames": frames,
+            "values": values,
+            "interpolation": interpolation,
+            "index": index
+        })
+        
+        if "error" in result:
+            return f"Error: {result['error']}"
+        
+        return (f"Wrote {result['keyframes']} keyframes on {result['fcurves']} F-curve(s) for "
+                f"{result['target']}.{result['data_path']} in action '{result['action']}'")
+    except Exception as e:
+        logger.error(f"Error setting keyframes: {str(e)}")
+        return f"Error setting keyframes: {str(e)}"
+
+@mcp.tool()
+def sample_motion_path(
+    ctx: Context,
+    object_name: str,
+    frame_start: int = None,
+    frame_end: int = None,
+    frame_step: int = 1
+) -> str:
+    """
+    Get the world positions of an object over a frame range, like a motion path, without changing
+    the selection or the current frame. Repeated calls for unchanged animation are answered from a cache.
+    
+    Parameters:
+    - object_name: Name of the object
+    - frame_start, frame_end: Optional frame range (defaults to the scene range)
+    - frame_step: Optional frame step (default 1)
+    
+    Returns JSON with the sampled frames and one [x, y, z] position per frame.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("sample_motion_path", {
+            "object_name": object_name,
+            "frame_start": frame_start,
+            "frame_end": frame_end,
+            "frame_step": frame_step
+        })
+        
+        if "error" in result:
+            return f"Error: {result['error']}"
+        
+        positions = result["positions"]
+        result["positions"] = [[round(v, 5) for v in positions[i:i + 3]] for i in range(0, len(positions), 3)]
+        result["frames"] = list(result["frames"])
+        return json.dumps(result)
+    except Exception as e:
+        logger.error(f"Error sampling motion path: {str(e)}")
+        return f"Error sampling motion path: {str(e)}"
+
+@mcp.tool()
+def create_follow_path_camera(
+    ctx: Context,
+    source: str,
+    curve_name: str = "curve_path",
+    camera_name: str = "motion_curve_cam",
+    frame_start: int = None,
+    frame_end: int = None,
+    frames: list[float] = None,
+    track_target: str = None,
+    interpolation: str = "BEZIER"
+) -> str:
+    """
+    Create a curve through an animated object's motion path and a camera with a Follow Path constraint on it.
+    The camera's offset along the curve is keyed from the distance the source has travelled, so it keeps
+    the source's speed changes.
+    
+    Parameters:
+    - source: Name of the animated object (usually a camera)
+    - curve_name: Name of the curve to create; an existing object with this name is replaced
+    - camera_name: Name of the camera to create; an existing object with this name is replaced
+    - frame_start, frame_end: Optional frame range of the path (defaults to the source's motion path or action range)
+    - frames: Optional frames to key; defaults to the source's location keyframes
+    - track_target: Optional name of an object the camera aims at; an empty is created if it doesn't exist
+    - interpolation: Interpolation of the offset keys (default "BEZIER")
+    
+    Returns a message describing the created curve and camera.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("create_follow_path_camera", {
+            "source": source,
+            "curve_name": curve_name,
+            "camera_name": camera_name,
+            "frame_start": frame_start,
+            "frame_end": frame_end,
+            "frames": frames,
+            "track_target": track_target,
+            "interpolation": interpolation
+        })
+        
+        if "error" in result:
+            return f"Error: {result['error']}"
+        
+        start, end = result["frame_range"]
+        return (f"Created camera '{result['camera']}' following curve '{result['curve']}' "
+                f"({result['path_length']:.3f} units, frames {start}-{end}) with {result['keyframes']} offset keyframes")
+    except Exception as e:
+        logger.error(f"Error creating follow path camera: {str(e)}")
+        return f"Error creating follow path camera: {str(e)}"
+
+@mcp.tool()
+def bake_camera_sequence(
+    ctx: Context,
+    collection_name: str = "world",
+    camera_name: str = "AnimatedCamera",
+    start_frame: int = 1,
+    interpolation: str = "BEZIER"
+) -> str:
+    """
+    Bake a sequence of static cameras (e.g. from a Monst3r or COLMAP import) into one animated camera.
+    Cameras in the collection and its child collections are ordered by name (camera_2 before camera_10)
+    and keyed one per frame with their world location, rotation and focal length.
+    
+    Parameters:
+    - collection_name: Name of the collection holding the camera sequence (default "world")
+    - camera_name: Name of the animated camera to create; an existing object with this name is replaced
+    - start_frame: Frame of the first camera (default 1)
+    - interpolation: Keyframe interpolation (default "BEZIER")
+    
+    Returns a message describing the baked camera.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("bake_camera_sequence", {
+            "collection_name": collection_name,
+            "camera_name": camera_name,
+            "start_frame": start_frame,
+            "interpolation": interpolation
+        })
+        
+        if "error" in result:
+            return f"Error: {result['error']}"
+        
+        start, end = result["frame_range"]
+        return (f"Baked {result['cameras']} cameras ({result['first']} to {result['last']}) "
+                f"into '{result['camera']}' over frames {start}-{end}")
+    except Exception as e:
+        logger.error(f"Error baking camera sequence: {str(e)}")
+        return f"Error baking camera sequence: {str(e)}"
+
 @mcp.tool()
 def get_polyhaven_status(ctx: Context) -> str:
     """
@@ -579,7 +1445,8 @@ def search_sketchfab_models(
     query: str,
     categories: str = None,
     count: int = 20,
-    downloadable: bool = True
+    downloadable: bool = True,
+    cursor: str = None
 ) -> str:
     """
     Search for models on Sketchfab with optional filtering.
@@ -589,6 +1456,7 @@ def search_sketchfab_models(
     - categories: Optional comma-separated list of categories
     - count: Maximum number of results to return (default 20)
     - downloadable: Whether to include only downloadable models (default True)
+    - cursor: Optional. The "Next page cursor" printed by a previous search with the same query, to fetch the following page
     
     Returns a formatted list of matching models.
     """
@@ -600,7 +1468,8 @@ def search_sketchfab_models(
             "query": query,
             "categories": categories,
             "count": count,
-            "downloadable": downloadable
+            "downloadable": downloadable,
+            "cursor": cursor
         })
         
         if "error" in result:
@@ -627,21 +1496,21 @@ def search_sketchfab_models(
             model_uid = model.get("uid", "Unknown ID")
             formatted_output += f"- {model_name} (UID: {model_uid})\n"
             
-            # Get user info with safety checks
-            user = model.get("user") or {}
-            username = user.get("username", "Unknown author") if isinstance(user, dict) else "Unknown author"
-            formatted_output += f"  Author: {username}\n"
-            
-            # Get license info with safety checks
-            license_data = model.get("license") or {}
-            license_label = license_data.get("label", "Unknown") if isinstance(license_data, dict) else "Unknown"
-            formatted_output += f"  License: {license_label}\n"
+            # Blender returns projected models with flat author and license fields
+            formatted_output += f"  Author: {model.get('author') or 'Unknown author'}\n"
+            formatted_output += f"  License: {model.get('license') or 'Unknown'}\n"
             
             # Add face count and downloadable status
             face_count = model.get("faceCount", "Unknown")
             is_downloadable = "Yes" if model.get("isDownloadable") else "No"
             formatted_output += f"  Face count: {face_count}\n"
-            formatted_output += f"  Downloadable: {is_downloadable}\n\n"
+            formatted_output += f"  Downloadable: {is_downloadable}\n"
+            if model.get("thumbnail"):
+                formatted_output += f"  Thumbnail: {model['thumbnail']}\n"
+            formatted_output += "\n"
+        
+        if result.get("next_cursor"):
+            formatted_output += f"Next page cursor: {result['next_cursor']}\n"
         
         return formatted_output
     except Exception as e:
@@ -653,13 +1522,15 @@ def search_sketchfab_models(
 @mcp.tool()
 def download_sketchfab_model(
     ctx: Context,
-    uid: str
+    uid: str,
+    idempotency_key: str = None
 ) -> str:
     """
     Download and import a Sketchfab model by its UID.
     
     Parameters:
     - uid: The unique identifier of the Sketchfab model
+    - idempotency_key: Optional. A retry with the same key returns the first result instead of importing the model again.
     
     Returns a message indicating success or failure.
     The model must be downloadable and you must have proper access rights.
@@ -669,9 +1540,9 @@ def download_sketchfab_model(
         blender = get_blender_connection()
         logger.info(f"Attempting to download Sketchfab model with UID: {uid}")
         
-        result = blender.send_command("download_sketchfab_model", {
-            "uid": uid
-        })
+        params = {"uid": uid}
+        result = blender.send_command("download_sketchfab_model", params,
+                                      idempotency_key=idempotency_key)
         
         if result is None:
             logger.error("Received None result from Sketchfab download")
@@ -706,7 +1577,8 @@ def _process_bbox(original_bbox: list[float] | list[int] | None) -> list[int] |
 def generate_hyper3d_model_via_text(
     ctx: Context,
     text_prompt: str,
-    bbox_condition: list[float]=None
+    bbox_condition: list[float]=None,
+    idempotency_key: str=None
 ) -> str:
     """
     Generate 3D asset using Hyper3D by giving description of the desired asset, and import the asset into Blender.
@@ -716,6 +1588,7 @@ def generate_hyper3d_model_via_text(
     Parameters:
     - text_prompt: A short description of the desired model in **English**.
     - bbox_condition: Optional. If given, it has to be a list of floats of length 3. Controls the ratio between [Length, Width, Height] of the model.
+    - idempotency_key: Optional. A retry with the same key returns the job submitted first instead of submitting (and paying for) another one.
 
     Returns a message indicating success or failure.
     """
@@ -725,7 +1598,7 @@ def generate_hyper3d_model_via_text(
             "text_prompt": text_prompt,
             "images": None,
             "bbox_condition": _process_bbox(bbox_condition),
-        })
+        }, idempotency_key=idempotency_key)
         succeed = result.get("submit_time", False)
         if succeed:
             return json.dumps({
@@ -743,7 +1616,9 @@ def generate_hyper3d_model_via_images(
     ctx: Context,
     input_image_paths: list[str]=None,
     input_image_urls: list[str]=None,
-    bbox_condition: list[float]=None
+    bbox_condition: list[float]=None,
+    max_image_size: int=None,
+    idempotency_key: str=None
 ) -> str:
     """
     Generate 3D asset using Hyper3D by giving images of the wanted asset, and import the generated asset into Blender.
@@ -754,6 +1629,8 @@ def generate_hyper3d_model_via_images(
     - input_image_paths: The **absolute** paths of input images. Even if only one image is provided, wrap it into a list. Required if Hyper3D Rodin in MAIN_SITE mode.
     - input_image_urls: The URLs of input images. Even if only one image is provided, wrap it into a list. Required if Hyper3D Rodin in FAL_AI mode.
     - bbox_condition: Optional. If given, it has to be a list of ints of length 3. Controls the ratio between [Length, Width, Height] of the model.
+    - max_image_size: Optional. Images given by path are downscaled so their longest side is at most this many pixels before upload (default 2048, 0 uploads them unchanged).
+    - idempotency_key: Optional. A retry with the same key returns the job submitted first instead of submitting (and paying for) another one.
 
     Only one of {input_image_paths, input_image_urls} should be given at a time, depending on the Hyper3D Rodin's current mode.
     Returns a message indicating success or failure.
@@ -765,23 +1642,37 @@ def generate_hyper3d_model_via_images(
     if input_image_paths is not None:
         if not all(os.path.exists(i) for i in input_image_paths):
             return "Error: not all image paths are valid!"
-        images = []
-        for path in input_image_paths:
-            with open(path, "rb") as f:
-                images.append(
-                    (Path(path).suffix, base64.b64encode(f.read()).decode("ascii"))
-                )
+        input_image_paths = [os.path.abspath(i) for i in input_image_paths]
     elif input_image_urls is not None:
-        if not all(urlparse(i) for i in input_image_paths):
+        if not all(urlparse(i) for i in input_image_urls):
             return "Error: not all image URLs are valid!"
-        images = input_image_urls.copy()
     try:
         blender = get_blender_connection()
-        result = blender.send_command("create_rodin_job", {
+        params = {
             "text_prompt": None,
-            "images": images,
+            "images": input_image_urls.copy() if input_image_urls is not None else None,
             "bbox_condition": _process_bbox(bbox_condition),
-        })
+        }
+        if max_image_size is not None:
+            params["max_image_size"] = max_image_size
+        result = None
+        if input_image_paths is not None and blender.is_local():
+            # Blender reads the files itself and streams them to Rodin
+            result = blender.send_command("create_rodin_job", dict(params, image_paths=input_image_paths),
+                                          idempotency_key=idempotency_key)
+            if "unreadable_image_paths" in result:
+                result = None
+        if result is None:
+            if input_image_paths is not None:
+                images = []
+                for path in input_image_paths:
+                    with open(path, "rb") as f:
+                        images.append((Path(path).suffix, f.read()))
+                if blender.encoding is None:
+                    # The unframed protocol can only carry text
+                    images = [(suffix, base64.b64encode(data).decode("ascii")) for suffix, data in images]
+                params["images"] = images
+            result = blender.send_command("create_rodin_job", params, idempotency_key=idempotency_key)
         succeed = result.get("submit_time", False)
         if succeed:
             return json.dumps({
@@ -843,6 +1734,7 @@ def import_generated_asset(
     name: str,
     task_uuid: str=None,
     request_id: str=None,
+    idempotency_key: str=None,
 ):
     """
     Import the asset generated by Hyper3D Rodin after the generation task is completed.
@@ -851,6 +1743,7 @@ def import_generated_asset(
     - name: The name of the object in scene
     - task_uuid: For Hyper3D Rodin mode MAIN_SITE: The task_uuid given in the generate model step.
     - request_id: For Hyper3D Rodin mode FAL_AI: The request_id given in the generate model step.
+    - idempotency_key: Optional. A retry with the same key returns the first result instead of importing the asset again.
 
     Only give one of {task_uuid, request_id} based on the Hyper3D Rodin Mode!
     Return if the asset has been imported successfully.
@@ -864,12 +1757,172 @@ def import_generated_asset(
             kwargs["task_uuid"] = task_uuid
         elif request_id:
             kwargs["request_id"] = request_id
-        result = blender.send_command("import_generated_asset", kwargs)
+        result = blender.send_command("import_generated_asset", kwargs,
+                                      idempotency_key=idempotency_key)
         return result
     except Exception as e:
         logger.error(f"Error generating Hyper3D task: {str(e)}")
         return f"Error generating Hyper3D task: {str(e)}"
 
+@mcp.tool()
+def generate_hyper3d_models_batch(
+    ctx: Context,
+    text_prompts: list[str],
+    names: list[str]=None,
+    bbox_condition: list[float]=None,
+    concurrency: int=4,
+    idempotency_key: str=None
+) -> str:
+    """
+    Generate several 3D assets with Hyper3D at once, e.g. all the props of a scene.
+    Blender submits, polls and downloads the jobs in the background; use get_hyper3d_batch_status to follow
+    them and import_hyper3d_batch to import every finished model in one call.
+
+    Parameters:
+    - text_prompts: Short descriptions of the desired models in **English**, one per model (at most 50).
+    - names: Optional. The object name of each model, in the same order as text_prompts.
+    - bbox_condition: Optional. If given, it has to be a list of floats of length 3, applied to every model. Controls the ratio between [Length, Width, Height] of the model.
+    - concurrency: How many jobs run at the same time (default 4, at most 8).
+    - idempotency_key: Optional. A retry with the same key returns the batch submitted first instead of submitting (and paying for) it again.
+
+    Returns the batch id and the state of each job as JSON.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("create_rodin_batch", {
+            "text_prompts": text_prompts,
+            "names": names,
+            "bbox_condition": _process_bbox(bbox_condition),
+            "concurrency": concurrency,
+        }, idempotency_key=idempotency_key)
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error generating Hyper3D batch: {str(e)}")
+        return f"Error generating Hyper3D batch: {str(e)}"
+
+@mcp.tool()
+def get_hyper3d_batch_status(
+    ctx: Context,
+    batch_id: str
+) -> str:
+    """
+    Check the jobs of a Hyper3D batch.
+
+    Parameters:
+    - batch_id: The batch_id given by generate_hyper3d_models_batch.
+
+    Each job is "queued", "submitting", "generating", "downloading", "ready" (downloaded, waiting for import),
+    "imported" or "failed". The batch is done when no job is still running; ready jobs can be imported earlier.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("get_rodin_batch_status", {"batch_id": batch_id})
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error checking Hyper3D batch: {str(e)}")
+        return f"Error checking Hyper3D batch: {str(e)}"
+
+@mcp.tool()
+def import_hyper3d_batch(
+    ctx: Context,
+    batch_id: str
+) -> str:
+    """
+    Import every downloaded model of a Hyper3D batch into Blender in one pass.
+    Models imported by an earlier call are skipped, so call it again for jobs that finish later.
+
+    Parameters:
+    - batch_id: The batch_id given by generate_hyper3d_models_batch.
+
+    Returns the imported objects, the failures and the remaining job counts as JSON.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("import_rodin_batch", {"batch_id": batch_id})
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error importing Hyper3D batch: {str(e)}")
+        return f"Error importing Hyper3D batch: {str(e)}"
+
+@mcp.tool()
+def get_blender_profiles(
+    ctx: Context,
+    limit: int = 5,
+    command: str = None,
+    include_stats: bool = True
+) -> str:
+    """
+    Get the most recent cProfile/tracemalloc captures of addon command handlers.
+
+    Parameters:
+    - limit: Maximum number of profiles to return, newest first (default 5)
+    - command: Optional command type to filter by (e.g. "set_texture")
+    - include_stats: Whether to include the pstats and collapsed-stack text (default True)
+
+    Returns the profiles as JSON.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("get_profiles", {
+            "limit": limit,
+            "command": command,
+            "include_stats": include_stats
+        })
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error getting profiles from Blender: {str(e)}")
+        return f"Error getting profiles: {str(e)}"
+
+@mcp.tool()
+def configure_blender_profiling(
+    ctx: Context,
+    sample_rate: float = None,
+    trace_memory: bool = None,
+    max_profiles: int = None,
+    clear: bool = False
+) -> str:
+    """
+    Configure global profiling of addon command handlers.
+
+    Parameters:
+    - sample_rate: Fraction of commands to profile, from 0.0 (off) to 1.0 (every command)
+    - trace_memory: Whether to capture tracemalloc snapshots around profiled commands
+    - max_profiles: How many recent profiles the addon keeps in memory
+    - clear: Discard all stored profiles
+
+    Returns the resulting profiling configuration.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("configure_profiling", {
+            "sample_rate": sample_rate,
+            "trace_memory": trace_memory,
+            "max_profiles": max_profiles,
+            "clear": clear
+        })
+        if "error" in result:
+            return f"Error: {result['error']}"
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error configuring profiling: {str(e)}")
+        return f"Error configuring profiling: {str(e)}"
+
+@mcp.tool()
+def get_blender_queue_stats(ctx: Context) -> str:
+    """
+    Get the addon's command queue depth and admission counters.
+
+    Shows how many commands wait per priority class and per client, the queue
+    limits, and how many commands were admitted, rejected as busy and executed.
+    """
+    try:
+        blender = get_blender_connection()
+        result = blender.send_command("get_queue_stats")
+        return json.dumps(result, indent=2)
+    except Exception as e:
+        logger.error(f"Error getting queue stats from Blender: {str(e)}")
+        return f"Error getting queue stats: {str(e)}"
+
 @mcp.prompt()
 def asset_creation_strategy() -> str:
     """Defines the preferred strategy for creating assets in Blender"""
@@ -916,6 +1969,9 @@ def asset_creation_strategy() -> str:
                     Adjust the imported mesh's location, scale, rotation, so that the mesh is on the right spot.
 
                 You can reuse assets previous generated by running python code to duplicate the object, without creating another generation task.
+            - For several text-generated objects at once (e.g. the props of a scene), use generate_hyper3d_models_batch(),
+              follow it with get_hyper3d_batch_status() and import the finished models with import_hyper3d_batch(),
+              then check each world_bounding_box as above.
 
     3. Always check the world_bounding_box for each item so that:
         - Ensure that all objects that should not be clipping are not clipping.